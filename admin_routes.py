@@ -3,13 +3,16 @@
 도사운세 관리자 페이지 라우트
 """
 
-from flask import Blueprint, render_template_string, request, redirect, url_for, flash, jsonify, send_file
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file
 from flask_login import login_user, logout_user, login_required, current_user
-from models import db, Admin, AccessLog, SiteSettings, FortuneCategory, Notice, APIUsage
+from models import db, Admin, AccessLog, SiteSettings, FortuneCategory, Notice, APIUsage, ExportJob
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, select, tuple_
+from jinja2 import DictLoader, FileSystemBytecodeCache
 import logging
+import math
 import os
+from types import SimpleNamespace
 from admin_templates import (
     ADMIN_LOGIN_HTML,
     ADMIN_DASHBOARD_HTML,
@@ -21,34 +24,80 @@ from admin_templates import (
 from admin_templates_ext import (
     # ADMIN_API_USAGE_HTML,  # 숨김 처리
     ADMIN_SYSTEM_HTML,
-    ADMIN_NOTICES_HTML
+    ADMIN_NOTICES_HTML,
+    ADMIN_EXPORTS_HTML
 )
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from io import BytesIO
+from prompt_registry import prompt_registry, DEFAULT_MODEL, DEFAULT_TIMEOUT
+from log_writer import log_writer
+import log_rollups
+import log_archive
+import log_export
+from log_export import parse_log_filters, apply_log_filters
+from export_jobs import export_jobs, job_info, EXPORT_TTL_HOURS
+from stats_cache import stats_cache
 
 logger = logging.getLogger(__name__)
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
+# 관리자 화면 템플릿 (이름 -> 소스)
+# render_template_string은 렌더링할 때마다 소스를 다시 파싱/컴파일하므로
+# 블루프린트 로더에 한 번 등록하고 이름으로 렌더링한다. 컴파일 결과는
+# Jinja 환경이 메모리에 두고, 바이트코드는 파일로 남겨 재시작 후에도 쓴다.
+ADMIN_TEMPLATES = {
+    'admin/login.html': ADMIN_LOGIN_HTML,
+    'admin/dashboard.html': ADMIN_DASHBOARD_HTML,
+    'admin/logs.html': ADMIN_LOGS_HTML,
+    'admin/settings.html': ADMIN_SETTINGS_HTML,
+    'admin/categories.html': ADMIN_CATEGORIES_HTML,
+    'admin/account.html': ADMIN_ACCOUNT_HTML,
+    # 'admin/api_usage.html': ADMIN_API_USAGE_HTML,  # 숨김 처리
+    'admin/system.html': ADMIN_SYSTEM_HTML,
+    'admin/notices.html': ADMIN_NOTICES_HTML,
+    'admin/exports.html': ADMIN_EXPORTS_HTML,
+}
+admin_bp.jinja_loader = DictLoader(ADMIN_TEMPLATES)
+
+
+@admin_bp.record_once
+def setup_template_cache(state):
+    """템플릿 바이트코드 캐시 (TEMPLATE_CACHE_DIR, 기본: 인스턴스 폴더/jinja_cache)"""
+    app = state.app
+    cache_dir = os.getenv('TEMPLATE_CACHE_DIR') or os.path.join(app.instance_path, 'jinja_cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+
+def day_range(day):
+    """day 하루를 [시작, 다음날 시작) 반열림 구간으로
+
+    func.date(timestamp) == day 는 행마다 함수를 계산해 timestamp 인덱스를
+    쓰지 못하므로 대신 timestamp >= 시작 AND timestamp < 끝 으로 거른다.
+    """
+    start = datetime.combine(day, datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+def filter_logs(query, args):
+    """접속 로그 목록 필터 (운세 종류, 성별, 기간)"""
+    return apply_log_filters(query, parse_log_filters(args))
+
 # 접속 로그 기록 함수
 def log_access(fortune_type, user_data=None):
-    """사용자 접속 기록"""
-    try:
-        log = AccessLog(
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent', '')[:255],
-            fortune_type=fortune_type,
-            birth_date=user_data.get('birthDate') if user_data else None,
-            birth_time=user_data.get('birthTime') if user_data else None,
-            gender=user_data.get('gender') if user_data else None,
-            calendar_type=user_data.get('calendarType') if user_data else None
-        )
-        db.session.add(log)
-        db.session.commit()
-    except Exception as e:
-        logger.error(f"접속 로그 기록 실패: {e}")
-        db.session.rollback()
+    """사용자 접속 기록 (log_writer가 모아서 일괄 INSERT)"""
+    log_writer.write(
+        AccessLog,
+        ip_address=request.remote_addr,
+        user_agent=request.headers.get('User-Agent', '')[:255],
+        fortune_type=fortune_type,
+        birth_date=user_data.get('birthDate') if user_data else None,
+        birth_time=user_data.get('birthTime') if user_data else None,
+        gender=user_data.get('gender') if user_data else None,
+        calendar_type=user_data.get('calendarType') if user_data else None,
+        is_leap_month=bool(user_data.get('isLeapMonth')) if user_data else False,
+        location=None,
+        timestamp=datetime.utcnow()
+    )
 
 
 @admin_bp.route('/login', methods=['GET', 'POST'])
@@ -73,7 +122,7 @@ def admin_login():
             flash('아이디 또는 비밀번호가 잘못되었습니다.', 'error')
     
     # 로그인 페이지 HTML
-    return render_template_string(ADMIN_LOGIN_HTML)
+    return render_template('admin/login.html')
 
 
 @admin_bp.route('/logout')
@@ -85,66 +134,103 @@ def admin_logout():
     return redirect(url_for('admin.admin_login'))
 
 
-@admin_bp.route('/')
-@admin_bp.route('/dashboard')
-@login_required
-def dashboard():
-    """관리자 대시보드"""
-    # 통계 데이터 계산
+def dashboard_stats():
+    """대시보드 통계 (집계 테이블 한 번 + 오늘 시간대별 + 최근 로그 20건)"""
     today = datetime.now().date()
     week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
+    today_start, today_end = day_range(today)
     
-    # 전체 접속 수
-    total_access = AccessLog.query.count()
-    today_access = AccessLog.query.filter(
-        func.date(AccessLog.timestamp) == today
-    ).count()
-    week_access = AccessLog.query.filter(
-        AccessLog.timestamp >= datetime.combine(week_ago, datetime.min.time())
-    ).count()
+    stats = log_rollups.dashboard_counts(today, week_ago)
     
-    # 운세별 통계
-    fortune_stats = db.session.query(
-        AccessLog.fortune_type,
-        func.count(AccessLog.id).label('count')
-    ).group_by(AccessLog.fortune_type).order_by(func.count(AccessLog.id).desc()).limit(10).all()
-    
-    # 성별 통계
-    gender_stats = db.session.query(
-        AccessLog.gender,
-        func.count(AccessLog.id).label('count')
-    ).filter(AccessLog.gender.isnot(None)).group_by(AccessLog.gender).all()
-    
-    # 최근 접속 로그
-    recent_logs = AccessLog.query.order_by(AccessLog.timestamp.desc()).limit(20).all()
+    # 최근 접속 로그 (캐시에 ORM 객체 대신 dict로 둔다)
+    recent = db.session.execute(
+        select(AccessLog.__table__).order_by(AccessLog.timestamp.desc()).limit(20)
+    ).mappings()
+    stats['recent_logs'] = [dict(row) for row in recent]
     
     # 시간대별 접속 통계 (오늘)
-    hourly_stats = db.session.query(
-        func.strftime('%H', AccessLog.timestamp).label('hour'),
-        func.count(AccessLog.id).label('count')
-    ).filter(
-        func.date(AccessLog.timestamp) == today
-    ).group_by('hour').all()
-    
-    stats = {
-        'total_access': total_access,
-        'today_access': today_access,
-        'week_access': week_access,
-        'fortune_stats': fortune_stats,
-        'gender_stats': gender_stats,
-        'recent_logs': recent_logs,
-        'hourly_stats': hourly_stats
-    }
-    
-    return render_template_string(ADMIN_DASHBOARD_HTML, stats=stats, admin=current_user)
+    stats['hourly_stats'] = [tuple(row) for row in log_rollups.hourly_counts(today_start, today_end)]
+    return stats
+
+
+@admin_bp.route('/')
+@admin_bp.route('/dashboard')
+@login_required
+def dashboard():
+    """관리자 대시보드
+
+    통계는 stats_cache에 ADMIN_STATS_TTL초 동안 두고 관리자들이 함께 쓴다.
+    """
+    stats = stats_cache.get('dashboard', dashboard_stats)
+    return render_template('admin/dashboard.html', stats=stats, admin=current_user)
+
+
+@admin_bp.route('/dashboard/refresh', methods=['POST'])
+@login_required
+def refresh_dashboard():
+    """대시보드 통계 캐시 비우기"""
+    stats_cache.invalidate('dashboard')
+    return redirect(url_for('admin.dashboard'))
+
+
+def encode_cursor(log):
+    """접속 로그 목록 위치 (timestamp, id) -> URL 파라미터"""
+    return f"{log.timestamp.strftime('%Y%m%d%H%M%S%f')}-{log.id}"
+
+
+def decode_cursor(value):
+    """encode_cursor의 반대 (잘못된 값이면 None -> 첫 페이지)"""
+    try:
+        timestamp, log_id = value.split('-')
+        return datetime.strptime(timestamp, '%Y%m%d%H%M%S%f'), int(log_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def keyset_page(query, after=None, before=None, per_page=50):
+    """(timestamp, id) 최신순 키셋 페이지
+
+    OFFSET 대신 이전 페이지의 마지막 행 다음부터 읽으므로 몇 번째 페이지든
+    인덱스에서 per_page+1행만 읽는다.
+
+    Args:
+        after: 이 위치보다 오래된 행 (다음 페이지)
+        before: 이 위치보다 최신인 행 (이전 페이지)
+    """
+    key = tuple_(AccessLog.timestamp, AccessLog.id)
+    if before:
+        rows = query.filter(key > before).order_by(
+            AccessLog.timestamp.asc(), AccessLog.id.asc()
+        ).limit(per_page + 1).all()
+        if len(rows) <= per_page:
+            # 최신 쪽 끝에 닿았으면 첫 페이지를 꽉 채워 보여준다
+            return keyset_page(query, per_page=per_page)
+        has_prev = True
+        items = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after:
+            query = query.filter(key < after)
+        rows = query.order_by(
+            AccessLog.timestamp.desc(), AccessLog.id.desc()
+        ).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev = after is not None
+
+    return SimpleNamespace(
+        items=items,
+        has_prev=has_prev and bool(items),
+        has_next=has_next and bool(items),
+        prev_cursor=encode_cursor(items[0]) if items else None,
+        next_cursor=encode_cursor(items[-1]) if items else None,
+    )
 
 
 @admin_bp.route('/logs')
 @login_required
 def logs():
-    """접속 로그 조회"""
-    page = request.args.get('page', 1, type=int)
+    """접속 로그 조회 (키셋 페이지)"""
     per_page = 50
     
     # 필터링
@@ -152,29 +238,37 @@ def logs():
     gender = request.args.get('gender')
     date_from = request.args.get('date_from')
     date_to = request.args.get('date_to')
+    filter_args = {
+        name: value for name, value in (
+            ('fortune_type', fortune_type), ('gender', gender),
+            ('date_from', date_from), ('date_to', date_to)
+        ) if value
+    }
     
-    query = AccessLog.query
-    
-    if fortune_type:
-        query = query.filter(AccessLog.fortune_type == fortune_type)
-    if gender:
-        query = query.filter(AccessLog.gender == gender)
-    if date_from:
-        query = query.filter(AccessLog.timestamp >= datetime.strptime(date_from, '%Y-%m-%d'))
-    if date_to:
-        query = query.filter(AccessLog.timestamp <= datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1))
-    
-    pagination = query.order_by(AccessLog.timestamp.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
+    query = filter_logs(AccessLog.query, request.args)
+    page = keyset_page(
+        query,
+        after=decode_cursor(request.args.get('after')),
+        before=decode_cursor(request.args.get('before')),
+        per_page=per_page
     )
     
-    return render_template_string(ADMIN_LOGS_HTML, 
-                                 pagination=pagination,
-                                 fortune_type=fortune_type,
-                                 gender=gender,
-                                 date_from=date_from,
-                                 date_to=date_to,
-                                 admin=current_user)
+    # 총 건수는 집계 테이블에서 (보관된 달은 목록에 없으므로 뺀다)
+    filters = parse_log_filters(request.args)
+    start = filters['start']
+    archived = log_archive.archived_until()
+    if archived and (start is None or start < archived):
+        start = archived
+    page.total = log_rollups.count_logs(start, filters['end'], filters['fortune_type'], filters['gender'])
+    
+    return render_template('admin/logs.html', 
+                           page=page,
+                           filter_args=filter_args,
+                           fortune_type=fortune_type,
+                           gender=gender,
+                           date_from=date_from,
+                           date_to=date_to,
+                           admin=current_user)
 
 
 @admin_bp.route('/settings', methods=['GET', 'POST'])
@@ -201,9 +295,9 @@ def settings():
     # 모든 설정 조회
     all_settings = SiteSettings.query.all()
     
-    return render_template_string(ADMIN_SETTINGS_HTML, 
-                                 settings=all_settings,
-                                 admin=current_user)
+    return render_template('admin/settings.html', 
+                           settings=all_settings,
+                           admin=current_user)
 
 
 @admin_bp.route('/categories', methods=['GET', 'POST'])
@@ -225,6 +319,7 @@ def categories():
             )
             db.session.add(category)
             db.session.commit()
+            prompt_registry.load()
             flash('카테고리가 추가되었습니다.', 'success')
         
         elif action == 'update':
@@ -238,14 +333,29 @@ def categories():
                 category.is_active = request.form.get('is_active') == 'on'
                 category.sort_order = int(request.form.get('sort_order', 0))
                 db.session.commit()
+                prompt_registry.load()
                 flash('카테고리가 수정되었습니다.', 'success')
         
+        elif action == 'update_llm':
+            # 토큰 한도/모델/타임아웃 조정 (비우면 기본값)
+            category_id = request.form.get('category_id')
+            category = FortuneCategory.query.get(category_id)
+            if category:
+                category.max_tokens = request.form.get('max_tokens', type=int) or None
+                category.model_name = (request.form.get('model_name') or '').strip() or None
+                category.timeout = request.form.get('timeout', type=float) or None
+                db.session.commit()
+                prompt_registry.load()
+                flash('LLM 설정이 저장되었습니다.', 'success')
+                logger.info(f"카테고리 LLM 설정 변경: {category.key} by {current_user.username}")
+        
         elif action == 'delete':
             category_id = request.form.get('category_id')
             category = FortuneCategory.query.get(category_id)
             if category:
                 db.session.delete(category)
                 db.session.commit()
+                prompt_registry.load()
                 flash('카테고리가 삭제되었습니다.', 'success')
         
         return redirect(url_for('admin.categories'))
@@ -253,93 +363,81 @@ def categories():
     # 모든 카테고리 조회
     all_categories = FortuneCategory.query.order_by(FortuneCategory.sort_order).all()
     
-    return render_template_string(ADMIN_CATEGORIES_HTML, 
-                                 categories=all_categories,
-                                 admin=current_user)
+    return render_template('admin/categories.html', 
+                           categories=all_categories,
+                           default_model=DEFAULT_MODEL,
+                           default_timeout=DEFAULT_TIMEOUT,
+                           admin=current_user)
 
 
-@admin_bp.route('/logs/export', methods=['GET'])
+@admin_bp.route('/logs/export', methods=['POST'])
 @login_required
 def export_logs():
-    """접속 로그 엑셀 다운로드"""
+    """접속 로그 내보내기 작업 등록 (format=xlsx 기본, csv, csv.gz)
+
+    작업을 만드는 요청이므로 POST만 받는다 (크롤러/미리 읽기가 작업을 만들지 않도록).
+    파일은 백그라운드에서 만들어지고, 진행 상황과 다운로드는 내보내기 화면에서 본다.
+    """
+    export_format = request.form.get('format', 'xlsx')
+    if export_format not in log_export.FORMATS:
+        export_format = 'xlsx'
+    
     try:
-        # 필터링 파라미터
-        fortune_type = request.args.get('fortune_type')
-        gender = request.args.get('gender')
-        date_from = request.args.get('date_from')
-        date_to = request.args.get('date_to')
-        
-        # 쿼리 생성
-        query = AccessLog.query
-        
-        if fortune_type:
-            query = query.filter(AccessLog.fortune_type == fortune_type)
-        if gender:
-            query = query.filter(AccessLog.gender == gender)
-        if date_from:
-            query = query.filter(AccessLog.timestamp >= datetime.strptime(date_from, '%Y-%m-%d'))
-        if date_to:
-            query = query.filter(AccessLog.timestamp <= datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1))
-        
-        logs = query.order_by(AccessLog.timestamp.desc()).all()
-        
-        # 엑셀 파일 생성
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "접속 로그"
-        
-        # 헤더 스타일 설정
-        header_fill = PatternFill(start_color="667EEA", end_color="667EEA", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        header_alignment = Alignment(horizontal="center", vertical="center")
-        
-        # 헤더 작성
-        headers = ["번호", "접속시간", "IP주소", "운세종류", "생년월일", "출생시간", "성별", "양/음력"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-        
-        # 데이터 작성
-        for idx, log in enumerate(logs, 2):
-            ws.cell(row=idx, column=1, value=idx-1)
-            ws.cell(row=idx, column=2, value=log.timestamp.strftime('%Y-%m-%d %H:%M:%S'))
-            ws.cell(row=idx, column=3, value=log.ip_address or '-')
-            ws.cell(row=idx, column=4, value=log.fortune_type or '-')
-            ws.cell(row=idx, column=5, value=log.birth_date or '-')
-            ws.cell(row=idx, column=6, value=log.birth_time or '-')
-            ws.cell(row=idx, column=7, value=log.gender or '-')
-            ws.cell(row=idx, column=8, value=log.calendar_type or '-')
-        
-        # 열 너비 자동 조정
-        column_widths = [8, 20, 15, 15, 15, 15, 10, 12]
-        for col, width in enumerate(column_widths, 1):
-            ws.column_dimensions[chr(64 + col)].width = width
-        
-        # 메모리에 저장
-        excel_file = BytesIO()
-        wb.save(excel_file)
-        excel_file.seek(0)
-        
-        # 파일명 생성
-        filename = f"도사운세_접속로그_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        
-        logger.info(f"엑셀 다운로드: {current_user.username}, {len(logs)}건")
-        
-        return send_file(
-            excel_file,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
-        )
+        # 목록 화면과 같은 필터 (보관된 달 포함)
+        job = export_jobs.submit(request.form, export_format, current_user.username)
+        logger.info(f"접속 로그 내보내기 요청: {current_user.username}, {job.id}")
+        flash(f'내보내기를 시작했습니다 (약 {job.total_rows:,}건). 완료되면 여기서 내려받을 수 있습니다.', 'success')
+        return redirect(url_for('admin.exports', _anchor=f'job-{job.id}'))
     
     except Exception as e:
-        logger.error(f"엑셀 다운로드 실패: {e}")
-        flash('엑셀 다운로드 중 오류가 발생했습니다.', 'error')
+        logger.error(f"내보내기 등록 실패: {e}")
+        flash('내보내기 요청 중 오류가 발생했습니다.', 'error')
         return redirect(url_for('admin.logs'))
 
 
+@admin_bp.route('/exports')
+@login_required
+def exports():
+    """내보내기 작업 목록"""
+    export_jobs.cleanup()
+    jobs = [job_info(job) for job in export_jobs.recent()]
+    return render_template('admin/exports.html', jobs=jobs,
+                           ttl_hours=EXPORT_TTL_HOURS, admin=current_user)
+
+
+@admin_bp.route('/exports/status')
+@login_required
+def export_status():
+    """내보내기 작업 진행 상황 (화면에서 주기적으로 조회)"""
+    export_jobs.cleanup()
+    return jsonify({"jobs": [job_info(job) for job in export_jobs.recent()]})
+
+
+@admin_bp.route('/exports/<job_id>/download')
+@login_required
+def download_export(job_id):
+    """완료된 내보내기 파일 다운로드"""
+    job = db.session.get(ExportJob, job_id)
+    if job is None or job.status != 'done' or not job.file_path or not os.path.exists(job.file_path):
+        flash('내려받을 수 있는 파일이 없습니다 (만료되었거나 아직 진행 중).', 'error')
+        return redirect(url_for('admin.exports'))
+    
+    _, mimetype = log_export.FORMATS[job.export_format]
+    logger.info(f"내보내기 파일 다운로드: {current_user.username}, {job.id}")
+    return send_file(job.file_path, mimetype=mimetype, as_attachment=True, download_name=job.filename)
+
+
+@admin_bp.route('/exports/<job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_export(job_id):
+    """내보내기 작업 취소"""
+    if export_jobs.cancel(job_id):
+        flash('내보내기를 취소했습니다.', 'success')
+    else:
+        flash('이미 끝난 작업입니다.', 'error')
+    return redirect(url_for('admin.exports'))
+
+
 @admin_bp.route('/account', methods=['GET', 'POST'])
 @login_required
 def account():
@@ -415,9 +513,9 @@ def account():
     # 모든 관리자 조회
     all_admins = Admin.query.order_by(Admin.created_at).all()
     
-    return render_template_string(ADMIN_ACCOUNT_HTML, 
-                                 admins=all_admins,
-                                 admin=current_user)
+    return render_template('admin/account.html', 
+                           admins=all_admins,
+                           admin=current_user)
 
 
 # API 사용량 페이지는 숨김 처리 (내부적으로는 계속 추적)
@@ -467,7 +565,99 @@ def account():
 #         'recent_usage': recent_usage
 #     }
 #     
-#     return render_template_string(ADMIN_API_USAGE_HTML, stats=stats, admin=current_user)
+#     return render_template('admin/api_usage.html', stats=stats, admin=current_user)
+
+
+# 지연 시간 통계 조회 기간
+USAGE_WINDOWS = {
+    '1h': timedelta(hours=1),
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+}
+
+
+def _percentile(sorted_values, pct):
+    """정렬된 값에서 nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def _distribution(values):
+    values = sorted(values)
+    if not values:
+        return None
+    return {
+        'p50': _percentile(values, 50),
+        'p95': _percentile(values, 95),
+        'p99': _percentile(values, 99),
+        'avg': round(sum(values) / len(values), 3),
+        'max': values[-1],
+    }
+
+
+@admin_bp.route('/api-usage/stats')
+@login_required
+def api_usage_stats():
+    """카테고리별 OpenAI 지연 시간/토큰 백분위수 (JSON)
+    
+    ?window=1h|24h|7d|30d (기본 24h)
+    latency는 캐시 미스(실제 OpenAI 호출)만, cache_latency는 캐시 적중만 집계한다.
+    """
+    window = request.args.get('window', '24h')
+    if window not in USAGE_WINDOWS:
+        return jsonify({"success": False, "error": f"window는 {', '.join(USAGE_WINDOWS)} 중 하나여야 합니다"}), 400
+    since = datetime.utcnow() - USAGE_WINDOWS[window]
+
+    rows = db.session.query(
+        APIUsage.category,
+        APIUsage.model,
+        APIUsage.cache_hit,
+        APIUsage.response_time,
+        APIUsage.prompt_tokens,
+        APIUsage.completion_tokens
+    ).filter(APIUsage.timestamp >= since).all()
+
+    grouped = {}
+    for row in rows:
+        item = grouped.setdefault(row.category or '-', {
+            'calls': 0, 'cache_hits': 0, 'models': {},
+            'latency': [], 'cache_latency': [], 'prompt_tokens': [], 'completion_tokens': []
+        })
+        item['calls'] += 1
+        if row.cache_hit:
+            item['cache_hits'] += 1
+            if row.response_time is not None:
+                item['cache_latency'].append(row.response_time)
+            continue
+        if row.model:
+            item['models'][row.model] = item['models'].get(row.model, 0) + 1
+        if row.response_time:
+            item['latency'].append(row.response_time)
+        item['prompt_tokens'].append(row.prompt_tokens or 0)
+        item['completion_tokens'].append(row.completion_tokens or 0)
+
+    categories = {}
+    for category, item in grouped.items():
+        categories[category] = {
+            'calls': item['calls'],
+            'cache_hits': item['cache_hits'],
+            'cache_hit_rate': round(item['cache_hits'] / item['calls'], 3),
+            'models': item['models'],
+            'latency': _distribution(item['latency']),
+            'cache_latency': _distribution(item['cache_latency']),
+            'prompt_tokens': _distribution(item['prompt_tokens']),
+            'completion_tokens': _distribution(item['completion_tokens']),
+        }
+
+    return jsonify({
+        "success": True,
+        "window": window,
+        "since": since.isoformat(),
+        "categories": categories
+    })
 
 
 @admin_bp.route('/system')
@@ -475,11 +665,11 @@ def account():
 def system_status():
     """도사운세 데이터베이스 통계"""
     # 데이터베이스 크기
-    db_path = 'dosa_admin.db'
+    db_path = db.engine.url.database or ''
     db_size = os.path.getsize(db_path) / (1024 * 1024) if os.path.exists(db_path) else 0  # MB
     
     # 데이터베이스 통계
-    total_logs = AccessLog.query.count()
+    total_logs = log_rollups.total_count()
     total_api_calls = APIUsage.query.count()
     total_admins = Admin.query.count()
     total_notices = Notice.query.count()
@@ -487,25 +677,13 @@ def system_status():
     # 최근 7일간 일별 통계
     today = datetime.now().date()
     week_ago = today - timedelta(days=7)
-    
-    daily_stats = db.session.query(
-        func.date(AccessLog.timestamp).label('date'),
-        func.count(AccessLog.id).label('count')
-    ).filter(
-        AccessLog.timestamp >= datetime.combine(week_ago, datetime.min.time())
-    ).group_by(func.date(AccessLog.timestamp)).all()
+    daily_stats = log_rollups.daily_counts(week_ago)
     
     # 성별 통계
-    gender_stats = db.session.query(
-        AccessLog.gender,
-        func.count(AccessLog.id).label('count')
-    ).group_by(AccessLog.gender).all()
+    gender_stats = log_rollups.counts_by('gender')
     
     # 운세 카테고리별 통계
-    category_stats = db.session.query(
-        AccessLog.fortune_type,
-        func.count(AccessLog.id).label('count')
-    ).group_by(AccessLog.fortune_type).order_by(func.count(AccessLog.id).desc()).limit(10).all()
+    category_stats = log_rollups.counts_by('fortune_type', limit=10)
     
     system_info = {
         'db_size': round(db_size, 2),
@@ -515,12 +693,46 @@ def system_status():
         'total_notices': total_notices,
         'daily_stats': daily_stats,
         'gender_stats': gender_stats,
-        'category_stats': category_stats
+        'category_stats': category_stats,
+        'log_writer': log_writer.stats(),
+        'archive': log_archive.stats()
     }
     
-    return render_template_string(ADMIN_SYSTEM_HTML, system_info=system_info, admin=current_user)
+    return render_template('admin/system.html', system_info=system_info, admin=current_user)
+
 
 
+@admin_bp.route('/system/rollups/rebuild', methods=['POST'])
+@login_required
+def rebuild_rollups():
+    """접속 로그 집계 테이블을 원본 로그로 다시 만들기"""
+    try:
+        total = log_rollups.rebuild()
+        stats_cache.invalidate()
+        flash(f'접속 통계를 다시 집계했습니다 ({total:,}건).', 'success')
+    except log_archive.ArchiveBusyError as e:
+        flash(str(e), 'error')
+    except Exception as e:
+        logger.error(f"접속 통계 재집계 실패: {e}")
+        flash('접속 통계 재집계 중 오류가 발생했습니다.', 'error')
+    return redirect(url_for('admin.system_status'))
+
+
+@admin_bp.route('/system/archive', methods=['POST'])
+@login_required
+def archive_logs():
+    """보관 기간이 지난 접속 로그를 세그먼트로 옮기기"""
+    try:
+        results = log_archive.archive_old_logs()
+        archived = sum(count for count, _ in results.values())
+        flash(f'접속 로그 {archived:,}건을 보관했습니다.', 'success')
+    except log_archive.ArchiveBusyError as e:
+        flash(str(e), 'error')
+    except Exception as e:
+        logger.error(f"접속 로그 보관 실패: {e}")
+        flash('접속 로그 보관 중 오류가 발생했습니다.', 'error')
+    return redirect(url_for('admin.system_status'))
+
 @admin_bp.route('/notices', methods=['GET', 'POST'])
 @login_required
 def notices():
@@ -565,5 +777,5 @@ def notices():
     # 모든 공지사항 조회
     all_notices = Notice.query.order_by(Notice.priority.desc(), Notice.created_at.desc()).all()
     
-    return render_template_string(ADMIN_NOTICES_HTML, notices=all_notices, admin=current_user)
+    return render_template('admin/notices.html', notices=all_notices, admin=current_user)
 
@@ -321,7 +321,15 @@ ADMIN_DASHBOARD_HTML = '''
     </div>
     
     <div class="container">
-        <h2 style="margin-bottom: 20px;">📊 통계 현황</h2>
+        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px;">
+            <h2>📊 통계 현황</h2>
+            <form method="POST" action="{{ url_for('admin.refresh_dashboard') }}">
+                <button type="submit" title="통계는 몇 초 동안 캐시됩니다"
+                        style="padding: 8px 16px; background: var(--paper-white); color: var(--ink-black); border: 2px solid var(--border-dark); font-weight: 700; cursor: pointer;">
+                    🔄 새로 계산
+                </button>
+            </form>
+        </div>
         
         <div class="stats-grid">
             <div class="stat-card">
@@ -567,7 +575,7 @@ ADMIN_LOGS_HTML = '''
     </div>
     
     <div class="container">
-        <h2 style="margin-bottom: 20px;">📋 접속 로그 (총 {{ pagination.total }}건)</h2>
+        <h2 style="margin-bottom: 20px;">📋 접속 로그 (총 {{ "{:,}".format(page.total) }}건)</h2>
         
         <div class="filter-box">
             <form method="GET" class="filter-row">
@@ -578,10 +586,22 @@ ADMIN_LOGS_HTML = '''
                     <option value="male" {% if gender == 'male' %}selected{% endif %}>남성</option>
                     <option value="female" {% if gender == 'female' %}selected{% endif %}>여성</option>
                 </select>
+                {% if fortune_type %}<input type="hidden" name="fortune_type" value="{{ fortune_type }}">{% endif %}
                 <button type="submit">검색</button>
-                <a href="{{ url_for('admin.export_logs', date_from=date_from or '', date_to=date_to or '', gender=gender or '', fortune_type=fortune_type or '') }}" 
-                   style="padding: 10px 20px; background: var(--gold); color: var(--ink-black); border: 2px solid var(--border-dark); text-decoration: none; font-weight: 700; display: inline-block; letter-spacing: 1px; transition: all 0.3s;">
+                <!-- 내보내기는 작업을 만들므로 같은 필터를 POST로 보낸다 -->
+                <button type="submit" name="format" value="xlsx"
+                        formmethod="post" formaction="{{ url_for('admin.export_logs') }}"
+                        style="padding: 10px 20px; background: var(--gold); color: var(--ink-black); border: 2px solid var(--border-dark); font-weight: 700; letter-spacing: 1px; transition: all 0.3s;">
                     📥 엑셀 다운로드
+                </button>
+                <button type="submit" name="format" value="csv.gz"
+                        formmethod="post" formaction="{{ url_for('admin.export_logs') }}"
+                        style="padding: 10px 20px; background: var(--paper-white); color: var(--ink-black); border: 2px solid var(--border-dark); font-weight: 700; letter-spacing: 1px; transition: all 0.3s;">
+                    📄 CSV(gz)
+                </button>
+                <a href="{{ url_for('admin.exports') }}" 
+                   style="padding: 10px 20px; color: var(--ink-black); text-decoration: underline; font-weight: 700; display: inline-block;">
+                    📦 내보내기 목록
                 </a>
             </form>
         </div>
@@ -599,7 +619,7 @@ ADMIN_LOGS_HTML = '''
                 </tr>
             </thead>
             <tbody>
-                {% for log in pagination.items %}
+                {% for log in page.items %}
                 <tr>
                     <td>{{ log.timestamp.strftime('%Y-%m-%d %H:%M:%S') }}</td>
                     <td>{{ log.ip_address }}</td>
@@ -614,12 +634,12 @@ ADMIN_LOGS_HTML = '''
         </table>
         
         <div class="pagination">
-            {% if pagination.has_prev %}
-                <a href="{{ url_for('admin.logs', page=pagination.prev_num) }}">이전</a>
+            {% if page.has_prev %}
+                <a href="{{ url_for('admin.logs', **filter_args) }}">최신</a>
+                <a href="{{ url_for('admin.logs', before=page.prev_cursor, **filter_args) }}">이전</a>
             {% endif %}
-            <span style="padding: 8px 12px;">{{ pagination.page }} / {{ pagination.pages }}</span>
-            {% if pagination.has_next %}
-                <a href="{{ url_for('admin.logs', page=pagination.next_num) }}">다음</a>
+            {% if page.has_next %}
+                <a href="{{ url_for('admin.logs', after=page.next_cursor, **filter_args) }}">다음</a>
             {% endif %}
         </div>
     </div>
@@ -705,7 +725,7 @@ ADMIN_SETTINGS_HTML = '''
             color: #333;
             margin-bottom: 8px;
         }
-        input[type="text"], textarea {
+        input[type="text"], textarea, select {
             width: 100%;
             padding: 12px;
             border: 2px solid #ddd;
@@ -798,6 +818,15 @@ ADMIN_SETTINGS_HTML = '''
                     <input type="text" name="setting_youtube_url" value="{{ settings | selectattr('key', 'equalto', 'youtube_url') | map(attribute='value') | first or 'https://www.youtube.com/@dosaunse' }}">
                 </div>
                 
+                <div class="setting-item">
+                    <label>비상 모드 (OpenAI 대신 기본 운세 제공)</label>
+                    {% set degraded_mode = settings | selectattr('key', 'equalto', 'degraded_mode') | map(attribute='value') | first or 'off' %}
+                    <select name="setting_degraded_mode">
+                        <option value="off" {% if degraded_mode != 'on' %}selected{% endif %}>끄기</option>
+                        <option value="on" {% if degraded_mode == 'on' %}selected{% endif %}>켜기</option>
+                    </select>
+                </div>
+                
                 <button type="submit">저장</button>
             </form>
         </div>
@@ -1137,6 +1166,32 @@ ADMIN_CATEGORIES_HTML = '''
         }
         .badge-active { background: #d4edda; color: #155724; }
         .badge-inactive { background: #f8d7da; color: #721c24; }
+        .llm-form {
+            display: flex;
+            gap: 6px;
+            align-items: center;
+        }
+        .llm-form input {
+            padding: 6px 8px;
+            border: 1px solid #ddd;
+            border-radius: 5px;
+            font-size: 13px;
+        }
+        .llm-form button {
+            padding: 6px 12px;
+            background: var(--seal-red);
+            color: white;
+            border: none;
+            border-radius: 5px;
+            cursor: pointer;
+        }
+        .alert {
+            padding: 12px 16px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+        }
+        .alert-success { background: #d4edda; color: #155724; }
+        .alert-error { background: #f8d7da; color: #721c24; }
     </style>
 </head>
 <body>
@@ -1158,6 +1213,12 @@ ADMIN_CATEGORIES_HTML = '''
     <div class="container">
         <h2 style="margin-bottom: 20px;">📁 운세 카테고리 관리</h2>
         
+        {% with messages = get_flashed_messages(with_categories=true) %}
+            {% for category, message in messages %}
+                <div class="alert alert-{{ category }}">{{ message }}</div>
+            {% endfor %}
+        {% endwith %}
+        
         <table>
             <thead>
                 <tr>
@@ -1166,6 +1227,7 @@ ADMIN_CATEGORIES_HTML = '''
                     <th>키</th>
                     <th>정렬순서</th>
                     <th>상태</th>
+                    <th>LLM 설정 (토큰 한도 / 모델 / 타임아웃)</th>
                     <th>생성일</th>
                 </tr>
             </thead>
@@ -1183,6 +1245,16 @@ ADMIN_CATEGORIES_HTML = '''
                             <span class="badge badge-inactive">비활성</span>
                         {% endif %}
                     </td>
+                    <td>
+                        <form method="POST" class="llm-form">
+                            <input type="hidden" name="action" value="update_llm">
+                            <input type="hidden" name="category_id" value="{{ category.id }}">
+                            <input type="number" name="max_tokens" value="{{ category.max_tokens or '' }}" placeholder="기본값" min="100" max="8000" style="width: 90px;">
+                            <input type="text" name="model_name" value="{{ category.model_name or '' }}" placeholder="{{ default_model }}" style="width: 130px;">
+                            <input type="number" name="timeout" value="{{ category.timeout or '' }}" placeholder="{{ default_timeout }}초" min="5" max="120" step="1" style="width: 70px;">
+                            <button type="submit">저장</button>
+                        </form>
+                    </td>
                     <td>{{ category.created_at.strftime('%Y-%m-%d') }}</td>
                 </tr>
                 {% endfor %}
@@ -291,6 +291,27 @@ ADMIN_SYSTEM_HTML = '''
             padding: 10px;
             background: #faf8f4;
         }
+        .flash {
+            padding: 12px;
+            margin-bottom: 20px;
+            font-weight: 600;
+            border: 2px solid #155724;
+            background: #d4edda;
+            color: #155724;
+        }
+        .flash.error {
+            border-color: #721c24;
+            background: #f8d7da;
+            color: #721c24;
+        }
+        .info-row button {
+            padding: 4px 12px;
+            background: var(--seal-red);
+            color: white;
+            border: 2px solid var(--border-dark);
+            font-weight: 700;
+            cursor: pointer;
+        }
     </style>
 </head>
 <body>
@@ -312,6 +333,12 @@ ADMIN_SYSTEM_HTML = '''
     <div class="container">
         <h2 style="margin-bottom: 20px;">📊 도사운세 통계</h2>
         
+        {% with messages = get_flashed_messages(with_categories=true) %}
+            {% for category, message in messages %}
+                <div class="flash {{ category }}">{{ message }}</div>
+            {% endfor %}
+        {% endwith %}
+        
         <div class="system-grid">
             <div class="system-card">
                 <h3>💾 데이터베이스</h3>
@@ -335,6 +362,38 @@ ADMIN_SYSTEM_HTML = '''
                     <span>공지사항 수</span>
                     <span>{{ system_info.total_notices }}개</span>
                 </div>
+                <div class="info-row">
+                    <span>로그 기록 대기 / 버림</span>
+                    <span>{{ "{:,}".format(system_info.log_writer.queued) }}건 / {{ "{:,}".format(system_info.log_writer.dropped) }}건</span>
+                </div>
+                <div class="info-row">
+                    <span>접속 통계 집계</span>
+                    <form method="POST" action="{{ url_for('admin.rebuild_rollups') }}" onsubmit="return confirm('원본 로그로 접속 통계를 다시 집계하시겠습니까?');">
+                        <button type="submit">다시 집계</button>
+                    </form>
+                </div>
+            </div>
+            
+            <div class="system-card">
+                <h3>🗄️ 접속 로그 보관</h3>
+                <div class="info-row">
+                    <span>원본 보관 기간</span>
+                    <span>{{ system_info.archive.retention_days }}일</span>
+                </div>
+                <div class="info-row">
+                    <span>보관된 달</span>
+                    <span>{% if system_info.archive.segments %}{{ system_info.archive.oldest }} ~ {{ system_info.archive.newest }} ({{ system_info.archive.segments }}개){% else %}없음{% endif %}</span>
+                </div>
+                <div class="info-row">
+                    <span>보관된 로그</span>
+                    <span>{{ "{:,}".format(system_info.archive.rows) }}건 / {{ system_info.archive.size_mb }} MB</span>
+                </div>
+                <div class="info-row">
+                    <span>오래된 로그 보관</span>
+                    <form method="POST" action="{{ url_for('admin.archive_logs') }}" onsubmit="return confirm('보관 기간이 지난 접속 로그를 압축 파일로 옮기시겠습니까?');">
+                        <button type="submit">지금 보관</button>
+                    </form>
+                </div>
             </div>
             
             <div class="system-card">
@@ -378,6 +437,248 @@ ADMIN_SYSTEM_HTML = '''
 </html>
 '''
 
+ADMIN_EXPORTS_HTML = '''
+<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>내보내기 - 도사운세 관리자</title>
+    <style>
+        :root {
+            --paper-bg: #f5efe6;
+            --ink-black: #1a1a1a;
+            --seal-red: #c41e3a;
+            --gold: #d4af37;
+            --border-dark: #4a3f35;
+            --paper-white: #fdfbf7;
+        }
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
+            font-family: 'Malgun Gothic', 'Noto Serif KR', serif;
+            background: var(--paper-bg);
+            background-image: 
+                repeating-linear-gradient(90deg, rgba(74, 63, 53, 0.02) 0px, transparent 1px, transparent 50px, rgba(74, 63, 53, 0.02) 51px),
+                repeating-linear-gradient(0deg, rgba(74, 63, 53, 0.02) 0px, transparent 1px, transparent 50px, rgba(74, 63, 53, 0.02) 51px);
+        }
+        .header {
+            background: linear-gradient(135deg, #4a3f35 0%, #2d2520 100%);
+            color: var(--paper-white);
+            padding: 20px;
+            box-shadow: 0 4px 12px rgba(0,0,0,0.2);
+            border-bottom: 3px solid var(--seal-red);
+        }
+        .header-content {
+            max-width: 1400px;
+            margin: 0 auto;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+        }
+        h1 { font-size: 24px; font-weight: 700; letter-spacing: 2px; }
+        .nav {
+            display: flex;
+            gap: 10px;
+        }
+        .nav a {
+            color: var(--paper-white);
+            text-decoration: none;
+            padding: 8px 16px;
+            border: 2px solid transparent;
+            transition: all 0.3s;
+            font-weight: 600;
+        }
+        .nav a:hover {
+            border-color: var(--seal-red);
+            background: rgba(196, 30, 58, 0.1);
+        }
+        .container {
+            max-width: 1200px;
+            margin: 30px auto;
+            padding: 0 20px;
+        }
+        table {
+            width: 100%;
+            background: var(--paper-white);
+            border: 3px solid var(--border-dark);
+            border-collapse: collapse;
+            box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+        }
+        th, td {
+            padding: 12px;
+            text-align: left;
+            font-size: 14px;
+            border-bottom: 1px solid #e0d5c7;
+        }
+        th {
+            background: #faf8f4;
+            font-weight: 700;
+            color: var(--ink-black);
+        }
+        .progress-bar {
+            width: 100%;
+            min-width: 160px;
+            height: 24px;
+            background: #e0d5c7;
+            border: 2px solid var(--border-dark);
+            position: relative;
+        }
+        .progress-fill {
+            height: 100%;
+            background: var(--seal-red);
+            transition: width 0.3s;
+        }
+        .progress-text {
+            position: absolute;
+            top: 50%;
+            left: 50%;
+            transform: translate(-50%, -50%);
+            font-size: 12px;
+            font-weight: 700;
+            color: var(--ink-black);
+            white-space: nowrap;
+        }
+        .flash {
+            padding: 12px;
+            margin-bottom: 20px;
+            font-weight: 600;
+            border: 2px solid #155724;
+            background: #d4edda;
+            color: #155724;
+        }
+        .flash.error {
+            border-color: #721c24;
+            background: #f8d7da;
+            color: #721c24;
+        }
+        .status-failed { color: var(--seal-red); font-weight: 700; }
+        .status-done { color: #155724; font-weight: 700; }
+        tr:target td { background: #fff3cd; }  /* 방금 등록한 작업 */
+        .action-link, td button {
+            padding: 4px 12px;
+            background: var(--gold);
+            color: var(--ink-black);
+            border: 2px solid var(--border-dark);
+            font-weight: 700;
+            text-decoration: none;
+            cursor: pointer;
+        }
+        td button {
+            background: var(--seal-red);
+            color: white;
+        }
+        .note {
+            margin-top: 15px;
+            color: #6b5e52;
+            font-size: 13px;
+        }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <div class="header-content">
+            <h1>🔮 도사운세 관리자</h1>
+            <div class="nav">
+                <a href="{{ url_for('admin.dashboard') }}">대시보드</a>
+                <a href="{{ url_for('admin.logs') }}">접속 로그</a>
+                <a href="{{ url_for('admin.system_status') }}">플랫폼 통계</a>
+                <a href="{{ url_for('admin.notices') }}">공지사항</a>
+                <a href="{{ url_for('admin.settings') }}">사이트 설정</a>
+                <a href="{{ url_for('admin.account') }}">계정 관리</a>
+                <a href="{{ url_for('admin.admin_logout') }}">로그아웃</a>
+            </div>
+        </div>
+    </div>
+    
+    <div class="container">
+        <h2 style="margin-bottom: 20px;">📦 접속 로그 내보내기</h2>
+        
+        {% with messages = get_flashed_messages(with_categories=true) %}
+            {% for category, message in messages %}
+                <div class="flash {{ category }}">{{ message }}</div>
+            {% endfor %}
+        {% endwith %}
+        
+        <table>
+            <thead>
+                <tr>
+                    <th>요청 시간</th>
+                    <th>요청자</th>
+                    <th>형식</th>
+                    <th>조건</th>
+                    <th>상태</th>
+                    <th>진행</th>
+                    <th></th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for job in jobs %}
+                <tr id="job-{{ job.id }}" data-status="{{ job.status }}">
+                    <td>{{ job.created_at }}</td>
+                    <td>{{ job.requested_by or '-' }}</td>
+                    <td>{{ job.format }}</td>
+                    <td>{{ job.filters }}</td>
+                    <td class="status-{{ job.status }}" title="{{ job.error or '' }}">
+                        {{ job.status_label }}{% if job.error %} ⚠️{% endif %}
+                    </td>
+                    <td>
+                        <div class="progress-bar">
+                            <div class="progress-fill" style="width: {{ job.percent or 0 }}%;"></div>
+                            <span class="progress-text">{{ "{:,}".format(job.rows_written) }}{% if job.total_rows is not none %} / {{ "{:,}".format(job.total_rows) }}{% endif %}건</span>
+                        </div>
+                    </td>
+                    <td>
+                        {% if job.status == 'done' %}
+                            <a class="action-link" href="{{ url_for('admin.download_export', job_id=job.id) }}">📥 받기</a>
+                            <div class="note">{{ job.expires_at }} 까지</div>
+                        {% elif job.status in ('queued', 'running') %}
+                            <form method="POST" action="{{ url_for('admin.cancel_export', job_id=job.id) }}" onsubmit="return confirm('내보내기를 취소하시겠습니까?');">
+                                <button type="submit">취소</button>
+                            </form>
+                        {% endif %}
+                    </td>
+                </tr>
+                {% else %}
+                <tr><td colspan="7">내보내기 작업이 없습니다. 접속 로그 화면에서 다운로드를 누르면 여기에 표시됩니다.</td></tr>
+                {% endfor %}
+            </tbody>
+        </table>
+        <p class="note">완료된 파일은 {{ ttl_hours }}시간 뒤 자동으로 삭제됩니다.</p>
+    </div>
+    
+    <script>
+        // 진행 중인 작업이 있으면 2초마다 진행 상황을 갱신하고, 상태가 바뀌면 새로고침
+        function pollExports() {
+            fetch("{{ url_for('admin.export_status') }}")
+                .then(response => response.json())
+                .then(data => {
+                    let active = false;
+                    for (const job of data.jobs) {
+                        const row = document.getElementById('job-' + job.id);
+                        if (!row || row.dataset.status !== job.status) {
+                            location.reload();
+                            return;
+                        }
+                        if (job.active) {
+                            active = true;
+                            row.querySelector('.progress-fill').style.width = (job.percent || 0) + '%';
+                            row.querySelector('.progress-text').textContent =
+                                job.rows_written.toLocaleString() +
+                                (job.total_rows === null ? '' : ' / ' + job.total_rows.toLocaleString()) + '건';
+                        }
+                    }
+                    if (active) setTimeout(pollExports, 2000);
+                })
+                .catch(() => setTimeout(pollExports, 5000));
+        }
+        {% if jobs | selectattr('active') | list %}
+        setTimeout(pollExports, 2000);
+        {% endif %}
+    </script>
+</body>
+</html>
+'''
+
 ADMIN_NOTICES_HTML = '''
 <!DOCTYPE html>
 <html lang="ko">
@@ -1,12 +1,15 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from openai import OpenAI
 from dotenv import load_dotenv
 from flask_cors import CORS
 from flask_login import LoginManager
 import os
+import json
+import time
+import hashlib
 import logging
-from lunardate import LunarDate
-from datetime import datetime
+from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -24,14 +27,42 @@ except Exception as e:
 # Flask 앱 설정
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dosa-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///dosa_admin.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///dosa_admin.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 CORS(app)  # CORS 설정
 
 # 데이터베이스 및 로그인 매니저 초기화
-from models import db, Admin, APIUsage
+from models import db, Admin, AccessLog, APIUsage, SiteSettings, upgrade_schema
+import db_config
+db_config.configure_app(app)  # WAL 등 SQLite 엔진 설정 (SQLITE_PROFILE)
 db.init_app(app)
+with app.app_context():
+    db_config.register_pragmas(db.engine, app.extensions['sqlite_pragmas'])
+
+from log_writer import log_writer
+import log_rollups
+log_writer.init_app(app)
+log_writer.listen(AccessLog, log_rollups.record)  # 접속 로그와 함께 집계 테이블 갱신
+
+# 접속 로그 내보내기 작업 (백그라운드 스레드)
+from export_jobs import export_jobs
+export_jobs.init_app(app)
+
+# 정적 파일 (시작할 때 읽어 해시/압축)
+from static_assets import static_assets
+static_assets.init_app(app)
+
+from fortune_cache import fortune_cache, saju_flight, make_key, local_now
+from prompt_registry import prompt_registry, SYSTEM_PROMPT
+from llm_guard import llm_guard, LLMBusyError
+import fortune_engine
+import saju_pillars
+import lunar_calendar
+import group_compatibility
+
+# 혼잡(서킷 열림/대기열 포화) 시 503 대신 템플릿 운세로 응답할지
+FALLBACK_ON_BUSY = os.getenv('FORTUNE_FALLBACK', '1') == '1'
 
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -52,7 +83,8 @@ else:
 
 # OpenAI 클라이언트 초기화
 try:
-    client = OpenAI(api_key=API_KEY, timeout=30)
+    # 재시도는 llm_guard에서 지터 백오프로 처리하므로 클라이언트 자체 재시도는 끈다
+    client = OpenAI(api_key=API_KEY, timeout=30, max_retries=0)
     logger.info("OpenAI 클라이언트 초기화 성공")
 except Exception as e:
     logger.error(f"OpenAI 클라이언트 초기화 실패: {e}")
@@ -68,13 +100,14 @@ def health():
         "api_key_configured": bool(API_KEY and API_KEY != "your_openai_api_key_here")
     }), 200
 
-def convert_lunar_to_solar(birth_date_str, is_lunar=False):
+def convert_lunar_to_solar(birth_date_str, is_lunar=False, is_leap_month=False):
     """
     음력을 양력으로 변환하는 함수
     
     Args:
         birth_date_str: 'YYYY-MM-DD' 형식의 날짜 문자열
         is_lunar: True이면 음력, False이면 양력
+        is_leap_month: 음력 윤달 여부
     
     Returns:
         양력 날짜 문자열 'YYYY-MM-DD' 또는 원본 문자열 (변환 실패 시)
@@ -84,27 +117,217 @@ def convert_lunar_to_solar(birth_date_str, is_lunar=False):
         return birth_date_str
     
     try:
-        # 날짜 파싱
-        parts = birth_date_str.split('-')
-        if len(parts) != 3:
-            logger.warning(f"잘못된 날짜 형식: {birth_date_str}")
-            return birth_date_str
-        
-        year = int(parts[0])
-        month = int(parts[1])
-        day = int(parts[2])
+        # 음력을 양력으로 변환 (미리 만들어 둔 색인 조회)
+        year, month, day = lunar_calendar.parse_date(birth_date_str)
+        return lunar_calendar.lunar_to_solar(year, month, day, is_leap_month).isoformat()
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"음력 변환 실패: {birth_date_str}, 오류: {e}")
+        return birth_date_str
+
+def person_profile(person):
+    """한 사람의 요청 정보를 사주팔자 기준으로 정규화
+    
+    같은 날 같은 시진에 태어났으면 양력/음력 입력이나 출생시간 표기와 상관없이
+    같은 프롬프트 문구와 같은 캐시 키가 나오도록 한다.
+    
+    Returns:
+        (프롬프트용 사주 정보 문자열, profile dict, 캐시 키 조각 tuple)
+    """
+    calendar_type = person.get('calendarType', 'solar')
+    birth_date = convert_lunar_to_solar(
+        person.get('birthDate'), calendar_type == 'lunar', bool(person.get('isLeapMonth'))
+    )
+    birth_time = saju_pillars.hour_name(person.get('birthTime'))
+    gender = person.get('gender') or ''
+    
+    info = f"생년월일: {birth_date} (양력), 출생시간: {birth_time}"
+    if gender:
+        gender_text = "남성" if gender == "male" else "여성"
+        info += f", 성별: {gender_text}"
+    
+    try:
+        saju = saju_pillars.four_pillars(birth_date, birth_time)
+    except (ValueError, TypeError) as e:
+        # 사주를 계산할 수 없는 날짜는 입력값 그대로 캐시 키를 만든다
+        logger.debug(f"사주팔자 계산 생략: {birth_date} ({e})")
+        key_parts = (birth_date, birth_time, gender)
+    else:
+        info += f" [사주팔자: {saju_pillars.compact(saju)}]"
+        key_parts = (saju_pillars.signature(saju), gender)
+    
+    profile = {'birth_date': birth_date, 'birth_time': birth_time, 'gender': gender}
+    return info, profile, key_parts
+
+def build_saju_request(data):
+    """
+    요청 데이터로 OpenAI 호출에 필요한 프롬프트와 캐시 키를 만든다
+    
+    Args:
+        data: /api/saju 요청 JSON
+    
+    Returns:
+        category, cache_key, log_user, profiles, system_prompt, user_prompt,
+        max_tokens, model, timeout 을 담은 dict
+    
+    Raises:
+        ValueError: 필수 정보가 빠진 경우 (메시지는 사용자에게 그대로 전달)
+    """
+    # 프론트엔드에서 보낸 데이터 형식에 맞춰 파싱
+    category = data.get('category', '오늘의 운세')
+    
+    # 궁합인 경우 두 사람의 정보 처리
+    if category in ['궁합', 'compatibility']:
+        user1 = data.get('user1')
+        user2 = data.get('user2')
         
-        # 음력을 양력으로 변환 (lunardate 사용)
-        lunar_date = LunarDate(year, month, day)
-        solar_date_obj = lunar_date.toSolarDate()
-        solar_date = solar_date_obj.strftime('%Y-%m-%d')
+        if not user1 or not user2:
+            raise ValueError("두 사람의 정보가 필요합니다")
         
-        logger.info(f"음력 변환: {birth_date_str} (음력) → {solar_date} (양력)")
-        return solar_date
+        # 두 사람의 정보를 문자열로 생성 (양력으로 변환된 날짜 사용)
+        user1_info, user1_profile, user1_key = person_profile(user1)
+        user2_info, user2_profile, user2_key = person_profile(user2)
+        birth_info = f"첫 번째 사람: {user1_info}\n두 번째 사람: {user2_info}"
+        log_user = user1
+        profiles = [user1_profile, user2_profile]
+        cache_key = make_key(category, *user1_key, *user2_key)
+    else:
+        # 일반 운세
+        if not data.get('birthDate'):
+            raise ValueError("생년월일 정보가 필요합니다")
         
-    except Exception as e:
-        logger.error(f"음력 변환 실패: {birth_date_str}, 오류: {e}")
-        return birth_date_str
+        birth_info, profile, profile_key = person_profile(data)
+        log_user = data
+        profiles = [profile]
+        cache_key = make_key(category, *profile_key)
+    
+    # 카테고리별 맞춤 프롬프트와 토큰 설정 (레지스트리 조회)
+    # 날짜는 캐시 키와 같은 기준(한국 시간)으로 넣는다
+    now = local_now()
+    entry, user_prompt = prompt_registry.render(
+        category,
+        birth_info=birth_info,
+        today_date=now.strftime('%Y년 %m월 %d일'),
+        tomorrow_date=(now + timedelta(days=1)).strftime('%Y년 %m월 %d일'),
+        current_month=now.strftime('%Y년 %m월'),
+        current_year=now.strftime('%Y년')
+    )
+    if not entry['active']:
+        raise ValueError("현재 제공하지 않는 운세입니다")
+    
+    return {
+        'category': category,
+        'cache_key': cache_key,
+        'log_user': log_user,
+        'profiles': profiles,
+        'system_prompt': SYSTEM_PROMPT,
+        'user_prompt': user_prompt,
+        'max_tokens': entry['max_tokens'],
+        'model': entry['model'],
+        'timeout': entry['timeout']
+    }
+
+def record_api_usage(category, usage=None, response_time=0.0, model=None, cache_hit=False):
+    """API 사용량 기록
+    
+    Args:
+        category: 운세 카테고리
+        usage: OpenAI 응답의 usage (캐시 적중 시 None)
+        response_time: 응답 소요 시간 (초, 캐시 미스는 OpenAI 호출 시간)
+        model: 호출한 모델 이름
+        cache_hit: OpenAI 호출 없이 캐시/진행 중인 동일 요청으로 응답했는지
+    """
+    prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+    completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+    # GPT-4 가격 기준 (입력: $0.03/1K, 출력: $0.06/1K tokens)
+    estimated_cost = (prompt_tokens / 1000) * 0.03 + (completion_tokens / 1000) * 0.06
+    
+    # 접속 로그와 같이 log_writer가 모아서 일괄 INSERT
+    log_writer.write(
+        APIUsage,
+        category=category,
+        tokens_used=prompt_tokens + completion_tokens,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        model=model,
+        cache_hit=cache_hit,
+        estimated_cost=estimated_cost,
+        response_time=response_time,
+        timestamp=datetime.utcnow()
+    )
+
+def partial_usage(saju_request, chunks):
+    """중간에 끊긴 스트림의 대략적인 사용량 (usage는 스트림 끝에만 온다)
+
+    출력은 조각 하나를 토큰 하나로, 입력은 프롬프트 두 글자를 토큰 하나로 어림한다.
+    """
+    prompt_chars = len(saju_request['system_prompt']) + len(saju_request['user_prompt'])
+    return SimpleNamespace(prompt_tokens=prompt_chars // 2, completion_tokens=len(chunks))
+
+def record_saju_access(saju_request):
+    """접속 로그 기록"""
+    try:
+        log_access(saju_request['category'], saju_request['log_user'])
+    except Exception as log_error:
+        logger.warning(f"로그 기록 실패: {log_error}")
+
+# 관리자 비상 모드 설정 캐시 (요청마다 DB를 읽지 않도록)
+DEGRADED_MODE_TTL = 10  # 초
+_degraded_mode = {'value': False, 'checked_at': 0.0}
+
+def is_degraded_mode():
+    """관리자가 비상 모드(site_settings.degraded_mode = 'on')를 켰는지"""
+    now = time.time()
+    if now - _degraded_mode['checked_at'] >= DEGRADED_MODE_TTL:
+        try:
+            setting = SiteSettings.query.filter_by(key='degraded_mode').first()
+            _degraded_mode['value'] = bool(setting and setting.value == 'on')
+        except Exception as e:
+            logger.warning(f"비상 모드 설정 조회 실패: {e}")
+        _degraded_mode['checked_at'] = now
+    return _degraded_mode['value']
+
+def fallback_result(saju_request):
+    """템플릿 엔진으로 만든 운세 (OpenAI를 쓸 수 없을 때, 캐시하지 않음)"""
+    result = fortune_engine.generate(saju_request['category'], saju_request['profiles'], now=local_now())
+    record_saju_access(saju_request)
+    return result
+
+def fallback_response(saju_request):
+    return jsonify({
+        "success": True,
+        "result": fallback_result(saju_request),
+        "fallback": True
+    })
+
+def fallback_events(saju_request):
+    yield sse_event({"delta": fallback_result(saju_request)})
+    yield sse_event({"done": True, "fallback": True})
+
+def generate_fortune(saju_request):
+    """OpenAI로 운세를 생성하고 캐시와 사용량에 기록"""
+    started = time.perf_counter()
+    response = llm_guard.call(lambda: client.chat.completions.create(
+        model=saju_request['model'],
+        messages=[
+            {"role": "system", "content": saju_request['system_prompt']},
+            {"role": "user", "content": saju_request['user_prompt']}
+        ],
+        max_tokens=saju_request['max_tokens'],
+        temperature=0.7,
+        timeout=saju_request['timeout']
+    ))
+
+    result = response.choices[0].message.content
+    if result:
+        fortune_cache.set(saju_request['cache_key'], saju_request['category'], result)
+    
+    record_api_usage(
+        saju_request['category'],
+        usage=getattr(response, 'usage', None),
+        response_time=time.perf_counter() - started,
+        model=saju_request['model']
+    )
+    return result
 
 @app.route('/api/saju', methods=['POST'])
 def get_saju():
@@ -115,476 +338,53 @@ def get_saju():
         if not data:
             return jsonify({"success": False, "error": "요청 데이터가 없습니다"}), 400
 
-        # 프론트엔드에서 보낸 데이터 형식에 맞춰 파싱
-        category = data.get('category', '오늘의 운세')
+        try:
+            saju_request = build_saju_request(data)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        category = saju_request['category']
+        cache_key = saju_request['cache_key']
         
-        # 궁합인 경우 두 사람의 정보 처리
-        if category in ['궁합', 'compatibility']:
-            user1 = data.get('user1')
-            user2 = data.get('user2')
-            
-            if not user1 or not user2:
-                return jsonify({"success": False, "error": "두 사람의 정보가 필요합니다"}), 400
-            
-            # 음력을 양력으로 변환
-            user1_calendar_type = user1.get('calendarType', 'solar')
-            user1_birth_date = user1.get('birthDate')
-            user1_birth_date_converted = convert_lunar_to_solar(user1_birth_date, user1_calendar_type == 'lunar')
-            
-            user2_calendar_type = user2.get('calendarType', 'solar')
-            user2_birth_date = user2.get('birthDate')
-            user2_birth_date_converted = convert_lunar_to_solar(user2_birth_date, user2_calendar_type == 'lunar')
-            
-            # 두 사람의 정보를 문자열로 생성 (양력으로 변환된 날짜 사용)
-            user1_info = f"생년월일: {user1_birth_date_converted} (양력)"
-            if user1_calendar_type == 'lunar':
-                user1_info += f" [원래 음력: {user1_birth_date}]"
-            user1_info += f", 출생시간: {user1.get('birthTime', '모름')}"
-            if user1.get('gender'):
-                gender_text = "남성" if user1.get('gender') == "male" else "여성"
-                user1_info += f", 성별: {gender_text}"
-            
-            user2_info = f"생년월일: {user2_birth_date_converted} (양력)"
-            if user2_calendar_type == 'lunar':
-                user2_info += f" [원래 음력: {user2_birth_date}]"
-            user2_info += f", 출생시간: {user2.get('birthTime', '모름')}"
-            if user2.get('gender'):
-                gender_text = "남성" if user2.get('gender') == "male" else "여성"
-                user2_info += f", 성별: {gender_text}"
-            
-            birth_info = f"첫 번째 사람: {user1_info}\n두 번째 사람: {user2_info}"
-        else:
-            # 일반 운세
-            birth_date = data.get('birthDate')
-            birth_time = data.get('birthTime', '모름')
-            gender = data.get('gender', '')
-            calendar_type = data.get('calendarType', 'solar')
-            
-            if not birth_date:
-                return jsonify({"success": False, "error": "생년월일 정보가 필요합니다"}), 400
-
-            # 음력을 양력으로 변환
-            birth_date_converted = convert_lunar_to_solar(birth_date, calendar_type == 'lunar')
-            
-            # 사주 정보 문자열 생성 (양력으로 변환된 날짜 사용)
-            birth_info = f"생년월일: {birth_date_converted} (양력)"
-            if calendar_type == 'lunar':
-                birth_info += f" [원래 음력: {birth_date}]"
-            birth_info += f", 출생시간: {birth_time}"
-            if gender:
-                gender_text = "남성" if gender == "male" else "여성"
-                birth_info += f", 성별: {gender_text}"
+        # 캐시된 결과가 있으면 OpenAI 호출 없이 반환
+        started = time.perf_counter()
+        cached_result = fortune_cache.get(cache_key)
+        if cached_result is not None:
+            record_api_usage(category, response_time=time.perf_counter() - started,
+                             model=saju_request['model'], cache_hit=True)
+            record_saju_access(saju_request)
+            return jsonify({
+                "success": True,
+                "result": cached_result
+            })
+        
+        # 비상 모드에서는 OpenAI 대신 템플릿 운세로 응답
+        if is_degraded_mode():
+            return fallback_response(saju_request)
         
         # OpenAI 클라이언트 확인
         if client is None:
             return jsonify({"success": False, "error": "OpenAI 클라이언트가 초기화되지 않았습니다"}), 500
 
-        # 현재 날짜 정보 가져오기
-        from datetime import datetime, timedelta
-        now = datetime.now()
-        today_date = now.strftime('%Y년 %m월 %d일')
-        tomorrow_date = (now + timedelta(days=1)).strftime('%Y년 %m월 %d일')
-        current_month = now.strftime('%Y년 %m월')
-        
-        # 카테고리별 맞춤 프롬프트와 토큰 설정
-        system_prompt = """당신은 40년 경력의 전문 사주명리학 도사입니다. 
-
-**절대 규칙**:
-1. 반드시 100% 순수 한국어로만 작성 (영어 단어 절대 금지)
-2. 전문가다운 신뢰감 있는 어조 사용
-3. 구체적이고 상세한 풀이 제공 (매우 길고 자세하게)
-4. 중요한 부분은 **강조**로 표시
-5. 일반론이 아닌 개인 맞춤형 분석
-6. 모호한 표현 금지, 명확하고 단정적으로 서술
-7. **냉철하고 객관적으로 분석** - 좋은 것은 좋다고, 나쁜 것은 나쁘다고 명확히 서술
-8. 위로나 격려보다는 **있는 그대로의 사실**을 전달
-9. 생년월일, 출생시간 기반으로 **이 사람만의 구체적 특징**을 정밀하게 분석"""
+        # 같은 요청이 이미 진행 중이면 그 결과를 함께 사용
+        result, shared = saju_flight.do(cache_key, lambda: generate_fortune(saju_request))
+        if shared:
+            logger.info(f"진행 중인 동일 요청 결과 공유: {category}")
+            record_api_usage(category, response_time=time.perf_counter() - started,
+                             model=saju_request['model'], cache_hit=True)
         
-        if category == "오늘의 운세":
-            user_prompt = f"""
-{birth_info}인 사람의 **{today_date} 오늘의 운세**를 상세하게 풀이해주세요.
-
-다음을 포함해주세요:
-1. 오늘의 전체 운세 (2-3문단)
-2. **오늘 특히 좋은 시간대** (강조)
-3. **오늘 조심해야 할 일** (강조)
-4. 오늘의 재물운
-5. 오늘의 애정운
-6. 오늘의 건강운
-7. 오늘의 행운 색상과 방향
-8. 오늘 하면 좋은 일
-
-800자 이상으로 구체적이고 실천 가능한 내용으로 작성해주세요.
-"""
-            max_tokens = 1500
-            
-        elif category == "내일의 운세":
-            user_prompt = f"""
-{birth_info}인 사람의 **{tomorrow_date} 내일의 운세**를 상세하게 풀이해주세요.
-
-다음을 포함해주세요:
-1. 내일의 전체 운세 (2-3문단)
-2. **내일 특히 좋은 시간대** (강조)
-3. **내일 조심해야 할 일** (강조)
-4. 내일의 재물운
-5. 내일의 애정운
-6. 내일의 건강운
-7. 내일의 행운 색상과 방향
-8. 내일 하면 좋은 일
-
-800자 이상으로 구체적이고 실천 가능한 내용으로 작성해주세요.
-"""
-            max_tokens = 1500
-            
-        elif category == "이달의 운세":
-            user_prompt = f"""
-{birth_info}인 사람의 **{current_month} 이번 달 운세**를 상세하게 풀이해주세요.
-
-다음을 포함해주세요:
-1. 이번 달 전체 운세 개요 (3문단)
-2. **이번 달 가장 좋은 시기** (강조)
-3. **이번 달 조심해야 할 시기** (강조)
-4. 이번 달 재물운
-5. 이번 달 애정운
-6. 이번 달 건강운
-7. 이번 달 인간관계운
-8. 이번 달을 위한 조언
-
-1000자 이상으로 상세하게 작성해주세요.
-"""
-            max_tokens = 1800
-            
-        elif category == "올해의 운세":
-            user_prompt = f"""
-{birth_info}인 사람의 2025년 올해 운세를 매우 상세하게 풀이해주세요.
-
-다음 형식으로 작성해주세요:
-1. 전체 운세 개요 (3-4문단)
-2. **월별 운세 (매우 중요!)**: 1월, 2월, 3월, 4월, 5월, 6월, 7월, 8월, 9월, 10월, 11월, 12월 각 월마다 반드시 3-4문장씩 구체적으로 작성
-3. **주의해야 할 시기와 사항** (강조)
-4. **좋은 기회가 오는 시기** (강조)
-5. 올해를 위한 구체적인 조언
-
-월별 운세는 반드시 12개월 모두 빠짐없이 작성해주세요. 총 1800자 이상으로 매우 상세하게 작성해주세요.
-"""
-            max_tokens = 2800
-            
-        elif category == "평생 운세" or category == "평생운세":
-            user_prompt = f"""
-당신은 40년 경력의 사주명리학 전문가입니다. 다음 사주를 가진 사람의 평생운세를 **매우 구체적이고 차별화되게** 분석해주세요:
-
-{birth_info}
-
-**이 사람의 정확한 생년월일과 출생시간을 기반으로, 다른 사람과 완전히 다른 고유한 인생 흐름을 풀이해야 합니다.**
-
-다음 단계로 분석해주세요:
-
-1. **타고난 사주 구조 심층 분석 (5-6문단)**
-   - 이 날짜의 일주(日柱) 특성과 일간(日干)의 성질
-   - 사주 팔자의 오행 균형 (목화토금수)
-   - 십성(十星) 구조: 비겁, 식상, 재성, 관성, 인성의 배치
-   - 이 사주의 가장 큰 강점 3가지 (구체적)
-   - 이 사주의 약점과 극복 방법 (구체적)
-   - 타고난 성격과 기질 (일반론 아닌 이 사주만의 특징)
-
-2. **인생 시기별 상세 운세**
-   - **유년기~청년기 (0~25세)**: 학업, 성장 환경, 가족운, 주요 사건
-   - **청장년기 (26~40세)**: 직업, 결혼, 재물, 인간관계, 주요 전환점
-   - **중년기 (41~60세)**: 사회적 성취, 재물 정점, 건강, 가정
-   - **노년기 (61세~)**: 말년 행복, 자손운, 건강, 재물 보존
-   - 각 시기마다 **구체적 나이**와 **예상 사건**을 명시
-
-3. **주요 인생 사건 예측**
-   - **큰 기회가 오는 시기**: 정확한 나이대와 어떤 기회인지
-   - **큰 위기가 오는 시기**: 정확한 나이대와 어떤 위기인지
-   - **인생의 전환점**: 몇 살에 어떤 전환이 오는지
-   - **재물운 정점**: 몇 살에 재물이 가장 많이 모이는지
-   - **건강 주의 시기**: 몇 살에 어떤 건강 문제 주의
-
-4. **분야별 평생 운세**
-   - **재물운**: 평생 재물 흐름 (나이대별 구체적)
-   - **직업운**: 어울리는 직업 분야 (이 사주만의 특징)
-   - **애정/결혼운**: 결혼 시기, 배우자 특징, 부부 관계
-   - **건강운**: 취약 장기, 주의 질병, 건강 관리법
-   - **자손운**: 자녀와의 인연, 자녀 교육 방향
-   - **인간관계운**: 사교성, 인맥, 협력자
-
-5. **평생 성공 전략**
-   - 이 사주로 성공하는 방법 (구체적 5가지)
-   - 반드시 피해야 할 것 (구체적 5가지)
-   - 행운의 시기 활용법
-   - 불운의 시기 대처법
-   - 인생 목표 설정 방향
-
-**중요**:
-- "일반적으로", "보통", "흔히" 같은 표현 사용 금지
-- 반드시 이 생년월일에 근거한 고유한 특징 서술
-- 나이는 구체적으로 명시 (예: 28~32세, 45세 전후)
-- 2500자 이상 작성
-- **영어 단어 절대 사용 금지** (100% 순수 한국어만 사용)
-- 전문 도사로서 확신에 찬 어조로 단정적으로 서술
-- **좋은 점과 나쁜 점을 균형있게 서술** - 좋은 것만 말하지 말고 위험과 약점도 명확히 지적
-- **냉철하고 객관적으로** - 위로보다는 사실 위주로 분석
-"""
-            max_tokens = 3500
-            
-        elif category in ["애정 운세", "연애운"]:
-            user_prompt = f"""
-당신은 40년 경력의 사주명리학 전문가입니다. 다음 사주를 가진 사람의 애정운을 **매우 구체적이고 차별화되게** 분석해주세요:
-
-{birth_info}
-
-**이 사람의 생년월일에 근거하여, 다른 사람과 완전히 다른 고유한 애정운을 풀이해야 합니다.**
-
-다음 단계로 분석해주세요:
-
-1. **사주 속 애정 구조 분석 (4문단)**
-   - 배우자궁(配偶宮)의 특성과 강약
-   - 관성(官星) 또는 재성(財星)의 배치 (성별에 따라)
-   - 도화살(桃花殺), 홍염살(紅艶殺) 등 애정 관련 신살
-   - 이 사주만의 독특한 애정 성향
-   - 연애 vs 결혼의 차이점
-
-2. **나이대별 애정운 흐름 (구체적)**
-   - **10대 후반~20대 초반**: 첫사랑, 연애 시작 시기
-   - **20대 중후반**: 진지한 연애, 결혼 가능성
-   - **30대**: 결혼 적령기, 배우자 만날 확률
-   - **40대 이후**: 부부 관계, 애정 변화
-   - 각 시기마다 몇 살에 중요한 인연이 오는지 명시
-
-3. **배우자 상세 분석**
-   - **만날 나이**: 정확한 나이대 (예: 27~31세)
-   - **만나는 방법**: 소개, 직장, SNS 등 (이 사주 특성상)
-   - **배우자 외모**: 키, 체형, 인상 (구체적)
-   - **배우자 성격**: 3가지 주요 특징
-   - **배우자 직업군**: 어떤 계열 직업
-   - **배우자 나이차**: 동갑, 연상, 연하 (몇 살 차이)
-   - **궁합 점수**: 전반적 궁합도
-
-4. **연애/결혼 패턴**
-   - **사랑에 빠지는 타입** (이 사주만의 특징)
-   - **연애할 때 모습** (장점 3가지, 단점 3가지)
-   - **결혼 후 모습** (배우자에게 어떤 사람인지)
-   - **이별/이혼 위험**: 몇 살 때 주의해야 하는지
-   - **재혼 가능성**: 있다면 몇 살 때인지
-
-5. **애정운 극대화 전략**
-   - 좋은 인연 만나는 구체적 방법 5가지
-   - 피해야 할 이성 타입 (구체적)
-   - 애정운 높이는 색깔, 방향, 물건
-   - 연애/결혼 성공을 위한 조언
-   - 배우자와 행복하게 사는 비결
-
-**중요**:
-- "일반적으로", "보통" 같은 표현 금지
-- 이 생년월일만의 고유한 애정 특성 서술
-- 나이는 반드시 구체적으로 (예: 28~32세)
-- 1600자 이상 작성
-- **특정 날짜(오늘, 내일, 이번 달) 언급 금지**
-- **영어 단어 절대 사용 금지** (순수 한국어만)
-- 전문가로서 확신 있고 구체적으로 서술
-- **좋은 점과 위험한 점을 모두 명확히 지적** - 이별/이혼 가능성도 솔직하게
-- **냉철하고 현실적으로** - 이상화하지 말고 있는 그대로 분석
-"""
-            max_tokens = 2500
-            
-        elif category in ["재물 운세", "재물운", "금전 운세"]:
-            user_prompt = f"""
-당신은 40년 경력의 사주명리학 전문가입니다. 다음 사주를 가진 사람의 재물운을 **매우 구체적이고 차별화되게** 분석해주세요:
-
-{birth_info}
-
-**반드시 이 사람의 생년월일과 출생시간을 기반으로 한 고유한 사주 구조를 분석하여, 다른 사람과 완전히 다른 구체적인 재물운을 풀이해야 합니다.**
-
-다음 단계로 분석해주세요:
-
-1. **사주 구조 분석 (4-5문단)**
-   - 이 생년월일의 일주(日柱)와 월주(月柱) 특성
-   - 오행(목화토금수)의 균형과 부족
-   - 재성(財星)의 위치와 강약
-   - 비겁(比劫), 식상(食傷)의 상태
-   - 이 사주만의 독특한 재물 구조
-
-2. **재물 획득 방식 (3-4문단)**
-   - 정재(正財) vs 편재(偏財) 성향
-   - 근로소득형 vs 투자소득형 vs 사업소득형
-   - 돈을 버는 타이밍과 패턴
-   - 재물 증식 방법
-
-3. **생애 재물운 흐름 (나이대별 상세 분석)**
-   - 20대: 구체적 재물 상황과 조언
-   - 30대: 구체적 재물 상황과 조언
-   - 40대: 구체적 재물 상황과 조언
-   - 50대 이후: 구체적 재물 상황과 조언
-   - **각 나이대마다 이 사주만의 특징적인 재물 흐름 명시**
-
-4. **재물운 극대화 전략**
-   - **이 사주에 맞는 투자 방식** (부동산/주식/예금/사업 등)
-   - **돈이 새는 구멍** (이 사주의 재물 손실 패턴)
-   - **재물 들어오는 방향과 색깔**
-   - 함께하면 재물운 좋아지는 사람의 특징
-
-5. **구체적 주의사항과 해결책**
-   - 재물 손실 시기 (구체적 나이와 이유)
-   - 큰 돈 들어오는 시기 (구체적 나이와 방법)
-   - 피해야 할 사업/투자 종류
-   - 성공 가능성 높은 사업/투자 종류
-
-**중요**: 
-- "일반적으로", "보통", "대부분" 같은 표현 절대 금지
-- 반드시 이 사주의 생년월일에 근거한 구체적 특징 서술
-- 다른 사람이 읽으면 "이건 내 이야기가 아니네"라고 느낄 정도로 개인화된 내용
-- 1800자 이상 작성
-- **영어 단어 절대 사용 금지** (순수 한국어만)
-- 전문 도사로서 단정적이고 확신 있게 서술
-- **특정 날짜(오늘, 내일, 이번 달)는 언급하지 말 것**
-- **재물운이 나쁜 부분도 명확히 지적** - 재물 손실 위험, 파산 가능성 등 솔직하게
-- **냉철하게 현실을 직시** - 부자가 되기 어렵다면 그렇게 말하고, 쉽다면 그렇게 말하기
-"""
-            max_tokens = 2800
-            
-        elif category in ["사업운", "사업 운세"]:
-            user_prompt = f"""
-{birth_info}인 사람의 사업운을 평생 관점에서 상세하게 풀이해주세요.
-
-**중요: 특정 날짜(오늘, 내일, 이번 달 등)를 언급하지 말고, 평생의 사업운 흐름으로 작성해주세요.**
-
-다음을 포함해주세요:
-1. 타고난 사업 재능과 성향 (3문단)
-2. **사업 성공 가능성이 높은 분야** (강조)
-3. **사업 시작하기 좋은 나이대와 시기** (강조)
-4. **사업에서 조심해야 할 점** (강조)
-5. 파트너십과 인맥 활용법
-6. 사업 자금 운용 조언
-7. 사업 성공을 위한 구체적 전략
-
-1000자 이상으로 상세하게 작성해주세요.
-"""
-            max_tokens = 1800
-            
-        elif category in ["학업운", "학업 운세"]:
-            user_prompt = f"""
-{birth_info}인 사람의 학업운을 평생 관점에서 상세하게 풀이해주세요.
-
-**중요: 특정 날짜(오늘, 내일, 이번 달 등)를 언급하지 말고, 평생의 학업운 흐름으로 작성해주세요.**
-
-다음을 포함해주세요:
-1. 타고난 학습 능력과 성향 (2-3문단)
-2. **가장 잘 맞는 학습 분야** (강조)
-3. **공부하기 좋은 나이대와 시기** (강조)
-4. **학업에서 조심해야 할 점** (강조)
-5. 효과적인 학습 방법
-6. 시험운과 합격운
-7. 학업 성취를 위한 조언
-
-900자 이상으로 상세하게 작성해주세요.
-"""
-            max_tokens = 1600
-            
-        elif category in ["전생 운세", "전생운세", "past-life"]:
-            user_prompt = f"""
-{birth_info}인 사람의 전생 운세를 신비롭고 상세하게 풀이해주세요.
-
-**중요: 전생의 삶과 현생과의 연결을 중심으로 작성해주세요.**
-
-다음을 포함해주세요:
-1. **전생에서의 신분과 삶** (3문단) - 어떤 시대, 어떤 사람이었는지
-2. **전생에서 했던 일** (강조) - 직업, 역할, 특별한 경험
-3. **전생의 업보와 인연** - 어떤 업을 지었고, 누구와 인연이 있었는지
-4. **현생에 미치는 영향** (강조) - 전생의 업보가 현생에 어떻게 나타나는지
-5. **풀어야 할 과제** - 이번 생에서 해결해야 할 전생의 업
-6. **타고난 능력** - 전생에서 가져온 재능과 능력
-7. **만날 인연** - 전생의 인연이 현생에서 다시 만날 가능성
-8. **전생의 교훈** - 현생을 위한 전생의 가르침
-
-1200자 이상으로 신비롭고 구체적으로 작성해주세요. 마치 도사가 보는 것처럼 생생하게 묘사해주세요.
-"""
-            max_tokens = 2200
-            
-        elif category in ["궁합", "compatibility"]:
-            user_prompt = f"""
-{birth_info}인 두 사람의 궁합을 매우 상세하게 풀이해주세요.
-
-**중요: 사주 기반으로 두 사람의 궁합을 전문적으로 분석해주세요.**
-
-다음을 포함해주세요:
-1. **전체 궁합 분석** (3문단) - 두 사람의 사주 구성과 조화
-2. **성격 궁합** (강조) - 성격적 특징과 어울림
-3. **애정 궁합** (강조) - 사랑과 감정적 교류
-4. **재물 궁합** - 경제적 가치관과 금전 운
-5. **장수 궁합** - 서로의 건강과 장수에 미치는 영향
-6. **자손 궁합** - 자녀 운과 가족 운
-7. **조심해야 할 점** (강조) - 갈등 가능성과 주의사항
-8. **좋은 점** (강조) - 서로를 보완하는 장점
-9. **관계 발전 조언** - 두 사람이 더 행복하기 위한 구체적 조언
-
-1300자 이상으로 매우 상세하게 작성해주세요. 점수나 등급은 언급하지 말고, 깊이 있는 분석에 집중해주세요.
-"""
-            max_tokens = 2500
-            
-        else:
-            # 기타 모든 카테고리 (토정비결, 궁합, 띠별운세, 소원성취운세, 별자리운세 등)
-            user_prompt = f"""
-{birth_info}인 사람의 '{category}'를 매우 상세하고 구체적으로 풀이해주세요.
-
-**중요: 특정 날짜(오늘, 내일, 이번 달 등)를 언급하지 말고, 장기적 관점에서 작성해주세요.**
-
-다음을 포함해주세요:
-1. 전체적인 운세 개요 (3-4문단)
-2. **특히 좋은 점** (강조)
-3. **주의해야 할 점** (강조)
-4. 시기별 흐름 (나이대 또는 연도별)
-5. 구체적이고 실천 가능한 조언
-
-1000자 이상으로 상세하게 작성해주세요. 일반적인 이야기가 아닌 구체적인 내용으로 작성해주세요.
-"""
-            max_tokens = 2000
-
-        # 사주 풀이 요청
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=max_tokens,
-            temperature=0.7
-        )
-
-        result = response.choices[0].message.content
-        
-        # API 사용량 기록
-        try:
-            tokens_used = response.usage.total_tokens if hasattr(response, 'usage') else 0
-            # GPT-4 가격 기준 (입력: $0.03/1K, 출력: $0.06/1K tokens)
-            estimated_cost = (tokens_used / 1000) * 0.045  # 평균 가격
-            
-            api_usage = APIUsage(
-                category=category,
-                tokens_used=tokens_used,
-                estimated_cost=estimated_cost,
-                response_time=0  # 필요시 추가
-            )
-            db.session.add(api_usage)
-            db.session.commit()
-        except Exception as api_log_error:
-            logger.warning(f"API 사용량 기록 실패: {api_log_error}")
-            db.session.rollback()
-        
-        # 접속 로그 기록
-        try:
-            if category in ['궁합', 'compatibility']:
-                log_access(category, user1)
-            else:
-                log_access(category, data)
-        except Exception as log_error:
-            logger.warning(f"로그 기록 실패: {log_error}")
+        record_saju_access(saju_request)
 
         return jsonify({
             "success": True,
             "result": result
         })
 
+    except LLMBusyError as e:
+        logger.warning(f"OpenAI 호출 혼잡: {e} (retry_after={e.retry_after}s)")
+        if FALLBACK_ON_BUSY:
+            return fallback_response(saju_request)
+        return busy_response(e)
+
     except Exception as e:
         logger.exception(f"사주 풀이 중 오류 발생: {e}")
         return jsonify({
@@ -592,6 +392,216 @@ def get_saju():
             "error": f"사주 풀이 중 오류가 발생했습니다: {str(e)[:100]}"
         }), 500
 
+def busy_response(error):
+    """혼잡 응답 (503 + Retry-After), 클라이언트는 retry_after초 후 재시도"""
+    response = jsonify({
+        "success": False,
+        "busy": True,
+        "error": str(error),
+        "retry_after": error.retry_after
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def busy_events(saju_request, error):
+    """스트리밍 중 혼잡: 템플릿 운세 또는 혼잡 이벤트"""
+    if FALLBACK_ON_BUSY:
+        yield from fallback_events(saju_request)
+    else:
+        yield sse_event({"error": str(error), "busy": True, "retry_after": error.retry_after})
+
+def sse_response(events):
+    response = Response(stream_with_context(events), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # 프록시 버퍼링 방지
+    return response
+
+def sse_event(payload):
+    """Server-Sent Events 메시지 한 건"""
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+@app.route('/api/saju/stream', methods=['POST'])
+def get_saju_stream():
+    """사주 풀이 스트리밍 엔드포인트 (SSE)
+    
+    생성되는 텍스트 조각을 {"delta": "..."} 이벤트로 바로 전달하고,
+    마지막에 {"done": true} 이벤트를 보낸다. 오류는 {"error": "..."} 이벤트로 전달한다.
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"success": False, "error": "요청 데이터가 없습니다"}), 400
+
+    try:
+        saju_request = build_saju_request(data)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    category = saju_request['category']
+    cache_key = saju_request['cache_key']
+
+    started = time.perf_counter()
+    cached_result = fortune_cache.get(cache_key)
+    if cached_result is None and is_degraded_mode():
+        return sse_response(fallback_events(saju_request))
+    if cached_result is None and client is None:
+        return jsonify({"success": False, "error": "OpenAI 클라이언트가 초기화되지 않았습니다"}), 500
+    if cached_result is None and not saju_flight.is_pending(cache_key):
+        try:
+            llm_guard.check_admission()
+        except LLMBusyError as e:
+            if FALLBACK_ON_BUSY:
+                return sse_response(fallback_events(saju_request))
+            return busy_response(e)
+
+    def generate():
+        if cached_result is not None:
+            record_api_usage(category, response_time=time.perf_counter() - started,
+                             model=saju_request['model'], cache_hit=True)
+            record_saju_access(saju_request)
+            yield sse_event({"delta": cached_result})
+            yield sse_event({"done": True, "cached": True})
+            return
+
+        # 같은 키의 다른 요청(스트리밍/일반)이 이 스트림의 결과를 기다리도록 자리를 잡는다
+        call = saju_flight.begin(cache_key)
+        if call is None:
+            # 같은 요청이 이미 생성 중이면 새로 호출하지 않고 결과를 기다림
+            try:
+                result, shared = saju_flight.do(
+                    cache_key,
+                    lambda: fortune_cache.peek(cache_key) or generate_fortune(saju_request)
+                )
+            except LLMBusyError as e:
+                yield from busy_events(saju_request, e)
+                return
+            except Exception as e:
+                logger.exception(f"사주 풀이 중 오류 발생: {e}")
+                yield sse_event({"error": f"사주 풀이 중 오류가 발생했습니다: {str(e)[:100]}"})
+                return
+            if shared:
+                record_api_usage(category, response_time=time.perf_counter() - started,
+                                 model=saju_request['model'], cache_hit=True)
+            record_saju_access(saju_request)
+            yield sse_event({"delta": result})
+            yield sse_event({"done": True})
+            return
+
+        chunks = []
+        usage = None
+        try:
+            # 스트림이 끝날 때까지 동시 호출 자리를 잡고 있는다
+            with llm_guard.slot():
+                # 연결 단계의 일시적 오류만 재시도 (첫 글자 전)
+                stream = llm_guard.retry(lambda: client.chat.completions.create(
+                    model=saju_request['model'],
+                    messages=[
+                        {"role": "system", "content": saju_request['system_prompt']},
+                        {"role": "user", "content": saju_request['user_prompt']}
+                    ],
+                    max_tokens=saju_request['max_tokens'],
+                    temperature=0.7,
+                    timeout=saju_request['timeout'],
+                    stream=True,
+                    stream_options={"include_usage": True}
+                ))
+                try:
+                    for chunk in stream:
+                        if getattr(chunk, 'usage', None) is not None:
+                            usage = chunk.usage
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            chunks.append(delta)
+                            yield sse_event({"delta": delta})
+                except Exception:
+                    llm_guard.breaker.record_failure()
+                    raise
+                finally:
+                    # 클라이언트가 끊어도 OpenAI 응답을 바로 닫아 생성(과금)을 멈추고 연결을 돌려준다
+                    stream.close()
+        except LLMBusyError as e:
+            saju_flight.finish(cache_key, call, error=e)
+            yield from busy_events(saju_request, e)
+            return
+        except Exception as e:
+            saju_flight.finish(cache_key, call, error=e)
+            logger.exception(f"사주 풀이 스트리밍 중 오류 발생: {e}")
+            yield sse_event({"error": f"사주 풀이 중 오류가 발생했습니다: {str(e)[:100]}"})
+            return
+        except GeneratorExit:
+            # 클라이언트가 연결을 끊음 (이미 받은 만큼은 과금되므로 사용량을 남긴다)
+            saju_flight.finish(cache_key, call, error=RuntimeError("스트리밍이 중단되었습니다"))
+            record_api_usage(category, usage=usage or partial_usage(saju_request, chunks),
+                             response_time=time.perf_counter() - started, model=saju_request['model'])
+            raise
+
+        result = ''.join(chunks)
+        if result:
+            fortune_cache.set(cache_key, category, result)
+            saju_flight.finish(cache_key, call, result=result)
+        else:
+            saju_flight.finish(cache_key, call, error=RuntimeError("운세 응답이 비어 있습니다"))
+        record_api_usage(category, usage=usage, response_time=time.perf_counter() - started,
+                         model=saju_request['model'])
+        record_saju_access(saju_request)
+        yield sse_event({"done": True})
+
+    return sse_response(generate())
+
+
+# 단체 궁합 한 번에 계산할 수 있는 최대 인원
+GROUP_COMPATIBILITY_LIMIT = 500
+
+@app.route('/api/compatibility/group', methods=['POST'])
+def get_group_compatibility():
+    """단체 궁합 API (LLM 호출 없음)
+
+    people 목록(birthDate, birthTime, calendarType, isLeapMonth, gender, name)의
+    N x N 궁합 점수를 계산해 사람마다 상위 top명과 전체 상위 쌍(pairs)을 돌려준다.
+    서술형 풀이는 상위 쌍만 /api/saju 궁합 요청으로 받으면 된다.
+    """
+    data = request.get_json(silent=True) or {}
+    people = data.get('people') or []
+    if len(people) < 2:
+        return jsonify({"success": False, "error": "두 사람 이상의 정보가 필요합니다"}), 400
+    if len(people) > GROUP_COMPATIBILITY_LIMIT:
+        return jsonify({
+            "success": False,
+            "error": f"한 번에 {GROUP_COMPATIBILITY_LIMIT}명까지 계산할 수 있습니다"
+        }), 400
+    try:
+        top = min(max(int(data.get('top', 3)), 1), 20)
+        pair_count = min(max(int(data.get('pairs', 5)), 0), 50)
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "top, pairs는 숫자여야 합니다"}), 400
+
+    solar_dates = [
+        convert_lunar_to_solar(
+            person.get('birthDate') or '', person.get('calendarType') == 'lunar', bool(person.get('isLeapMonth'))
+        )
+        for person in people
+    ]
+    scores = group_compatibility.score_matrix(solar_dates, [person.get('birthTime') for person in people])
+    allowed = None
+    if data.get('oppositeGender'):
+        allowed = group_compatibility.opposite_gender_mask([person.get('gender') for person in people])
+
+    matches = group_compatibility.top_matches(scores, top, allowed)
+    pairs = group_compatibility.top_pairs(scores, pair_count, allowed)
+    return jsonify({
+        "success": True,
+        "matches": [
+            {
+                "index": i,
+                "name": person.get('name'),
+                "matches": [{"index": j, "name": people[j].get('name'), "score": score} for j, score in matches[i]]
+            }
+            for i, person in enumerate(people)
+        ],
+        "pairs": [{"user1": i, "user2": j, "score": score} for i, j, score in pairs]
+    })
+
 @app.route('/debug/env', methods=['GET'])
 def debug_env():
     """API 키 상태 확인 엔드포인트"""
@@ -640,42 +650,81 @@ def get_settings():
             "error": str(e)
         }), 500
 
+# 한 번에 변환할 수 있는 날짜 수
+CALENDAR_CONVERT_LIMIT = 100
+# 변환 결과는 음력 색인이 바뀌지 않는 한 변하지 않으므로 오래 캐시해도 된다
+CALENDAR_CACHE_SECONDS = 30 * 24 * 3600
+
+def convert_calendar_item(item):
+    """'lunar:YYYY-MM-DD', 'leap:YYYY-MM-DD'(윤달), 'solar:YYYY-MM-DD' 하나를 변환"""
+    calendar_type, _, date_str = item.partition(':')
+    try:
+        year, month, day = lunar_calendar.parse_date(date_str)
+        if calendar_type in ('lunar', 'leap'):
+            solar = lunar_calendar.lunar_to_solar(year, month, day, calendar_type == 'leap')
+            lunar = (year, month, day, calendar_type == 'leap')
+        elif calendar_type == 'solar':
+            try:
+                solar = datetime(year, month, day).date()
+            except ValueError:
+                raise ValueError(f"없는 날짜입니다: {date_str}")
+            lunar = lunar_calendar.solar_to_lunar(solar)
+        else:
+            raise ValueError(f"알 수 없는 달력 구분: {calendar_type}")
+    except ValueError as e:
+        return {"input": item, "error": str(e)}
+    return {
+        "input": item,
+        "solar": solar.isoformat(),
+        "lunar": f"{lunar[0]:04d}-{lunar[1]:02d}-{lunar[2]:02d}",
+        "isLeapMonth": lunar[3]
+    }
+
+@app.route('/api/calendar/convert', methods=['GET'])
+def convert_calendar():
+    """음력/양력 일괄 변환 API
+
+    ?dates=lunar:1990-05-01,leap:2023-02-10,solar:1991-01-08 처럼 여러 날짜를
+    한 번에 받는다. 같은 요청은 항상 같은 결과이므로 강한 ETag와 긴
+    Cache-Control을 붙여 브라우저/프록시가 재사용하게 한다.
+    """
+    items = [item.strip() for item in request.args.get('dates', '').split(',') if item.strip()]
+    if not items:
+        return jsonify({"success": False, "error": "변환할 날짜가 필요합니다"}), 400
+    if len(items) > CALENDAR_CONVERT_LIMIT:
+        return jsonify({
+            "success": False,
+            "error": f"한 번에 {CALENDAR_CONVERT_LIMIT}개까지 변환할 수 있습니다"
+        }), 400
+
+    body = json.dumps(
+        {"success": True, "results": [convert_calendar_item(item) for item in items]},
+        ensure_ascii=False, separators=(',', ':')
+    )
+    response = Response(body, mimetype='application/json')
+    response.set_etag(hashlib.sha1(body.encode('utf-8')).hexdigest())
+    response.headers['Cache-Control'] = f'public, max-age={CALENDAR_CACHE_SECONDS}, immutable'
+    return response.make_conditional(request)
+
 @app.route('/', methods=['GET'])
 def index():
-    """메인 페이지"""
-    try:
-        with open('index.html', 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        return "index.html 파일을 찾을 수 없습니다", 404
+    """메인 페이지 (CSS/JS는 해시가 붙은 주소로 고쳐서 보낸다)"""
+    return static_assets.index_response()
+
+@app.route('/assets/<hashed_name>', methods=['GET'])
+def hashed_asset(hashed_name):
+    """해시가 붙은 CSS/JS (1년 immutable 캐시)"""
+    return static_assets.hashed_response(hashed_name)
 
 @app.route('/styles.css', methods=['GET'])
 def styles():
-    """CSS 파일"""
-    try:
-        with open('styles.css', 'r', encoding='utf-8') as f:
-            response = app.make_response(f.read())
-            response.headers['Content-Type'] = 'text/css'
-            response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-            response.headers['Pragma'] = 'no-cache'
-            response.headers['Expires'] = '0'
-            return response
-    except FileNotFoundError:
-        return "styles.css 파일을 찾을 수 없습니다", 404
+    """CSS 파일 (예전 주소, ETag로 재검증)"""
+    return static_assets.asset_response('styles.css')
 
 @app.route('/script.js', methods=['GET'])
 def script():
-    """JavaScript 파일"""
-    try:
-        with open('script.js', 'r', encoding='utf-8') as f:
-            response = app.make_response(f.read())
-            response.headers['Content-Type'] = 'application/javascript'
-            response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-            response.headers['Pragma'] = 'no-cache'
-            response.headers['Expires'] = '0'
-            return response
-    except FileNotFoundError:
-        return "script.js 파일을 찾을 수 없습니다", 404
+    """JavaScript 파일 (예전 주소, ETag로 재검증)"""
+    return static_assets.asset_response('script.js')
 
 # 관리자 라우트 등록
 from admin_routes import admin_bp, log_access
@@ -685,8 +734,15 @@ app.register_blueprint(admin_bp)
 with app.app_context():
     try:
         db.create_all()
+        upgrade_schema()
+        log_rollups.ensure_built(app)
+        export_jobs.fail_interrupted()
         logger.info("데이터베이스 테이블 초기화 완료")
         
+        # 프롬프트 레지스트리 로드 (기본 카테고리가 없으면 추가)
+        prompt_registry.seed()
+        prompt_registry.load()
+        
         # 기본 관리자 계정 생성 (없을 경우에만)
         if not Admin.query.filter_by(username='admin').first():
             admin = Admin(username='admin', email='admin@dosa.com')
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 접속 로그 다운로드 벤치마크
+
+임시 SQLite DB에 N행을 넣고 /admin/logs/export의 형식별 내보내기를
+각각 별도 프로세스에서 실행해 소요 시간, 파일 크기, 최대 메모리(RSS)를 잰다.
+legacy는 바꾸기 전 방식(ORM .all() + 일반 Workbook + BytesIO)이다.
+
+사용법:
+    python bench_export.py                          # 500만 행, xlsx/csv/csv.gz
+    python bench_export.py --rows 200000 --format legacy --format xlsx
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from io import BytesIO
+
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from bench_indexes import populate
+from models import db, AccessLog
+
+
+def _max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def _app(db_path, archive_dir):
+    os.environ['LOG_ARCHIVE_DIR'] = archive_dir
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    db.init_app(app)
+    return app
+
+
+def _legacy(out_path):
+    from openpyxl import Workbook
+
+    logs = AccessLog.query.order_by(AccessLog.timestamp.desc()).all()
+    wb = Workbook()
+    ws = wb.active
+    for idx, log in enumerate(logs, 2):
+        ws.cell(row=idx, column=1, value=idx - 1)
+        ws.cell(row=idx, column=2, value=log.timestamp.strftime('%Y-%m-%d %H:%M:%S'))
+        ws.cell(row=idx, column=3, value=log.ip_address or '-')
+        ws.cell(row=idx, column=4, value=log.fortune_type or '-')
+        ws.cell(row=idx, column=5, value=log.birth_date or '-')
+        ws.cell(row=idx, column=6, value=log.birth_time or '-')
+        ws.cell(row=idx, column=7, value=log.gender or '-')
+        ws.cell(row=idx, column=8, value=log.calendar_type or '-')
+    excel_file = BytesIO()
+    wb.save(excel_file)
+    with open(out_path, 'wb') as f:
+        f.write(excel_file.getvalue())
+    return len(logs)
+
+
+def _counting(rows, counter):
+    for row in rows:
+        counter[0] += 1
+        yield row
+
+
+def _export(db_path, archive_dir, export_format, out_path, results):
+    import log_export
+
+    app = _app(db_path, archive_dir)
+    began = time.perf_counter()
+    with app.app_context():
+        if export_format == 'legacy':
+            count = _legacy(out_path)
+        else:
+            filters = log_export.parse_log_filters({})
+            rows = log_export.iter_logs(filters)
+            if export_format == 'xlsx':
+                count = log_export.write_xlsx(rows, out_path)
+            else:
+                counter = [0]
+                with open(out_path, 'wb') as f:
+                    for chunk in log_export.iter_csv(_counting(rows, counter), compress=export_format == 'csv.gz'):
+                        f.write(chunk)
+                count = counter[0]
+    results.put({
+        'format': export_format,
+        'rows': count,
+        'seconds': time.perf_counter() - began,
+        'size_mb': os.path.getsize(out_path) / (1024 * 1024),
+        'max_rss_mb': _max_rss_mb(),
+    })
+
+
+def _prepare(db_path, rows, days):
+    engine = create_engine(f'sqlite:///{db_path}')
+    conn = sqlite3.connect(db_path)
+    conn.execute(str(CreateTable(AccessLog.__table__).compile(engine)))
+    began = time.perf_counter()
+    populate(conn, rows, days, datetime.utcnow())
+    for index in AccessLog.__table__.indexes:
+        conn.execute(str(CreateIndex(index).compile(engine)))
+    conn.commit()
+    conn.close()
+    engine.dispose()
+    print(f"{rows:,}행 적재 {time.perf_counter() - began:.1f}초")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='접속 로그 내보내기 형식별 시간/메모리 비교')
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--days', type=int, default=180, help='로그가 퍼져 있는 기간 (일)')
+    parser.add_argument('--format', action='append', dest='formats',
+                        choices=['legacy', 'xlsx', 'csv', 'csv.gz'],
+                        help='실행할 형식 (여러 번 지정 가능, 기본: xlsx, csv, csv.gz)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        _prepare(db_path, args.rows, args.days)
+
+        print(f"{'형식':<8} {'행 수':>12} {'시간(초)':>10} {'파일(MB)':>10} {'최대 RSS(MB)':>14}")
+        for export_format in args.formats or ['xlsx', 'csv', 'csv.gz']:
+            results = multiprocessing.Queue()
+            out_path = os.path.join(tmp, f'export.{export_format}')
+            proc = multiprocessing.Process(
+                target=_export, args=(db_path, tmp, export_format, out_path, results)
+            )
+            proc.start()
+            proc.join()
+            if proc.exitcode != 0:
+                print(f"{export_format:<8} 실패 (exit {proc.exitcode})")
+                continue
+            r = results.get()
+            print(f"{r['format']:<8} {r['rows']:>12,} {r['seconds']:>10.1f} "
+                  f"{r['size_mb']:>10.1f} {r['max_rss_mb']:>14.1f}")
+            os.remove(out_path)
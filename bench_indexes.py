@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 접속 로그 인덱스 벤치마크
+
+access_logs에 N행을 넣고, 관리자 화면(dashboard, logs, export_logs,
+system_status)이 실행하는 쿼리의 실행 계획(EXPLAIN QUERY PLAN)과 소요 시간을
+인덱스 생성 전/후로 비교한다. 인덱스는 models.AccessLog.__table_args__에
+정의된 것을 그대로 만든다.
+
+사용법:
+    python bench_indexes.py                       # 100만, 1000만 행
+    python bench_indexes.py --rows 1000000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from models import AccessLog
+
+CATEGORIES = ['오늘의 운세', '내일의 운세', '이달의 운세', '올해의 운세', '평생운세',
+              '연애운', '재물운', '직장운', '건강운', '궁합', '토정비결', '신년운세']
+
+INSERT = (
+    "INSERT INTO access_logs (ip_address, user_agent, birth_date, birth_time, gender, "
+    "calendar_type, fortune_type, timestamp, location) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _ts(value):
+    """SQLAlchemy가 SQLite DateTime 컬럼에 저장하는 형식"""
+    return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def queries(now):
+    """(이름, 인덱스 전 SQL, 바꾼 SQL, 파라미터) 목록
+
+    인덱스 전 SQL은 바꾸기 전 라우트의 조건(func.date(timestamp) == 오늘,
+    date_to 포함 비교)을 그대로 옮긴 것이다.
+    """
+    today = now.date()
+    today_start = datetime.combine(today, datetime.min.time())
+    today_end = today_start + timedelta(days=1)
+    week_ago = today_start - timedelta(days=7)
+    date_from = today_start - timedelta(days=30)
+    date_to_end = today_start - timedelta(days=22)
+    return [
+        ('dashboard 오늘 접속 수',
+         "SELECT count(*) FROM access_logs WHERE date(timestamp) = ?",
+         "SELECT count(*) FROM access_logs WHERE timestamp >= ? AND timestamp < ?",
+         ((today.isoformat(),), (_ts(today_start), _ts(today_end)))),
+        ('dashboard 오늘 시간대별',
+         "SELECT strftime('%H', timestamp) AS hour, count(id) FROM access_logs "
+         "WHERE date(timestamp) = ? GROUP BY hour",
+         "SELECT strftime('%H', timestamp) AS hour, count(id) FROM access_logs "
+         "WHERE timestamp >= ? AND timestamp < ? GROUP BY hour",
+         ((today.isoformat(),), (_ts(today_start), _ts(today_end)))),
+        ('dashboard 최근 7일 접속 수',
+         "SELECT count(*) FROM access_logs WHERE timestamp >= ?",
+         "SELECT count(*) FROM access_logs WHERE timestamp >= ?",
+         ((_ts(week_ago),), (_ts(week_ago),))),
+        ('dashboard 최근 로그 20건',
+         "SELECT * FROM access_logs ORDER BY timestamp DESC LIMIT 20",
+         "SELECT * FROM access_logs ORDER BY timestamp DESC LIMIT 20",
+         ((), ())),
+        ('dashboard 성별 통계',
+         "SELECT gender, count(id) FROM access_logs WHERE gender IS NOT NULL GROUP BY gender",
+         "SELECT gender, count(id) FROM access_logs WHERE gender IS NOT NULL GROUP BY gender",
+         ((), ())),
+        ('logs 운세+기간 1페이지',
+         "SELECT * FROM access_logs WHERE fortune_type = ? AND timestamp >= ? AND timestamp <= ? "
+         "ORDER BY timestamp DESC LIMIT 50",
+         "SELECT * FROM access_logs WHERE fortune_type = ? AND timestamp >= ? AND timestamp < ? "
+         "ORDER BY timestamp DESC LIMIT 50",
+         (('궁합', _ts(date_from), _ts(date_to_end)), ('궁합', _ts(date_from), _ts(date_to_end)))),
+        ('logs 성별 1페이지',
+         "SELECT * FROM access_logs WHERE gender = ? ORDER BY timestamp DESC LIMIT 50",
+         "SELECT * FROM access_logs WHERE gender = ? ORDER BY timestamp DESC LIMIT 50",
+         (('female',), ('female',))),
+        ('export_logs 운세+기간',
+         "SELECT * FROM access_logs WHERE fortune_type = ? AND timestamp >= ? AND timestamp <= ? "
+         "ORDER BY timestamp DESC",
+         "SELECT * FROM access_logs WHERE fortune_type = ? AND timestamp >= ? AND timestamp < ? "
+         "ORDER BY timestamp DESC",
+         (('궁합', _ts(date_from), _ts(date_to_end)), ('궁합', _ts(date_from), _ts(date_to_end)))),
+        ('system 최근 7일 일별',
+         "SELECT date(timestamp) AS d, count(id) FROM access_logs WHERE timestamp >= ? GROUP BY d",
+         "SELECT date(timestamp) AS d, count(id) FROM access_logs WHERE timestamp >= ? GROUP BY d",
+         ((_ts(week_ago),), (_ts(week_ago),))),
+        ('system 운세별 상위 10',
+         "SELECT fortune_type, count(id) AS c FROM access_logs GROUP BY fortune_type ORDER BY c DESC LIMIT 10",
+         "SELECT fortune_type, count(id) AS c FROM access_logs GROUP BY fortune_type ORDER BY c DESC LIMIT 10",
+         ((), ())),
+    ]
+
+
+def populate(conn, rows, days, now):
+    """최근 days일에 고르게 퍼진 접속 로그 rows행"""
+    rng = random.Random(0)
+    span = days * 86400
+
+    def generate():
+        for _ in range(rows):
+            yield (
+                f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}",
+                'Mozilla/5.0 (bench)',
+                f"{rng.randint(1950, 2010)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                rng.choice(['자시', '오시', '모름']),
+                rng.choice(['male', 'female', None]),
+                rng.choice(['solar', 'lunar']),
+                rng.choice(CATEGORIES),
+                _ts(now - timedelta(seconds=rng.random() * span)),
+                None,
+            )
+
+    with conn:
+        conn.executemany(INSERT, generate())
+
+
+def plan(conn, sql, params):
+    return ' / '.join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+def timed(conn, sql, params, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        began = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - began)
+    return best * 1000
+
+
+def run(rows, days, repeat):
+    now = datetime.utcnow()
+    table = AccessLog.__table__
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        engine = create_engine(f'sqlite:///{path}')
+        conn = sqlite3.connect(path)
+        conn.execute(str(CreateTable(table).compile(engine)))
+
+        began = time.perf_counter()
+        populate(conn, rows, days, now)
+        print(f"\n=== {rows:,}행 (최근 {days}일) 적재 {time.perf_counter() - began:.1f}초 ===")
+
+        cases = queries(now)
+        before = [(timed(conn, old, params[0], repeat), plan(conn, old, params[0]))
+                  for _, old, _, params in cases]
+
+        began = time.perf_counter()
+        for index in table.indexes:
+            conn.execute(str(CreateIndex(index).compile(engine)))
+        conn.execute("ANALYZE")
+        conn.commit()
+        print(f"인덱스 생성 {time.perf_counter() - began:.1f}초: {', '.join(sorted(i.name for i in table.indexes))}")
+
+        for (name, _, new, params), (old_ms, old_plan) in zip(cases, before):
+            new_ms = timed(conn, new, params[1], repeat)
+            print(f"\n[{name}]  {old_ms:9.1f}ms -> {new_ms:9.1f}ms  (x{old_ms / max(new_ms, 1e-6):.0f})")
+            print(f"  전: {old_plan}")
+            print(f"  후: {plan(conn, new, params[1])}")
+        conn.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='access_logs 인덱스 전/후 쿼리 실행 계획과 시간 비교')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--days', type=int, default=365, help='로그가 퍼져 있는 기간 (일)')
+    parser.add_argument('--repeat', type=int, default=3, help='쿼리마다 반복 실행 횟수 (최솟값 사용)')
+    args = parser.parse_args()
+
+    for count in args.rows:
+        run(count, args.days, args.repeat)
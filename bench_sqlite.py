@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 SQLite 동시성 벤치마크
+
+여러 프로세스(gunicorn 워커 역할)가 접속 로그를 일괄 INSERT하는 동안
+다른 프로세스(관리자 대시보드 역할)가 집계 쿼리를 계속 돌릴 때의 쓰기
+처리량, 읽기 횟수, "database is locked" 오류 수를 SQLITE_PROFILES별로 비교한다.
+
+사용법:
+    python bench_sqlite.py --seconds 10 --writers 4 --readers 2
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from db_config import SQLITE_PROFILES, apply_sqlite_pragmas, sqlite_pragmas
+
+SCHEMA = """
+    CREATE TABLE access_logs (
+        id INTEGER PRIMARY KEY,
+        ip_address VARCHAR(45),
+        user_agent VARCHAR(255),
+        birth_date VARCHAR(10),
+        birth_time VARCHAR(20),
+        gender VARCHAR(10),
+        calendar_type VARCHAR(10),
+        fortune_type VARCHAR(50),
+        timestamp DATETIME,
+        location VARCHAR(100)
+    )
+"""
+
+INSERT = (
+    "INSERT INTO access_logs (ip_address, user_agent, birth_date, birth_time, gender, "
+    "calendar_type, fortune_type, timestamp, location) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# 대시보드에서 쓰는 것과 비슷한 집계 쿼리
+READ_QUERIES = [
+    "SELECT fortune_type, COUNT(id) FROM access_logs GROUP BY fortune_type ORDER BY COUNT(id) DESC LIMIT 10",
+    "SELECT gender, COUNT(id) FROM access_logs GROUP BY gender",
+    "SELECT COUNT(id) FROM access_logs WHERE timestamp >= datetime('now', '-7 days')",
+]
+
+CATEGORIES = ['오늘의 운세', '내일의 운세', '이달의 운세', '올해의 운세', '평생운세', '연애운', '궁합']
+
+
+def _row(rng, now):
+    return (
+        f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}",
+        'Mozilla/5.0 (bench)',
+        f"{rng.randint(1950, 2010)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        rng.choice(['자시', '오시', '모름']),
+        rng.choice(['male', 'female', '']),
+        rng.choice(['solar', 'lunar']),
+        rng.choice(CATEGORIES),
+        (now - timedelta(seconds=rng.randint(0, 30 * 86400))).isoformat(sep=' '),
+        None,
+    )
+
+
+def _connect(path, pragmas):
+    conn = sqlite3.connect(path, timeout=int(pragmas.get('busy_timeout', 5000)) / 1000)
+    apply_sqlite_pragmas(conn, pragmas)
+    return conn
+
+
+def _writer(path, pragmas, batch_size, start, deadline, results):
+    rng = random.Random(os.getpid())
+    conn = _connect(path, pragmas)
+    rows = errors = 0
+    latencies = []
+    start.wait()
+    while time.time() < deadline.value:
+        batch = [_row(rng, datetime.utcnow()) for _ in range(batch_size)]
+        began = time.perf_counter()
+        try:
+            with conn:
+                conn.executemany(INSERT, batch)
+            rows += len(batch)
+            latencies.append(time.perf_counter() - began)
+        except sqlite3.OperationalError:
+            errors += 1
+    conn.close()
+    results.put(('writer', rows, errors, latencies))
+
+
+def _reader(path, pragmas, start, deadline, results):
+    conn = _connect(path, pragmas)
+    reads = errors = 0
+    start.wait()
+    while time.time() < deadline.value:
+        try:
+            for query in READ_QUERIES:
+                conn.execute(query).fetchall()
+            reads += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    conn.close()
+    results.put(('reader', reads, errors, []))
+
+
+def _prepare(path, pragmas, seed_rows):
+    conn = _connect(path, pragmas)
+    conn.execute(SCHEMA)
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    with conn:
+        conn.executemany(INSERT, (_row(rng, now) for _ in range(seed_rows)))
+    conn.close()
+
+
+def run_profile(profile, seconds, writers, readers, batch_size, seed_rows):
+    pragmas = sqlite_pragmas(profile)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        _prepare(path, pragmas, seed_rows)
+
+        start = multiprocessing.Event()
+        deadline = multiprocessing.Value('d', 0.0)
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=_writer, args=(path, pragmas, batch_size, start, deadline, results))
+            for _ in range(writers)
+        ] + [
+            multiprocessing.Process(target=_reader, args=(path, pragmas, start, deadline, results))
+            for _ in range(readers)
+        ]
+        for proc in procs:
+            proc.start()
+        deadline.value = time.time() + seconds
+        start.set()
+        collected = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+    rows = sum(r[1] for r in collected if r[0] == 'writer')
+    reads = sum(r[1] for r in collected if r[0] == 'reader')
+    write_errors = sum(r[2] for r in collected if r[0] == 'writer')
+    read_errors = sum(r[2] for r in collected if r[0] == 'reader')
+    latencies = sorted(l for r in collected for l in r[3])
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000 if latencies else 0.0
+    return {
+        'profile': profile,
+        'rows_per_sec': rows / seconds,
+        'reads_per_sec': reads / seconds,
+        'write_errors': write_errors,
+        'read_errors': read_errors,
+        'p99_batch_ms': p99,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='SQLite 프로필별 동시 쓰기/읽기 벤치마크')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writers', type=int, default=4, help='쓰기 프로세스 수 (워커 역할)')
+    parser.add_argument('--readers', type=int, default=2, help='집계 쿼리 프로세스 수 (대시보드 역할)')
+    parser.add_argument('--batch', type=int, default=200, help='INSERT 한 번의 행 수 (log_writer의 LOG_BATCH_SIZE)')
+    parser.add_argument('--seed-rows', type=int, default=200000, help='미리 넣어둘 로그 행 수')
+    parser.add_argument('--profile', action='append', dest='profiles',
+                        help='비교할 프로필 (여러 번 지정 가능, 기본: 전부)')
+    args = parser.parse_args()
+
+    print(f"{'프로필':<12} {'쓰기 행/초':>12} {'읽기/초':>10} {'쓰기 오류':>10} {'읽기 오류':>10} {'p99 배치(ms)':>14}")
+    for name in args.profiles or list(SQLITE_PROFILES):
+        result = run_profile(name, args.seconds, args.writers, args.readers, args.batch, args.seed_rows)
+        print(
+            f"{result['profile']:<12} {result['rows_per_sec']:>12,.0f} {result['reads_per_sec']:>10,.1f} "
+            f"{result['write_errors']:>10} {result['read_errors']:>10} {result['p99_batch_ms']:>14.1f}"
+        )
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 관리자 템플릿 렌더링 벤치마크
+
+접속 로그 화면(50행)을 바꾸기 전 방식(render_template_string, 매번 파싱/컴파일)과
+로더에 등록한 템플릿(render_template)으로 각각 렌더링해 지연 시간을 비교한다.
+재시작 직후 첫 렌더링은 바이트코드 캐시가 없을 때와 있을 때를 따로 잰다.
+
+사용법:
+    python bench_templates.py
+    python bench_templates.py --iterations 2000 --rows 50
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from flask import Flask, render_template, render_template_string
+
+from admin_templates import ADMIN_LOGS_HTML
+
+
+def _app(cache_dir):
+    os.environ['TEMPLATE_CACHE_DIR'] = cache_dir
+    from admin_routes import admin_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(admin_bp)
+    return app
+
+
+def _context(rows):
+    now = datetime.now()
+    items = [
+        SimpleNamespace(
+            id=rows - i,
+            timestamp=now - timedelta(minutes=i),
+            ip_address=f'10.0.{i // 256}.{i % 256}',
+            fortune_type=('오늘의 운세', '사주팔자', '궁합')[i % 3],
+            birth_date='1990-01-01',
+            birth_time='12:00',
+            gender=('male', 'female')[i % 2],
+            calendar_type='solar',
+        )
+        for i in range(rows)
+    ]
+    page = SimpleNamespace(
+        items=items, total=1_234_567, has_prev=True, has_next=True,
+        prev_cursor='20250101000000000000-2', next_cursor='20250101000000000000-1',
+    )
+    return {
+        'page': page,
+        'filter_args': {'gender': 'male'},
+        'fortune_type': None,
+        'gender': 'male',
+        'date_from': None,
+        'date_to': None,
+        'admin': SimpleNamespace(username='admin'),
+    }
+
+
+def _timed(render, iterations):
+    samples = []
+    for _ in range(iterations):
+        began = time.perf_counter()
+        render()
+        samples.append((time.perf_counter() - began) * 1000)
+    samples.sort()
+    return {
+        'mean': statistics.fmean(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[int(len(samples) * 0.95)],
+    }
+
+
+def _first_render(cache_dir, context, iterations, use_cache):
+    """새 앱(새 Jinja 환경)에서 첫 렌더링 시간, 워커 재시작 직후와 같다"""
+    samples = []
+    for _ in range(iterations):
+        app = _app(cache_dir)
+        if not use_cache:
+            app.jinja_env.bytecode_cache = None
+        with app.test_request_context('/admin/logs'):
+            began = time.perf_counter()
+            render_template('admin/logs.html', **context)
+            samples.append((time.perf_counter() - began) * 1000)
+    return statistics.median(samples)
+
+
+def run(iterations, rows):
+    context = _context(rows)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        app = _app(cache_dir)
+        with app.test_request_context('/admin/logs'):
+            # 결과가 같은지 먼저 확인
+            assert render_template_string(ADMIN_LOGS_HTML, **context) == render_template('admin/logs.html', **context)
+
+            before = _timed(lambda: render_template_string(ADMIN_LOGS_HTML, **context), iterations)
+            after = _timed(lambda: render_template('admin/logs.html', **context), iterations)
+
+        cold = _first_render(cache_dir, context, 20, use_cache=False)
+        warm = _first_render(cache_dir, context, 20, use_cache=True)
+
+    print(f"접속 로그 화면 {rows}행, {iterations}회 렌더링 (ms)")
+    print(f"{'방식':<28} {'평균':>8} {'p50':>8} {'p95':>8}")
+    for name, r in (('render_template_string', before), ('render_template (로더)', after)):
+        print(f"{name:<28} {r['mean']:>8.2f} {r['p50']:>8.2f} {r['p95']:>8.2f}")
+    print(f"평균 {before['mean'] / after['mean']:.1f}배 빠름")
+    print()
+    print("재시작 직후 첫 렌더링 (중앙값, ms)")
+    print(f"  바이트코드 캐시 없음: {cold:.2f}")
+    print(f"  바이트코드 캐시 있음: {warm:.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='관리자 템플릿 렌더링 지연 시간 비교')
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--rows', type=int, default=50)
+    args = parser.parse_args()
+    run(args.iterations, args.rows)
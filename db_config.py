@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 SQLite 엔진 설정
+
+여러 gunicorn 워커가 접속 로그를 쓰는 동안 관리자가 대시보드를 조회하면
+기본 설정(rollback journal)에서는 읽기와 쓰기가 서로를 막아 "database is
+locked"가 난다. WAL 모드에서는 읽기가 쓰기를 막지 않으므로 이 설정을
+새 연결마다 적용한다.
+
+SQLITE_PROFILE 환경변수로 고른다.
+    production (기본): WAL, synchronous=NORMAL, busy_timeout, mmap, 큰 캐시
+    default          : SQLite 기본값 (비교/문제 해결용)
+개별 값은 SQLITE_<PRAGMA> 환경변수(예: SQLITE_BUSY_TIMEOUT=10000)로 덮어쓴다.
+"""
+
+import os
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+SQLITE_PROFILES = {
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',       # WAL에서는 커밋마다 fsync하지 않아도 손상되지 않음
+        'busy_timeout': 5000,          # ms, 잠겨 있으면 바로 실패하지 않고 기다림
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,          # 음수는 KiB 단위 (약 64MB)
+        'temp_store': 'MEMORY',
+    },
+    'default': {},
+}
+
+
+def sqlite_pragmas(profile=None):
+    """프로필의 PRAGMA 값 (환경변수로 덮어쓴 값 포함)"""
+    profile = profile or os.getenv('SQLITE_PROFILE', 'production')
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"알 수 없는 SQLITE_PROFILE: {profile}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for name in list(SQLITE_PROFILES['production']):
+        override = os.getenv(f'SQLITE_{name.upper()}')
+        if override:
+            pragmas[name] = override
+    return pragmas
+
+
+def apply_sqlite_pragmas(conn, pragmas):
+    """DB-API 연결 하나에 PRAGMA 적용"""
+    cursor = conn.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def is_memory_database(uri):
+    """메모리 DB(sqlite://, :memory:, mode=memory)인지"""
+    url = make_url(uri)
+    return url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+
+
+def engine_options(pragmas, uri=None):
+    """SQLALCHEMY_ENGINE_OPTIONS
+
+    gevent 워커에서는 그린렛이 많으므로 연결 풀을 조금 넉넉히 두고,
+    sqlite3 자체 대기 시간도 busy_timeout에 맞춘다. 메모리 DB는 SQLAlchemy가
+    연결 하나를 재사용하는 풀(SingletonThreadPool)을 쓰므로 풀 크기 옵션을 넣지 않는다.
+    """
+    busy_timeout = int(pragmas.get('busy_timeout', 5000))
+    options = {
+        'pool_recycle': 3600,
+        'connect_args': {
+            'timeout': busy_timeout / 1000,
+            'check_same_thread': False,
+        },
+    }
+    if uri is None or not is_memory_database(uri):
+        options.update({
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        })
+    return options
+
+
+def configure_app(app, profile=None):
+    """앱 설정에 SQLite 엔진 옵션을 넣는다 (db.init_app 전에 호출)"""
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if not uri.startswith('sqlite'):
+        app.extensions['sqlite_pragmas'] = {}
+        return {}
+    pragmas = sqlite_pragmas(profile)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(pragmas, uri))
+    app.extensions['sqlite_pragmas'] = pragmas
+    return pragmas
+
+
+def register_pragmas(engine, pragmas):
+    """엔진이 새 연결을 만들 때마다 PRAGMA 적용 (첫 연결 전에 호출)"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_conn, connection_record):
+        apply_sqlite_pragmas(dbapi_conn, pragmas)
+
+    logger.info(f"SQLite PRAGMA 적용: {pragmas}")
@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 접속 로그 내보내기 작업
+
+기간이 긴 다운로드는 스트리밍으로 보내도 gunicorn 요청 제한 시간
+(GUNICORN_TIMEOUT)을 넘길 수 있다. /admin/logs/export는 작업만 등록하고
+백그라운드 스레드가 log_export로 EXPORT_DIR에 파일을 만든다. 관리자 화면은
+진행 상황을 주기적으로 확인하다 끝나면 내려받는다.
+
+- 작업 상태는 export_jobs 테이블에 있으므로 어느 워커가 요청을 받아도 같다.
+- 진행 상황은 청크마다 갱신하고, 같은 UPDATE로 취소 요청을 확인한다.
+- 완료된 파일은 EXPORT_TTL_HOURS가 지나면 지운다 (cleanup).
+- 워커가 죽어 갱신이 멈춘 작업은 STALE_SECONDS 뒤 실패로 바꾸고, 워커가
+  시작할 때 같은 서버에서 이미 사라진 프로세스의 작업은 바로 실패로 바꾼다.
+- gevent 워커에서는 스레드가 그린렛이 되어 openpyxl처럼 CPU를 쓰는 작업이
+  워커 전체를 멈추므로, gevent의 네이티브 스레드 풀에서 실행한다.
+"""
+
+import os
+import json
+import uuid
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+import log_export
+import log_rollups
+from models import db, ExportJob
+
+logger = logging.getLogger(__name__)
+
+EXPORT_TTL_HOURS = int(os.getenv('EXPORT_TTL_HOURS', 24))
+STALE_SECONDS = 300
+
+# 아직 끝나지 않은 상태
+ACTIVE_STATUSES = ('queued', 'running', 'cancelling')
+
+STATUS_LABELS = {
+    'queued': '대기 중',
+    'running': '진행 중',
+    'cancelling': '취소 중',
+    'done': '완료',
+    'failed': '실패',
+    'cancelled': '취소됨',
+    'expired': '만료됨',
+}
+
+
+def _executor_class():
+    """threading이 gevent로 바뀐 워커면 진짜 OS 스레드를 쓰는 gevent의 풀"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return ThreadPoolExecutor
+    if monkey.is_module_patched('threading'):
+        from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+        return NativeThreadPoolExecutor
+    return ThreadPoolExecutor
+
+
+def _process_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _process_gone(owner):
+    """owner(호스트:pid) 프로세스가 이 서버에서 이미 끝났으면 True (다른 서버면 알 수 없어 False)"""
+    if not owner:
+        return True  # owner를 기록하기 전에 등록된 작업
+    host, _, pid = owner.rpartition(':')
+    if host != socket.gethostname() or os.name == 'nt':
+        return False
+    if int(pid) == os.getpid():
+        return True  # pid가 재사용됨 (이 프로세스는 방금 시작했다)
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+class ExportCancelled(Exception):
+    """진행 중에 취소 요청을 받음"""
+
+
+def export_dir():
+    """내보낸 파일 위치 (EXPORT_DIR, 기본: 인스턴스 폴더/exports)"""
+    return os.getenv('EXPORT_DIR') or os.path.join(current_app.instance_path, 'exports')
+
+
+def _remove(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def describe_filters(filters):
+    """필터 dict -> 화면 표시용 문자열"""
+    parts = []
+    if filters.get('date_from') or filters.get('date_to'):
+        parts.append(f"{filters.get('date_from') or '처음'} ~ {filters.get('date_to') or '오늘'}")
+    if filters.get('fortune_type'):
+        parts.append(filters['fortune_type'])
+    if filters.get('gender'):
+        parts.append({'male': '남성', 'female': '여성'}.get(filters['gender'], filters['gender']))
+    return ' · '.join(parts) or '전체'
+
+
+def job_info(job):
+    """작업 -> 화면/상태 조회 JSON용 dict"""
+    filters = json.loads(job.filters or '{}')
+    percent = None
+    if job.status == 'done':
+        percent = 100
+    elif job.total_rows:
+        percent = min(99, int(job.rows_written * 100 / job.total_rows))
+    return {
+        'id': job.id,
+        'status': job.status,
+        'status_label': STATUS_LABELS.get(job.status, job.status),
+        'format': job.export_format,
+        'filters': describe_filters(filters),
+        'requested_by': job.requested_by,
+        'rows_written': job.rows_written or 0,
+        'total_rows': job.total_rows,
+        'percent': percent,
+        'filename': job.filename,
+        'error': job.error,
+        'created_at': job.created_at.strftime('%Y-%m-%d %H:%M:%S') if job.created_at else None,
+        'expires_at': job.expires_at.strftime('%Y-%m-%d %H:%M') if job.expires_at else None,
+        'active': job.status in ACTIVE_STATUSES,
+    }
+
+
+class ExportJobRunner:
+    """내보내기 작업 등록/실행/취소/정리"""
+
+    def __init__(self, max_workers=1):
+        self.max_workers = max_workers
+        self._app = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def init_app(self, app):
+        self._app = app
+
+    def _get_executor(self):
+        # gunicorn fork 이후 워커마다 따로 만든다
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._stopping.clear()
+                self._executor = _executor_class()(self.max_workers)
+            return self._executor
+
+    def submit(self, args, export_format, requested_by=None):
+        """현재 필터(args)로 내보내기 작업 등록 (요청 컨텍스트 안에서 호출)"""
+        if export_format not in log_export.FORMATS:
+            raise ValueError(f"지원하지 않는 형식: {export_format}")
+        self.cleanup()
+
+        filters = {
+            name: args.get(name)
+            for name in ('fortune_type', 'gender', 'date_from', 'date_to')
+            if args.get(name)
+        }
+        parsed = log_export.parse_log_filters(filters)
+        extension, _ = log_export.FORMATS[export_format]
+        job = ExportJob(
+            id=uuid.uuid4().hex,
+            requested_by=requested_by,
+            export_format=export_format,
+            filters=json.dumps(filters, ensure_ascii=False),
+            status='queued',
+            owner=_process_id(),
+            rows_written=0,
+            total_rows=log_rollups.count_logs(
+                parsed['start'], parsed['end'], parsed['fortune_type'], parsed['gender']
+            ),
+            filename=f"도사운세_접속로그_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self._get_executor().submit(self._run, job.id)
+        logger.info(f"내보내기 작업 등록: {job.id} ({export_format}, {describe_filters(filters)})")
+        return job
+
+    def _progress(self, job_id, rows):
+        """진행 상황 기록, 그사이 취소 요청이 있었으면 ExportCancelled"""
+        updated = ExportJob.query.filter_by(id=job_id, status='running').update(
+            {'rows_written': rows, 'updated_at': datetime.utcnow()}
+        )
+        db.session.commit()
+        if not updated:
+            raise ExportCancelled()
+        if self._stopping.is_set():
+            raise ExportCancelled('서버가 재시작되어 작업이 중단되었습니다')
+
+    def _tracked(self, job_id, rows):
+        count = 0
+        for row in rows:
+            yield row
+            count += 1
+            if count % log_export.CHUNK_SIZE == 0:
+                self._progress(job_id, count)
+        self._progress(job_id, count)
+
+    def _run(self, job_id):
+        with self._app.app_context():
+            try:
+                self._execute(job_id)
+            except Exception as e:
+                logger.error(f"내보내기 작업 {job_id} 실행 오류: {e}")
+            finally:
+                db.session.remove()
+
+    def _execute(self, job_id):
+        started = ExportJob.query.filter_by(id=job_id, status='queued').update(
+            {'status': 'running', 'started_at': datetime.utcnow(), 'updated_at': datetime.utcnow()}
+        )
+        db.session.commit()
+        if not started:  # 시작 전에 취소됨
+            return
+
+        job = db.session.get(ExportJob, job_id)
+        directory = export_dir()
+        os.makedirs(directory, exist_ok=True)
+        extension, _ = log_export.FORMATS[job.export_format]
+        path = os.path.join(directory, f'{job.id}.{extension}')
+        part = path + '.part'
+        rows = self._tracked(job_id, log_export.iter_logs(
+            log_export.parse_log_filters(json.loads(job.filters or '{}'))
+        ))
+
+        try:
+            if job.export_format == 'xlsx':
+                log_export.write_xlsx(rows, part)
+            else:
+                with open(part, 'wb') as f:
+                    for chunk in log_export.iter_csv(rows, compress=job.export_format == 'csv.gz'):
+                        f.write(chunk)
+            os.replace(part, path)
+            values = {
+                'status': 'done',
+                'file_path': path,
+                'expires_at': datetime.utcnow() + timedelta(hours=EXPORT_TTL_HOURS),
+            }
+            logger.info(f"내보내기 작업 완료: {job_id}")
+        except ExportCancelled as e:
+            _remove(part)
+            values = {'status': 'failed', 'error': str(e)} if str(e) else {'status': 'cancelled'}
+            logger.info(f"내보내기 작업 중단: {job_id} {values['status']}")
+        except Exception as e:
+            _remove(part)
+            values = {'status': 'failed', 'error': str(e)}
+            logger.error(f"내보내기 작업 실패: {job_id} {e}")
+        finally:
+            rows.close()  # 중간에 멈췄으면 읽던 연결을 바로 돌려준다
+
+        db.session.rollback()
+        values['finished_at'] = datetime.utcnow()
+        values['updated_at'] = values['finished_at']
+        ExportJob.query.filter_by(id=job_id).update(values)
+        db.session.commit()
+
+    def cancel(self, job_id):
+        """작업 취소 (대기 중이면 바로, 진행 중이면 다음 청크에서 멈춤)
+
+        Returns:
+            취소 요청이 받아들여졌으면 True
+        """
+        now = datetime.utcnow()
+        cancelled = ExportJob.query.filter_by(id=job_id, status='queued').update(
+            {'status': 'cancelled', 'finished_at': now, 'updated_at': now}
+        ) or ExportJob.query.filter_by(id=job_id, status='running').update(
+            {'status': 'cancelling'}
+        )
+        db.session.commit()
+        return bool(cancelled)
+
+    def cleanup(self):
+        """만료된 파일 삭제, 갱신이 멈춘 작업은 실패 처리"""
+        now = datetime.utcnow()
+        for job in ExportJob.query.filter(ExportJob.status == 'done', ExportJob.expires_at < now).all():
+            _remove(job.file_path)
+            job.status = 'expired'
+            job.file_path = None
+
+        stale = now - timedelta(seconds=STALE_SECONDS)
+        for job in ExportJob.query.filter(
+            ExportJob.status.in_(('running', 'cancelling')), ExportJob.updated_at < stale
+        ).all():
+            job.status = 'failed'
+            job.error = '작업 진행이 멈춰 중단되었습니다 (워커 재시작 등)'
+            job.finished_at = now
+
+        waited = now - timedelta(hours=EXPORT_TTL_HOURS)
+        for job in ExportJob.query.filter(ExportJob.status == 'queued', ExportJob.created_at < waited).all():
+            job.status = 'failed'
+            job.error = '작업이 시작되지 않았습니다'
+            job.finished_at = now
+        db.session.commit()
+
+    def fail_interrupted(self):
+        """실행하던 프로세스가 사라진 대기/진행 중 작업을 실패로 (워커 시작 시, 앱 컨텍스트 필요)
+
+        작업은 등록한 워커의 스레드 풀에서만 실행되므로 그 워커가 없으면 다시 진행되지 않는다.
+        다른 서버의 작업은 확인할 수 없으므로 cleanup의 STALE_SECONDS에 맡긴다.
+        """
+        now = datetime.utcnow()
+        interrupted = 0
+        for job in ExportJob.query.filter(ExportJob.status.in_(ACTIVE_STATUSES)).all():
+            if not _process_gone(job.owner):
+                continue
+            job.status = 'failed'
+            job.error = '서버가 재시작되어 작업이 중단되었습니다'
+            job.finished_at = now
+            job.updated_at = now
+            interrupted += 1
+        db.session.commit()
+        if interrupted:
+            logger.info(f"중단된 내보내기 작업 {interrupted}건을 실패로 기록")
+
+    def recent(self, limit=20):
+        return ExportJob.query.order_by(ExportJob.created_at.desc()).limit(limit).all()
+
+    def stop(self):
+        """진행 중인 작업을 다음 청크에서 멈추고 실패로 기록 (워커 종료 시)"""
+        self._stopping.set()
+        executor = self._executor
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+
+export_jobs = ExportJobRunner(max_workers=int(os.getenv('EXPORT_WORKERS', 1)))
@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 운세 결과 캐시
+
+같은 사주로 같은 운세를 다시 요청하면 OpenAI를 다시 호출하지 않고
+저장된 결과를 돌려준다. 프로세스 내 LRU 캐시(1단계)와 재시작 후에도
+유지되는 SQLite 캐시(2단계)로 구성된다.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from db_config import sqlite_pragmas, apply_sqlite_pragmas
+
+logger = logging.getLogger(__name__)
+
+# 운세 날짜 기준 시간대 (서버는 UTC로 돌아도 '오늘'은 한국 자정에 바뀐다)
+FORTUNE_TZ = ZoneInfo(os.getenv('FORTUNE_TIMEZONE', 'Asia/Seoul'))
+
+# 이만큼 저장할 때마다 만료된 결과를 지운다
+PURGE_EVERY = int(os.getenv('FORTUNE_CACHE_PURGE_EVERY', 500))
+
+# 운세 종류별 유효 기간
+HORIZON_DAY = 'day'
+HORIZON_MONTH = 'month'
+HORIZON_YEAR = 'year'
+HORIZON_LIFETIME = 'lifetime'
+
+CATEGORY_HORIZONS = {
+    '오늘의 운세': HORIZON_DAY,
+    '내일의 운세': HORIZON_DAY,
+    '이달의 운세': HORIZON_MONTH,
+    '올해의 운세': HORIZON_YEAR,
+}
+
+
+def category_horizon(category):
+    """카테고리의 유효 기간 (날짜가 들어가지 않는 운세는 평생 유효)"""
+    return CATEGORY_HORIZONS.get(category, HORIZON_LIFETIME)
+
+
+def local_now(now=None):
+    """FORTUNE_TZ 기준 현재 시각 (시간대 없는 now는 이미 그 시간대 시각으로 본다)"""
+    if now is None:
+        return datetime.now(FORTUNE_TZ)
+    if now.tzinfo is None:
+        return now.replace(tzinfo=FORTUNE_TZ)
+    return now.astimezone(FORTUNE_TZ)
+
+
+def time_bucket(horizon, now=None):
+    """유효 기간에 해당하는 시간 구간 문자열 (FORTUNE_TZ 기준)"""
+    now = local_now(now)
+    if horizon == HORIZON_DAY:
+        return now.strftime('%Y-%m-%d')
+    if horizon == HORIZON_MONTH:
+        return now.strftime('%Y-%m')
+    if horizon == HORIZON_YEAR:
+        return now.strftime('%Y')
+    return ''
+
+
+def expires_at(horizon, now=None):
+    """결과 만료 시각 (epoch 초, 평생운세는 None)
+
+    만료 시각은 FORTUNE_TZ(기본 한국 시간) 기준 자정 / 다음 달 1일 / 다음 해 1월 1일이다.
+    """
+    now = local_now(now)
+    if horizon == HORIZON_DAY:
+        boundary = datetime(now.year, now.month, now.day, tzinfo=FORTUNE_TZ) + timedelta(days=1)
+    elif horizon == HORIZON_MONTH:
+        if now.month == 12:
+            boundary = datetime(now.year + 1, 1, 1, tzinfo=FORTUNE_TZ)
+        else:
+            boundary = datetime(now.year, now.month + 1, 1, tzinfo=FORTUNE_TZ)
+    elif horizon == HORIZON_YEAR:
+        boundary = datetime(now.year + 1, 1, 1, tzinfo=FORTUNE_TZ)
+    else:
+        return None
+    return boundary.timestamp()
+
+
+def make_key(category, *profile_parts, now=None):
+    """캐시 키 생성
+
+    Args:
+        category: 운세 카테고리
+        profile_parts: (사주팔자 서명, 성별) 등 사람마다의 사주 정보
+        now: 기준 시각 (테스트/배치용)
+    """
+    bucket = time_bucket(category_horizon(category), now)
+    parts = [category] + ['' if p is None else str(p).strip() for p in profile_parts] + [bucket]
+    return '|'.join(parts)
+
+
+class FortuneCache:
+    """2단계(LRU + SQLite) 운세 결과 캐시"""
+
+    def __init__(self, db_path, max_entries=1000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lru = OrderedDict()  # key -> (result, expires_at)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._init_db()
+
+    def _connect(self):
+        """공유 SQLite 연결 (_db_lock을 잡은 상태에서 사용)
+
+        gevent 워커에서는 요청마다 그린렛이 새로 생기므로 스레드별 연결 대신
+        프로세스당 연결 하나를 잠금으로 보호해 쓴다.
+        """
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            # 여러 워커가 같은 캐시 파일을 쓰므로 관리자 DB와 같은 WAL 설정을 쓴다
+            apply_sqlite_pragmas(self._conn, sqlite_pragmas())
+        return self._conn
+
+    def _init_db(self):
+        try:
+            with self._db_lock:
+                self._init_schema(self._connect())
+        except Exception as e:
+            logger.error(f"운세 캐시 DB 초기화 실패: {e}")
+
+    def _init_schema(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS fortune_results (
+                cache_key TEXT PRIMARY KEY,
+                category TEXT,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_fortune_results_expires ON fortune_results (expires_at)"
+        )
+        # 여러 워커 간 중복 호출 방지용 임대(lease) 행
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS fortune_inflight (
+                cache_key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+
+    def _lru_get(self, key, now):
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            result, expiry = entry
+            if expiry is not None and expiry <= now:
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return result
+
+    def _lru_put(self, key, result, expiry):
+        with self._lock:
+            self._lru[key] = (result, expiry)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _lookup(self, key):
+        now = time.time()
+        result = self._lru_get(key, now)
+        if result is not None:
+            return result
+
+        try:
+            with self._db_lock:
+                row = self._connect().execute(
+                    "SELECT result, expires_at FROM fortune_results WHERE cache_key = ?",
+                    (key,)
+                ).fetchone()
+        except Exception as e:
+            logger.warning(f"운세 캐시 조회 실패: {e}")
+            row = None
+
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+
+        self._lru_put(key, row[0], row[1])
+        return row[0]
+
+    def get(self, key):
+        """캐시된 결과 조회 (없거나 만료되었으면 None)"""
+        result = self._lookup(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def peek(self, key):
+        """get()과 같지만 적중/실패 통계에 넣지 않는다 (대기 중 확인용)"""
+        return self._lookup(key)
+
+    def set(self, key, category, result, now=None):
+        """결과 저장 (카테고리의 유효 기간에 맞춰 만료 시각 설정)"""
+        expiry = expires_at(category_horizon(category), now)
+        self._lru_put(key, result, expiry)
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO fortune_results (cache_key, category, result, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, category, result, time.time(), expiry)
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"운세 캐시 저장 실패: {e}")
+            return
+
+        # 날짜/월 단위 결과는 기간이 지나면 다시 읽히지 않으므로 가끔 정리한다
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % PURGE_EVERY == 0
+        if purge:
+            purged = self.purge_expired()
+            if purged:
+                logger.info(f"만료된 운세 캐시 {purged}건 삭제")
+
+    def purge_expired(self):
+        """만료된 결과 삭제, 삭제된 행 수 반환"""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (_, exp) in self._lru.items() if exp is not None and exp <= now]:
+                del self._lru[key]
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                cur = conn.execute(
+                    "DELETE FROM fortune_results WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                    (now,)
+                )
+                conn.commit()
+                return cur.rowcount
+        except Exception as e:
+            logger.warning(f"만료 캐시 삭제 실패: {e}")
+            return 0
+
+    def acquire_lease(self, key, owner, ttl):
+        """다른 워커가 같은 키를 생성 중이 아니면 임대를 잡고 True 반환"""
+        now = time.time()
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                conn.execute(
+                    "DELETE FROM fortune_inflight WHERE cache_key = ? AND expires_at <= ?",
+                    (key, now)
+                )
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO fortune_inflight (cache_key, owner, expires_at) VALUES (?, ?, ?)",
+                    (key, owner, now + ttl)
+                )
+                conn.commit()
+                return cur.rowcount == 1
+        except Exception as e:
+            # 임대 실패 시에는 그냥 직접 생성하도록 한다
+            logger.warning(f"운세 생성 임대 실패: {e}")
+            return True
+
+    def release_lease(self, key, owner):
+        """임대 해제"""
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                conn.execute(
+                    "DELETE FROM fortune_inflight WHERE cache_key = ? AND owner = ?",
+                    (key, owner)
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"운세 생성 임대 해제 실패: {e}")
+
+    def _lease_exists(self, key):
+        try:
+            with self._db_lock:
+                row = self._connect().execute(
+                    "SELECT 1 FROM fortune_inflight WHERE cache_key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+            return row is not None
+        except Exception:
+            return False
+
+    def wait_for(self, key, timeout, poll_interval=0.5):
+        """다른 워커가 저장할 결과를 timeout 초까지 기다림
+
+        상대 워커가 결과 없이 임대를 놓으면(오류 등) 바로 None을 반환한다.
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            result = self.peek(key)
+            if result is not None:
+                return result
+            if not self._lease_exists(key):
+                return self.peek(key)
+            time.sleep(poll_interval)
+        return None
+
+    def stats(self):
+        """캐시 통계"""
+        with self._lock:
+            size = len(self._lru)
+        return {
+            'memory_entries': size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class _Call:
+    """진행 중인 호출 하나"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 요청이 업스트림 호출 하나를 공유하도록 묶는다
+
+    같은 워커 안의 스레드(그린렛)끼리는 메모리에서 묶고, cache가 주어지면
+    fortune_inflight 임대 행을 통해 다른 gunicorn 워커와도 묶는다.
+    """
+
+    def __init__(self, cache=None, lease_ttl=90):
+        self.cache = cache
+        self.lease_ttl = lease_ttl
+        self.owner = f"{os.getpid()}"
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def is_pending(self, key):
+        """같은 워커에서 같은 키를 생성 중인지"""
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, fn):
+        """fn()을 키당 한 번만 실행하고 그 결과를 공유
+
+        Returns:
+            (결과, 다른 요청의 결과를 공유받았는지 여부)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        shared = False
+        try:
+            call.result, shared = self._run_across_workers(key, fn)
+            return call.result, shared
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def begin(self, key):
+        """fn 대신 호출한 쪽이 직접(스트리밍 등) 생성할 자리를 잡는다
+
+        자리를 잡으면 _Call을 돌려주고, 그동안 같은 키로 do()를 부른 요청은
+        finish()로 넘겨줄 결과를 기다린다. 같은 워커나 다른 워커에서 이미
+        생성 중이면 None을 돌려주며, 이때는 do()로 결과를 기다리면 된다.
+        """
+        with self._lock:
+            if key in self._calls:
+                return None
+        if self.cache is not None and not self.cache.acquire_lease(key, self.owner, self.lease_ttl):
+            return None
+
+        with self._lock:
+            if key not in self._calls:
+                call = _Call()
+                self._calls[key] = call
+                return call
+        # 임대를 잡는 사이 같은 워커의 다른 요청이 먼저 시작함
+        self.cache.release_lease(key, self.owner)
+        return None
+
+    def finish(self, key, call, result=None, error=None):
+        """begin()으로 잡은 자리를 놓고 기다리던 요청에 결과(또는 오류)를 넘긴다"""
+        if self.cache is not None:
+            self.cache.release_lease(key, self.owner)
+        call.result = result
+        call.error = error
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.event.set()
+
+    def _run_across_workers(self, key, fn):
+        if self.cache is None:
+            return fn(), False
+
+        if not self.cache.acquire_lease(key, self.owner, self.lease_ttl):
+            # 다른 워커가 생성 중이면 결과가 저장될 때까지 기다린다
+            result = self.cache.wait_for(key, self.lease_ttl)
+            if result is not None:
+                return result, True
+            logger.warning(f"다른 워커의 운세 생성 대기 시간 초과, 직접 생성: {key}")
+
+        try:
+            return fn(), False
+        finally:
+            self.cache.release_lease(key, self.owner)
+
+
+fortune_cache = FortuneCache(
+    db_path=os.getenv('FORTUNE_CACHE_DB', 'dosa_cache.db'),
+    max_entries=int(os.getenv('FORTUNE_CACHE_SIZE', 1000))
+)
+
+saju_flight = SingleFlight(
+    cache=fortune_cache if os.getenv('FORTUNE_SINGLEFLIGHT_CROSS_WORKER', '1') == '1' else None
+)
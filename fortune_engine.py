@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 템플릿 운세 엔진
+
+미리 준비한 문구 표만으로 카테고리별 운세를 즉시(1ms 미만) 만들어낸다.
+OpenAI 장애, 서킷 브레이커 열림, 대기열 포화, 관리자 비상 모드에서
+get_saju가 오류 대신 이 결과를 돌려준다. 문구 표는 script.js의
+generateFortune / generateAdvice / generateLuckyItems / getZodiacInfluence /
+getTimeInfluence와 같은 내용이다.
+
+같은 사주/운세/기간이면 항상 같은 결과가 나오도록 무작위 대신
+입력값의 해시로 문구를 고른다.
+"""
+
+import zlib
+from math import gcd
+from datetime import datetime, timedelta
+
+# 카테고리별 운세 문구
+FORTUNE_PHRASES = {
+    'today': [
+        "오늘은 집중력과 직감이 빛나는 날입니다. 중요한 결정을 내리기에 좋은 시기이니 망설이지 마세요.",
+        "작은 선택이 큰 결과로 이어질 수 있습니다. 신중함과 용기의 균형을 잘 맞춰보세요.",
+        "감정 조절이 중요한 하루가 될 것입니다. 차분한 마음으로 상황을 바라보시기 바랍니다.",
+        "새로운 기회가 문을 두드릴 것입니다. 열린 마음으로 받아들이면 좋은 변화가 있을 것입니다.",
+        "인간관계에서 따뜻한 소식이 전해질 것입니다. 진심 어린 관심이 더 큰 행복을 불러올 것입니다.",
+        "창의적인 아이디어가 샘솟는 하루입니다. 평소와 다른 접근법을 시도해보시기 바랍니다.",
+    ],
+    'tomorrow': [
+        "내일은 안정과 평화가 함께하는 날이 될 것입니다. 마음의 여유를 갖고 하루를 보내세요.",
+        "예상치 못한 기쁜 소식이 들려올 수 있습니다. 긍정적인 마음가짐을 유지하시기 바랍니다.",
+        "건강관리에 특별한 관심을 기울이기 좋은 날입니다. 자신을 돌아보는 시간을 가져보세요.",
+        "가족이나 친구들과의 만남에서 의미 있는 대화를 나눌 수 있을 것입니다.",
+        "계획했던 일들이 순조롭게 진행될 것입니다. 꾸준함이 성공의 열쇠가 될 것입니다.",
+    ],
+    'month': [
+        "이번 달은 성장과 발전의 시기입니다. 새로운 도전을 두려워하지 마시고 적극적으로 나아가세요.",
+        "인간관계에서 깊이 있는 변화가 있을 것입니다. 진정한 우정과 사랑을 발견할 수 있을 것입니다.",
+        "경제적 안정을 위한 계획을 세우기 좋은 달입니다. 장기적인 관점에서 접근해보세요.",
+        "창작이나 예술 활동에 좋은 영감을 받을 수 있는 시기입니다. 자신만의 색깔을 표현해보세요.",
+        "건강한 생활 습관을 만들기 시작하기 좋은 때입니다. 작은 변화부터 시작해보시기 바랍니다.",
+    ],
+    'year': [
+        "올해는 큰 변화와 성취가 기다리는 특별한 해입니다. 자신을 믿고 담대하게 전진하세요.",
+        "지금까지의 노력이 결실을 맺는 의미 있는 한 해가 될 것입니다. 감사하는 마음을 잊지 마세요.",
+        "새로운 인연과 기회가 연이어 찾아올 것입니다. 열린 마음으로 받아들이시기 바랍니다.",
+        "자기계발과 학습에 투자하기 좋은 해입니다. 꾸준한 노력이 미래의 자산이 될 것입니다.",
+        "가정과 일의 균형을 찾는 것이 중요한 해입니다. 소중한 사람들과의 시간을 소홀히 하지 마세요.",
+    ],
+    'love': [
+        "마음의 문을 열면 새로운 인연이 찾아올 수 있어요. 자신을 있는 그대로 보여주는 용기가 필요합니다.",
+        "연인과의 소통이 더욱 깊어지는 시기입니다. 진심을 담은 대화로 관계를 발전시켜보세요.",
+        "혼자의 시간을 즐기며 자신을 돌아보는 것도 좋습니다. 자립적인 매력이 더해질 것입니다.",
+        "과거의 상처를 치유하고 새로운 사랑을 준비하는 시기입니다. 마음의 정리가 필요해요.",
+        "가족이나 친구들의 지지가 연애에 큰 도움이 될 것입니다. 주변의 조언에 귀 기울여보세요.",
+        "진정한 사랑은 서두르지 않습니다. 자연스러운 흐름에 맡기며 기다리는 지혜가 필요해요.",
+    ],
+    'wealth': [
+        "금전 운이 활짝 트입니다. 투자에 신중하면 좋은 성과를 거둘 수 있을 것입니다.",
+        "계획보다 지출이 많을 수 있으니 절제가 필요합니다. 가계부 작성을 시작해보세요.",
+        "의외의 수입이 생길 수 있는 시기입니다. 부업이나 투잡을 고려해볼 수 있어요.",
+        "저축 습관을 기르기 좋은 때입니다. 작은 금액부터 꾸준히 모아나가시기 바랍니다.",
+        "투자보다는 안전한 자산 관리에 집중하는 것이 좋습니다. 전문가의 조언을 구해보세요.",
+        "금전적 여유가 생기면 베푸는 마음도 잊지 마세요. 나눔이 더 큰 복을 가져다줄 것입니다.",
+    ],
+    'business': [
+        "사업 확장이나 새로운 도전을 시작하기 좋은 시기입니다. 준비된 자에게 기회가 찾아올 것입니다.",
+        "기존 사업의 내실을 다지는 데 집중하시기 바랍니다. 기본기가 탄탄해야 성장할 수 있습니다.",
+        "파트너십이나 협업을 통해 새로운 가능성을 발견할 수 있을 것입니다. 네트워킹에 힘쓰세요.",
+        "고객 서비스 개선에 투자하면 좋은 결과를 얻을 수 있습니다. 고객의 소리에 귀 기울이세요.",
+        "디지털 전환이나 기술 도입을 고려해볼 때입니다. 변화에 적응하는 유연성이 필요합니다.",
+    ],
+    'study': [
+        "학습에 대한 집중력이 최고조에 달하는 시기입니다. 목표를 정하고 계획적으로 공부하세요.",
+        "새로운 분야에 도전해볼 좋은 기회입니다. 호기심을 바탕으로 탐구해보시기 바랍니다.",
+        "기초를 탄탄히 하는 것이 중요합니다. 기본기를 소홀히 하지 말고 차근차근 쌓아가세요.",
+        "스터디 그룹이나 토론을 통해 학습 효과를 높일 수 있습니다. 혼자만의 공부에서 벗어나보세요.",
+        "시험이나 자격증 취득에 유리한 시기입니다. 자신감을 갖고 도전해보시기 바랍니다.",
+    ],
+    'compatibility': [
+        "두 사람은 서로를 보완해주는 좋은 궁합입니다. 차이점을 인정하고 존중하는 자세가 필요해요.",
+        "성향 차이가 있지만 노력하면 조화로운 관계가 됩니다. 소통과 이해가 관계의 열쇠입니다.",
+        "가치관 차이로 갈등이 있을 수 있으니 이해심이 필요합니다. 대화를 통해 해결해나가세요.",
+        "서로에게 좋은 자극이 되는 관계입니다. 함께 성장할 수 있는 동반자가 될 수 있어요.",
+        "인내와 배려가 필요한 관계입니다. 급하게 서두르지 말고 천천히 마음을 열어가세요.",
+        "운명적인 만남의 가능성이 높습니다. 서로를 믿고 지지하는 관계로 발전시켜나가세요.",
+    ],
+    'zodiac-sign': [
+        "당신의 띠 특성이 오늘 특별히 빛을 발할 것입니다. 타고난 장점을 적극 활용해보세요.",
+        "같은 띠를 가진 사람들과의 만남에서 좋은 에너지를 받을 수 있습니다. 동질감을 느껴보세요.",
+        "띠의 고유한 성격이 오늘의 선택에 좋은 영향을 줄 것입니다. 직감을 믿고 행동하세요.",
+        "전통적인 지혜가 현대적 문제 해결에 도움이 될 것입니다. 조상의 지혜를 되새겨보세요.",
+        "띠가 가진 원래의 에너지로 돌아가는 것이 필요한 시기입니다. 본래의 모습을 찾아보세요.",
+    ],
+    'past-life': [
+        "전생의 기억이 꿈이나 직감으로 나타날 수 있습니다. 내면의 목소리에 귀 기울여보세요.",
+        "과거의 인연이 현재의 만남으로 이어질 수 있습니다. 우연한 만남도 소중히 여기세요.",
+        "전생의 재능이 현생에서 깨어날 조짐이 보입니다. 새로운 분야에 도전해보시기 바랍니다.",
+        "전생의 업보를 선행으로 정화할 수 있는 시기입니다. 베푸는 마음을 실천해보세요.",
+        "영혼의 성장을 위한 시험이 찾아올 수 있습니다. 인내심을 갖고 극복해나가세요.",
+    ],
+    'wish-fortune': [
+        "소원이 이루어질 가능성이 높습니다. 긍정적인 마음가짐을 유지하며 기다려보세요.",
+        "소원 성취를 위해서는 더 많은 노력이 필요합니다. 포기하지 말고 계속 도전하세요.",
+        "소원보다 더 좋은 것이 찾아올 수 있습니다. 열린 마음으로 변화를 받아들이세요.",
+        "소원이 다른 형태로 이루어질 수 있습니다. 예상과 다르더라도 감사하는 마음을 가지세요.",
+        "소원 성취를 위한 준비가 더 필요합니다. 차근차근 계획을 세우고 실행해나가세요.",
+    ],
+    'constellation': [
+        "별자리의 영향으로 직감력이 높아지는 시기입니다. 첫인상과 느낌을 신뢰해보세요.",
+        "행성의 배치가 창의력을 자극합니다. 예술적 영감을 받을 수 있는 좋은 시기예요.",
+        "우주의 에너지가 변화를 촉진합니다. 새로운 시도나 도전을 두려워하지 마세요.",
+        "별들의 조화로운 배치가 인간관계에 좋은 영향을 줄 것입니다. 소통에 집중해보세요.",
+        "천체의 움직임이 내면의 평화를 가져다줍니다. 명상이나 휴식을 취하기 좋은 때입니다.",
+    ],
+    'lifetime': [
+        "인생 전반에 걸쳐 꾸준한 상승세를 타게 될 것입니다. 장기적인 관점에서 계획을 세우세요.",
+        "중년 이후에 큰 성취를 이룰 수 있는 운명입니다. 인내심을 갖고 기다리시기 바랍니다.",
+        "평생에 걸쳐 좋은 인연들을 많이 만날 것입니다. 사람들과의 관계를 소중히 여기세요.",
+        "건강한 장수를 누릴 수 있는 좋은 운세입니다. 규칙적인 생활 습관을 유지하세요.",
+        "말년에 복이 많은 운명입니다. 젊은 시절의 노력이 큰 결실을 맺을 것입니다.",
+    ],
+    'tojung': [
+        "토정비결에 따르면 올해는 변화의 해입니다. 동쪽 방향이 길하니 참고하시기 바랍니다.",
+        "음력 3월과 9월에 특별한 기회가 찾아올 것입니다. 준비된 마음으로 맞이하세요.",
+        "연장자나 경험이 많은 분의 조언이 큰 도움이 될 것입니다. 겸손한 자세로 들어보세요.",
+        "물과 관련된 일에 주의하시고, 푸른색 계열의 물건이 행운을 가져다줄 것입니다.",
+        "정남향이나 정북향으로의 이사나 이직이 길할 것입니다. 변화를 두려워하지 마세요.",
+    ],
+}
+
+# 카테고리별 조언
+ADVICE_PHRASES = {
+    'today': [
+        "오늘은 새로운 도전을 두려워하지 마세요",
+        "감정적 판단보다 이성적 사고를 우선하세요",
+        "주변 사람들과의 소통에 더 많은 시간을 투자하세요",
+        "건강관리를 위해 충분한 휴식을 취하시기 바랍니다",
+        "작은 성취에도 스스로를 칭찬해주세요",
+        "직감을 믿되 신중한 판단도 함께 하세요",
+    ],
+    'tomorrow': [
+        "내일을 위한 준비를 차근차근 해보세요",
+        "긍정적인 마음가짐으로 하루를 시작하세요",
+        "가족이나 친구들과의 약속을 소중히 여기세요",
+        "새로운 기회에 열린 마음으로 대비하세요",
+    ],
+    'month': [
+        "이번 달의 목표를 구체적으로 설정해보세요",
+        "꾸준함이 가장 큰 성공의 열쇠임을 기억하세요",
+        "인간관계에 더 많은 관심과 시간을 투자하세요",
+        "자기계발을 위한 시간을 꼭 확보하시기 바랍니다",
+    ],
+    'year': [
+        "장기적인 관점에서 인생 계획을 세워보세요",
+        "건강관리를 최우선으로 생각하시기 바랍니다",
+        "새로운 기술이나 지식 습득에 관심을 가져보세요",
+        "가족과의 소중한 시간을 늘려가시기 바랍니다",
+    ],
+    'love': [
+        "진실한 마음으로 상대방에게 다가가세요",
+        "외모보다 내면의 아름다움에 집중하세요",
+        "서두르지 말고 자연스러운 관계 발전을 기다리세요",
+        "자신을 먼저 사랑하는 법을 배우시기 바랍니다",
+        "과거의 상처에 얽매이지 말고 새로운 시작을 하세요",
+        "소통과 이해를 바탕으로 관계를 발전시키세요",
+    ],
+    'wealth': [
+        "충동적인 소비보다 계획적인 지출을 하세요",
+        "투자보다는 안전한 저축에 우선 집중하세요",
+        "부업이나 추가 수입원을 고려해보세요",
+        "전문가의 재정 상담을 받아보시는 것이 좋겠습니다",
+        "가계부 작성으로 지출 패턴을 파악해보세요",
+        "금전 관리 습관을 체계적으로 만들어가세요",
+    ],
+    'business': [
+        "고객의 니즈를 정확히 파악하는 것이 중요합니다",
+        "경쟁사 분석을 통해 차별화 포인트를 찾으세요",
+        "직원들과의 소통을 늘려 조직력을 강화하세요",
+        "새로운 기술 도입을 적극적으로 검토해보세요",
+    ],
+    'study': [
+        "기초를 탄탄히 하는 것부터 시작하세요",
+        "꾸준한 복습이 학습 효과를 극대화합니다",
+        "다른 사람들과의 토론을 통해 이해도를 높이세요",
+        "실습과 이론을 균형있게 병행하시기 바랍니다",
+    ],
+    'compatibility': [
+        "서로의 차이점을 인정하고 존중하는 자세를 가지세요",
+        "소통을 통해 오해를 해결하려 노력하세요",
+        "상대방의 장점에 더 많은 관심을 기울이세요",
+        "함께하는 시간의 질을 높이는 데 집중하세요",
+        "급하게 서두르지 말고 자연스러운 발전을 기다리세요",
+        "서로를 위한 배려와 희생정신을 발휘하세요",
+    ],
+    'zodiac-sign': [
+        "당신의 띠가 가진 고유한 장점을 적극 활용하세요",
+        "전통적인 지혜와 현대적 감각을 조화롭게 활용하세요",
+        "같은 띠를 가진 사람들과의 교류를 늘려보세요",
+        "띠의 특성에 맞는 직업이나 취미를 고려해보세요",
+    ],
+    'past-life': [
+        "내면의 직감과 꿈에 더 많은 관심을 기울이세요",
+        "새로운 분야에 대한 호기심을 적극적으로 탐구하세요",
+        "선행과 베푸는 마음을 실천하려 노력하세요",
+        "정신적 성장을 위한 수행이나 명상을 시작해보세요",
+    ],
+    'wish-fortune': [
+        "소원을 이루기 위한 구체적인 계획을 세우세요",
+        "긍정적인 마음가짐을 지속적으로 유지하세요",
+        "다른 사람들의 소원도 함께 응원해주세요",
+        "현실적인 목표와 꿈의 균형을 잘 맞추세요",
+    ],
+    'constellation': [
+        "별자리의 에너지를 활용해 창의력을 발휘하세요",
+        "우주의 리듬에 맞춰 자연스러운 삶을 살아보세요",
+        "직감력을 믿고 중요한 결정을 내려보세요",
+        "명상이나 요가로 내면의 평화를 찾아보세요",
+    ],
+    'lifetime': [
+        "인생의 큰 그림을 그려보고 단계별 목표를 세우세요",
+        "건강한 생활 습관으로 긴 인생을 준비하세요",
+        "좋은 인연들을 소중히 여기고 관계를 발전시키세요",
+        "지속적인 자기계발로 성장하는 삶을 살아가세요",
+    ],
+    'tojung': [
+        "전통적인 지혜를 현대 생활에 접목해보세요",
+        "방향과 타이밍을 중요하게 고려하여 결정하세요",
+        "연장자들의 조언에 귀 기울이는 겸손함을 가지세요",
+        "자연의 순리에 따라 무리하지 않는 삶을 살아보세요",
+    ],
+}
+
+# 띠별 개인화 문구
+ZODIAC_INFLUENCE = {
+    '쥐띠': "기민함과 적응력이 특히 도움이 될 것입니다.",
+    '소띠': "꾸준함과 성실함이 좋은 결과를 가져다줄 것입니다.",
+    '호랑이띠': "용기와 리더십을 발휘할 기회가 있을 것입니다.",
+    '토끼띠': "섬세함과 배려심이 빛을 발할 것입니다.",
+    '용띠': "카리스마와 창조력이 최고조에 달할 것입니다.",
+    '뱀띠': "지혜롭고 신중한 판단이 성공의 열쇠가 될 것입니다.",
+    '말띠': "자유로운 영혼과 행동력이 새로운 기회를 만들 것입니다.",
+    '양띠': "온화함과 예술적 감각이 주변에 좋은 영향을 줄 것입니다.",
+    '원숭이띠': "창의적 아이디어와 재치가 문제 해결에 도움이 될 것입니다.",
+    '닭띠': "성실함과 정확성이 인정받는 하루가 될 것입니다.",
+    '개띠': "충성심과 신뢰성이 관계 발전에 큰 도움이 될 것입니다.",
+    '돼지띠': "관대함과 포용력이 복을 불러올 것입니다.",
+}
+
+# 시진별 개인화 문구 (index.html의 출생시간 선택값과 같은 이름)
+BRANCH_INFLUENCE = {
+    '자시': '자시 태생의 특성상 직감력이 뛰어난 하루가 될 것입니다.',
+    '축시': '축시의 영향으로 끈기 있는 노력이 빛을 발할 것입니다.',
+    '인시': '인시 태생답게 용기 있는 도전이 좋은 결과를 가져올 것입니다.',
+    '묘시': '묘시의 기운으로 섬세한 관찰력이 도움이 될 것입니다.',
+    '진시': '진시 태생의 특성상 활동적인 하루가 예상됩니다.',
+    '사시': '사시의 영향으로 소통능력이 뛰어난 하루가 될 것입니다.',
+    '오시': '오시 태생답게 리더십을 발휘할 기회가 있을 것입니다.',
+    '미시': '미시의 기운으로 예술적 감각이 빛날 것입니다.',
+    '신시': '신시 태생의 특성상 조직적인 사고가 도움이 될 것입니다.',
+    '유시': '유시의 영향으로 사교성이 빛나는 하루가 될 것입니다.',
+    '술시': '술시 태생답게 책임감 있는 행동이 인정받을 것입니다.',
+    '해시': '해시의 기운으로 깊이 있는 사고가 좋은 결과를 가져올 것입니다.',
+}
+
+# 'HH:MM' 형식 출생시간을 시진으로 바꾸기 위한 표 (시 -> 시진)
+HOUR_BRANCHES = ['자시', '축시', '축시', '인시', '인시', '묘시', '묘시', '진시', '진시', '사시', '사시', '오시',
+                 '오시', '미시', '미시', '신시', '신시', '유시', '유시', '술시', '술시', '해시', '해시', '자시']
+
+# 연도 % 12 -> 띠
+ZODIAC_SIGNS = ['원숭이띠', '닭띠', '개띠', '돼지띠', '쥐띠', '소띠', '호랑이띠', '토끼띠', '용띠', '뱀띠', '말띠', '양띠']
+
+LUCKY_COLORS = ['빨간색', '파란색', '노란색', '초록색', '보라색', '주황색', '분홍색', '하늘색', '금색', '은색']
+LUCKY_NUMBERS = ['1', '3', '7', '9', '11', '21', '33', '77', '99']
+LUCKY_ITEMS = [
+    '작은 크리스탈', '향초', '관엽식물', '예쁜 노트', '시계',
+    '반지', '목걸이', '책갈피', '미니어처', '부적',
+    '꽃다발', '커피잔', '향수', '스카프', '모자'
+]
+
+# 카테고리 이름 -> 문구 표 키 (script.js categoryMap의 역방향)
+CATEGORY_KEYS = {
+    '오늘의 운세': 'today',
+    '내일의 운세': 'tomorrow',
+    '이달의 운세': 'month',
+    '올해의 운세': 'year',
+    '평생운세': 'lifetime',
+    '평생 운세': 'lifetime',
+    '토정비결': 'tojung',
+    '연애운': 'love',
+    '애정 운세': 'love',
+    '재물운': 'wealth',
+    '재물 운세': 'wealth',
+    '금전 운세': 'wealth',
+    '사업운': 'business',
+    '사업 운세': 'business',
+    '학업운': 'study',
+    '학업 운세': 'study',
+    '궁합': 'compatibility',
+    '띠별 운세': 'zodiac-sign',
+    '전생 운세': 'past-life',
+    '전생운세': 'past-life',
+    '소원 성취 운세': 'wish-fortune',
+    '별자리 운세': 'constellation',
+}
+
+# 본문에 넣을 운세 문구 수
+MAIN_SENTENCES = 3
+
+
+def category_key(category):
+    """카테고리 이름을 문구 표 키로 변환 (모르는 카테고리는 오늘의 운세 문구 사용)"""
+    key = CATEGORY_KEYS.get(category, category)
+    return key if key in FORTUNE_PHRASES else 'today'
+
+
+def zodiac_of(birth_date):
+    """양력 생년월일('YYYY-MM-DD')의 띠 (입춘 2월 4일 기준)"""
+    try:
+        year, month, day = (int(part) for part in birth_date.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    if (month, day) < (2, 4):
+        year -= 1
+    return ZODIAC_SIGNS[year % 12]
+
+
+def branch_of(birth_time):
+    """출생시간 문자열의 시진 ('자시'... 또는 'HH:MM' 형식, 모르면 None)"""
+    if not birth_time:
+        return None
+    birth_time = birth_time.strip()
+    for branch in BRANCH_INFLUENCE:
+        if birth_time.startswith(branch):
+            return branch
+    try:
+        return HOUR_BRANCHES[int(birth_time.split(':')[0]) % 24]
+    except ValueError:
+        return None
+
+
+def _pick(options, seed, offset=0):
+    return options[(seed + offset * 7919) % len(options)]
+
+
+def _pick_distinct(options, seed, count):
+    """seed로 시작 위치를 정해 서로 다른 문구 count개 선택"""
+    count = min(count, len(options))
+    start = seed % len(options)
+    step = 1 + (seed // len(options)) % max(len(options) - 1, 1)
+    # step과 길이가 서로소가 아니면 겹칠 수 있으므로 1로 대체
+    if gcd(step, len(options)) != 1:
+        step = 1
+    return [options[(start + i * step) % len(options)] for i in range(count)]
+
+
+def _time_context(key, now):
+    if key == 'today':
+        return f"오늘 {now.year}년 {now.month}월 {now.day}일은"
+    if key == 'tomorrow':
+        tomorrow = now + timedelta(days=1)
+        return f"{tomorrow.year}년 {tomorrow.month}월 {tomorrow.day}일은"
+    if key == 'month':
+        return f"{now.year}년 {now.month}월에는"
+    if key == 'year':
+        return f"{now.year}년에는"
+    return f"{now.year}년 현재"
+
+
+def _seed(*parts):
+    return zlib.crc32('|'.join('' if p is None else str(p) for p in parts).encode('utf-8'))
+
+
+def generate(category, profiles, now=None):
+    """템플릿 운세 생성
+
+    Args:
+        category: 운세 카테고리 (예: '오늘의 운세')
+        profiles: [{'birth_date': 양력 'YYYY-MM-DD', 'birth_time': ..., 'gender': ...}, ...]
+                  궁합은 두 사람, 그 외는 한 사람
+        now: 기준 시각 (기본: 현재)
+
+    Returns:
+        get_saju의 result와 같은 형식의 운세 텍스트
+    """
+    now = now or datetime.now()
+    key = category_key(category)
+    profile = profiles[0] if profiles else {}
+    zodiac = zodiac_of(profile.get('birth_date'))
+    branch = branch_of(profile.get('birth_time'))
+
+    seed = _seed(key, now.strftime('%Y-%m-%d'), *(
+        f"{p.get('birth_date')}/{p.get('birth_time')}/{p.get('gender')}" for p in profiles
+    ))
+
+    sentences = _pick_distinct(FORTUNE_PHRASES[key], seed, MAIN_SENTENCES)
+    main = f"{_time_context(key, now)} {' '.join(sentences)}"
+    if key == 'compatibility' and len(profiles) > 1:
+        partner_zodiac = zodiac_of(profiles[1].get('birth_date'))
+        if zodiac and partner_zodiac:
+            main += f" **{zodiac}**와 **{partner_zodiac}**의 만남입니다."
+    elif zodiac:
+        main += f" {ZODIAC_INFLUENCE[zodiac]}"
+    if branch and key != 'compatibility':
+        main += f" {BRANCH_INFLUENCE[branch]}"
+
+    advice = _pick_distinct(ADVICE_PHRASES[key], seed >> 3, 2)
+
+    lines = [
+        f"**{category} 풀이**",
+        "",
+        main,
+        "",
+        "**조언**",
+    ]
+    lines.extend(f"- {item}" for item in advice)
+    lines.extend([
+        "",
+        "**행운의 요소**",
+        f"- 행운의 색깔: {_pick(LUCKY_COLORS, seed, 1)}",
+        f"- 행운의 숫자: {_pick(LUCKY_NUMBERS, seed, 2)}",
+        f"- 행운의 아이템: {_pick(LUCKY_ITEMS, seed, 3)}",
+    ])
+    return '\n'.join(lines)
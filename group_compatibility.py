@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 단체 궁합 점수
+
+여러 사람(팀, 소개팅 모임 등)의 궁합을 LLM 없이 한 번에 계산한다.
+사주팔자(saju_pillars)에서 띠(년지), 일간, 일지, 오행 분포를 뽑아
+N x N 점수 행렬을 NumPy로 한 번에 만들고 사람마다 상위 k명을 고른다.
+같은 입력이면 항상 같은 점수가 나오며, 서술형 풀이가 필요한 상위 쌍만
+/api/saju 궁합 요청으로 넘기면 된다.
+
+점수(0~100) = 50
+    + 15 x 띠 관계(년지)  + 10 x 일지 관계
+    + 15 x 일간 관계      + 10 x 오행 보완도
+"""
+
+import numpy as np
+
+import saju_pillars
+
+# 지지 관계 (-1 ~ 1): 육합 1.0, 삼합 0.7, 같은 지지 0.3, 원진 -0.5, 충 -1.0
+_SIX_HARMONY = [(0, 1), (2, 11), (3, 10), (4, 9), (5, 8), (6, 7)]
+_RESENTMENT = [(0, 7), (1, 6), (2, 9), (3, 8), (4, 11), (5, 10)]
+
+
+def _branch_table():
+    table = np.zeros((12, 12))
+    for a in range(12):
+        for b in range(12):
+            if a == b:
+                table[a, b] = 0.3
+            elif (a - b) % 4 == 0:
+                table[a, b] = 0.7
+            elif (a - b) % 12 == 6:
+                table[a, b] = -1.0
+    for a, b in _SIX_HARMONY:
+        table[a, b] = table[b, a] = 1.0
+    for a, b in _RESENTMENT:
+        table[a, b] = table[b, a] = -0.5
+    return table
+
+
+def _stem_table():
+    """천간 관계 (-1 ~ 1): 천간합 1.0, 상생 0.5, 같은 오행 0.2, 상극 -0.5"""
+    element = np.array(saju_pillars.STEM_ELEMENT)
+    relation = (element[None, :] - element[:, None]) % 5
+    table = np.select(
+        [relation == 0, (relation == 1) | (relation == 4)],
+        [0.2, 0.5],
+        default=-0.5
+    )
+    stems = np.arange(10)
+    table[(stems[:, None] - stems[None, :]) % 10 == 5] = 1.0
+    return table
+
+
+BRANCH_RELATION = _branch_table()
+STEM_RELATION = _stem_table()
+_STEM_ELEMENT = np.array(saju_pillars.STEM_ELEMENT)
+_BRANCH_ELEMENT = np.array(saju_pillars.BRANCH_ELEMENT)
+
+WEIGHTS = {'zodiac': 15, 'day_stem': 15, 'day_branch': 10, 'elements': 10}
+
+
+def _element_counts(pillars):
+    """(N, 4) 60갑자 번호 -> (N, 5) 오행 개수 (모르는 시주는 빼고 센다)"""
+    known = pillars >= 0
+    elements = np.concatenate([
+        _STEM_ELEMENT[pillars % 10],
+        _BRANCH_ELEMENT[pillars % 12]
+    ], axis=1)
+    mask = np.concatenate([known, known], axis=1)
+    counts = np.zeros((len(pillars), 5))
+    rows = np.repeat(np.arange(len(pillars)), elements.shape[1])
+    np.add.at(counts, (rows[mask.ravel()], elements.ravel()[mask.ravel()]), 1)
+    return counts
+
+
+def score_matrix(birth_dates, birth_times=None):
+    """N명의 궁합 점수 행렬
+
+    Args:
+        birth_dates: 양력 생년월일 목록
+        birth_times: 출생시간 목록 (None이면 모두 모름)
+
+    Returns:
+        (N, N) 점수 행렬 (0~100, 대각선과 계산할 수 없는 사람은 NaN)
+    """
+    columns = saju_pillars.pillars_batch(birth_dates, birth_times)
+    pillars = np.stack([
+        columns[name] for name in ('year', 'month', 'day', 'hour')
+    ], axis=1).astype(np.int64)
+    valid = pillars[:, 2] >= 0
+
+    year_branch = pillars[:, 0] % 12
+    day_stem = pillars[:, 2] % 10
+    day_branch = pillars[:, 2] % 12
+
+    # 두 사람의 오행을 합쳤을 때 고르게 퍼질수록 1에 가깝다
+    counts = _element_counts(pillars)
+    combined = counts[:, None, :] + counts[None, :, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = combined / combined.sum(axis=2, keepdims=True)
+    balance = 1 - np.abs(share - 0.2).sum(axis=2) / 1.6
+
+    scores = (
+        50
+        + WEIGHTS['zodiac'] * BRANCH_RELATION[year_branch[:, None], year_branch[None, :]]
+        + WEIGHTS['day_stem'] * STEM_RELATION[day_stem[:, None], day_stem[None, :]]
+        + WEIGHTS['day_branch'] * BRANCH_RELATION[day_branch[:, None], day_branch[None, :]]
+        + WEIGHTS['elements'] * (2 * balance - 1)
+    )
+    scores = np.clip(scores, 0, 100)
+    scores[~valid, :] = np.nan
+    scores[:, ~valid] = np.nan
+    np.fill_diagonal(scores, np.nan)
+    return scores
+
+
+def opposite_gender_mask(genders):
+    """성별이 다른 쌍만 True (성별을 모르는 사람은 누구와도 허용)"""
+    genders = np.array([g or '' for g in genders])
+    unknown = genders == ''
+    return (genders[:, None] != genders[None, :]) | unknown[:, None] | unknown[None, :]
+
+
+def top_matches(scores, k=3, allowed=None):
+    """사람마다 점수가 높은 상대 k명
+
+    Args:
+        scores: score_matrix 결과
+        k: 사람당 추천 수
+        allowed: (N, N) bool 행렬, False인 쌍은 제외 (예: 같은 성별)
+
+    Returns:
+        사람마다 [(상대 번호, 점수), ...] 목록
+    """
+    masked = np.where(np.isnan(scores), -np.inf, scores)
+    if allowed is not None:
+        masked = np.where(allowed, masked, -np.inf)
+    k = max(0, min(k, len(scores) - 1))
+    if k == 0:
+        return [[] for _ in range(len(scores))]
+    # 상위 k개만 골라낸 뒤 그 안에서 정렬
+    top = np.argpartition(-masked, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(masked, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    return [
+        [(int(j), round(float(s), 1)) for j, s in zip(row, row_scores) if np.isfinite(s)]
+        for row, row_scores in zip(top, top_scores)
+    ]
+
+
+def top_pairs(scores, k=5, allowed=None):
+    """전체에서 점수가 높은 쌍 k개 [(i, j, 점수), ...] (i < j)"""
+    masked = np.where(np.isnan(scores), -np.inf, scores)
+    if allowed is not None:
+        masked = np.where(allowed, masked, -np.inf)
+    upper = np.triu_indices(len(scores), k=1)
+    values = masked[upper]
+    order = np.argsort(-values, kind='stable')[:k]
+    return [
+        (int(upper[0][idx]), int(upper[1][idx]), round(float(values[idx]), 1))
+        for idx in order if np.isfinite(values[idx])
+    ]
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 gunicorn 설정
+
+OpenAI 호출은 최대 60초까지 걸리므로 기본 sync 워커를 쓰면 요청 하나가
+워커 하나를 통째로 붙잡는다. gevent 워커는 소켓 I/O를 협력형으로 바꿔
+대기 중인 호출을 그린렛으로 처리하므로, 프로세스 하나가 수백 건의
+LLM 호출을 동시에 기다릴 수 있다. (Flask-SQLAlchemy 로그 기록은 그대로 동작)
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '2222')}"
+
+# 워커 프로세스 수 (Render 등은 WEB_CONCURRENCY를 지정)
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+
+# 'sync'로 바꾸면 기존 동작으로 돌아감
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+
+# 워커 하나가 동시에 처리할 최대 연결 수 (gevent 워커에서만 사용)
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# 평생운세 스트리밍이 1분 넘게 걸릴 수 있으므로 여유 있게 설정
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+
+def worker_exit(server, worker):
+    # 워커 종료 전에 큐에 남은 접속 로그/API 사용량을 DB에 기록
+    from log_writer import log_writer
+    log_writer.stop()
+    # 진행 중인 내보내기는 다음 청크에서 멈추고 실패로 기록
+    from export_jobs import export_jobs
+    export_jobs.stop()
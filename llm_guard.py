@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 OpenAI 호출 보호 장치
+
+- 동시 호출 수 제한과 대기열 상한 (넘치면 바로 '혼잡' 응답)
+- 일시적 오류(429, 5xx, 타임아웃, 연결 오류)에 대한 지터 백오프 재시도
+- 오류율이 임계값을 넘으면 일정 시간 호출을 막는 서킷 브레이커
+
+OpenAI가 느려지거나 429를 돌려줄 때 모든 워커가 한꺼번에 붙잡혀
+관리자 페이지까지 멈추는 것을 막는다.
+"""
+
+import os
+import random
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+# 재시도할 일시적 오류
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class LLMBusyError(Exception):
+    """대기열이 가득 찼거나 서킷이 열려 지금은 호출할 수 없음"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = max(int(round(retry_after)), 1)
+
+
+class ConcurrencyLimiter:
+    """동시 호출 수 제한 + 대기열 상한"""
+
+    def __init__(self, max_concurrent, max_queue, queue_timeout):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def acquire(self):
+        # 빈 자리가 있으면 바로 통과
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self.active += 1
+            return
+
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise LLMBusyError("요청이 많아 잠시 후 다시 시도해주세요", self.queue_timeout)
+            self.waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            raise LLMBusyError("요청이 많아 잠시 후 다시 시도해주세요", self.queue_timeout)
+        with self._lock:
+            self.active += 1
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    def is_saturated(self):
+        """대기열까지 가득 찼는지"""
+        with self._lock:
+            return self.waiting >= self.max_queue
+
+
+class CircuitBreaker:
+    """최근 window초 동안의 오류율로 열리고, cooldown초 후 시험 호출 한 번으로 닫힌다"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, error_threshold, min_calls, window, cooldown):
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._outcomes = deque()  # (시각, 성공 여부)
+        self._opened_at = 0.0
+        self._trial = None  # 진행 중인 시험 호출의 토큰
+        self.state = self.CLOSED
+
+    def _trim(self, now):
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def retry_after(self):
+        """서킷이 다시 시험 호출을 허용하기까지 남은 초"""
+        return max(self._opened_at + self.cooldown - time.time(), 1)
+
+    def before_call(self):
+        """호출 전 확인 (열려 있으면 LLMBusyError)
+
+        Returns:
+            이 호출이 반열림 상태의 시험 호출이면 토큰, 아니면 None.
+            토큰은 release_trial()에 넘긴다.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return None
+            if self.state == self.OPEN and time.time() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._trial = None
+            if self.state == self.HALF_OPEN and self._trial is None:
+                self._trial = object()
+                return self._trial
+            raise LLMBusyError("운세 서비스가 일시적으로 혼잡합니다", self.retry_after())
+
+    def release_trial(self, token):
+        """시험 호출(token)이 성공/실패 기록 없이 끝났으면 다음 요청이 다시 시험할 수 있게 한다
+
+        다른 호출의 자리가 끝날 때 지금의 시험 호출을 풀지 않도록 토큰이 같을 때만 푼다.
+        """
+        if token is None:
+            return
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._trial is token:
+                self._trial = None
+
+    def is_open(self):
+        with self._lock:
+            return self.state == self.OPEN and time.time() - self._opened_at < self.cooldown
+
+    def record_success(self):
+        with self._lock:
+            now = time.time()
+            if self.state == self.HALF_OPEN:
+                logger.info("서킷 브레이커 닫힘 (시험 호출 성공)")
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self):
+        with self._lock:
+            now = time.time()
+            if self.state == self.HALF_OPEN:
+                self._open(now)
+                return
+            self._outcomes.append((now, False))
+            self._trim(now)
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if total >= self.min_calls and failures / total >= self.error_threshold:
+                self._open(now)
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self._opened_at = now
+        self._trial = None
+        logger.warning(f"서킷 브레이커 열림: {self.cooldown}초 동안 OpenAI 호출 차단")
+
+
+class LLMGuard:
+    """동시성 제한 + 재시도 + 서킷 브레이커"""
+
+    def __init__(self, limiter, breaker, max_retries, base_delay, max_delay):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def check_admission(self):
+        """호출을 시작하기 전에 바로 거절해야 하는지 확인 (스트리밍 응답 전 사용)"""
+        if self.breaker.is_open():
+            raise LLMBusyError("운세 서비스가 일시적으로 혼잡합니다", self.breaker.retry_after())
+        if self.limiter.is_saturated():
+            raise LLMBusyError("요청이 많아 잠시 후 다시 시도해주세요", self.limiter.queue_timeout)
+
+    @contextmanager
+    def slot(self):
+        """호출 자리 하나를 잡는다 (서킷 확인 후 동시성 제한 대기)"""
+        trial = self.breaker.before_call()
+        try:
+            self.limiter.acquire()
+        except LLMBusyError:
+            self.breaker.release_trial(trial)
+            raise
+        try:
+            yield
+        finally:
+            self.limiter.release()
+            self.breaker.release_trial(trial)
+
+    def _backoff(self, attempt):
+        # full jitter: 0 ~ min(max_delay, base * 2^attempt)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def retry(self, fn):
+        """일시적 오류는 지터 백오프로 재시도, 결과를 서킷 브레이커에 기록"""
+        attempt = 0
+        while True:
+            try:
+                result = fn()
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                logger.warning(f"OpenAI 일시적 오류, {delay:.1f}초 후 재시도 ({attempt}/{self.max_retries}): {e}")
+                time.sleep(delay)
+                continue
+            except openai.APIStatusError:
+                # 400 등은 요청 문제이므로 서비스는 살아 있는 것으로 본다
+                self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+            return result
+
+    def call(self, fn):
+        """자리를 잡고 재시도를 포함해 fn() 실행"""
+        with self.slot():
+            return self.retry(fn)
+
+    def stats(self):
+        return {
+            'active': self.limiter.active,
+            'waiting': self.limiter.waiting,
+            'rejected': self.limiter.rejected,
+            'max_concurrent': self.limiter.max_concurrent,
+            'max_queue': self.limiter.max_queue,
+            'breaker_state': self.breaker.state,
+        }
+
+
+llm_guard = LLMGuard(
+    limiter=ConcurrencyLimiter(
+        max_concurrent=int(os.getenv('LLM_MAX_CONCURRENCY', 20)),
+        max_queue=int(os.getenv('LLM_MAX_QUEUE', 50)),
+        queue_timeout=float(os.getenv('LLM_QUEUE_TIMEOUT', 10))
+    ),
+    breaker=CircuitBreaker(
+        error_threshold=float(os.getenv('LLM_BREAKER_ERROR_RATE', 0.5)),
+        min_calls=int(os.getenv('LLM_BREAKER_MIN_CALLS', 10)),
+        window=float(os.getenv('LLM_BREAKER_WINDOW', 60)),
+        cooldown=float(os.getenv('LLM_BREAKER_COOLDOWN', 30))
+    ),
+    max_retries=int(os.getenv('LLM_MAX_RETRIES', 2)),
+    base_delay=float(os.getenv('LLM_RETRY_BASE_DELAY', 0.5)),
+    max_delay=float(os.getenv('LLM_RETRY_MAX_DELAY', 8))
+)
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 접속 로그 보관(retention)
+
+access_logs는 계속 늘어나기만 하므로 LOG_RETENTION_DAYS보다 오래된 달의
+로그를 월별 gzip-JSONL 세그먼트(access_logs-YYYY-MM.jsonl.gz)로 옮기고
+원본 테이블에서 지운다. 통계는 집계 테이블(log_rollups)에 남아 있고,
+엑셀 다운로드와 집계 재생성은 manifest.json을 보고 보관된 달을 읽는다.
+
+- 세그먼트 안의 행은 최신순(timestamp, id 내림차순)이라 다운로드 순서와 같다.
+- 세그먼트를 먼저 안전하게 쓰고(임시 파일 -> rename) manifest에 max_id와
+  파일 길이를 기록한 뒤에 원본을 작은 배치로 지운다. 지우다 멈추면 다음
+  실행이 manifest의 max_id까지 마저 지운다.
+- rename 전에 원래 길이를 manifest의 pending에 남겨 두므로, rename과
+  manifest 저장 사이에 멈추면 다음 실행이 세그먼트를 그 길이로 되돌린 뒤
+  다시 보관한다. 세그먼트를 읽을 때도 manifest에 기록된 길이까지만 읽는다.
+- 배치마다 짧은 트랜잭션이라 앱이 돌고 있는 중에도 실행할 수 있다.
+  지운 페이지는 SQLite가 재사용하므로 파일 크기는 VACUUM 전까지 줄지 않는다.
+
+사용법 (cron 등에서 주기적으로):
+    python log_archive.py                 # LOG_RETENTION_DAYS (기본 180일)
+    python log_archive.py --days 90
+"""
+
+import os
+import io
+import gzip
+import json
+import shutil
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from models import db, AccessLog
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = int(os.getenv('LOG_RETENTION_DAYS', 180))
+READ_BATCH = 5000
+DELETE_BATCH = 2000
+MANIFEST_NAME = 'manifest.json'
+
+
+class ArchiveBusyError(RuntimeError):
+    """다른 프로세스가 보관 또는 집계 재생성 작업 중"""
+
+
+def archive_dir():
+    """세그먼트 저장 위치 (LOG_ARCHIVE_DIR, 기본: 인스턴스 폴더/log_archive)"""
+    return os.getenv('LOG_ARCHIVE_DIR') or os.path.join(current_app.instance_path, 'log_archive')
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def _next_month(month):
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def load_manifest():
+    """{'segments': {'YYYY-MM': {file, rows, max_id, first, last, bytes, updated}},
+        'pending': {'YYYY-MM': {bytes}}}"""
+    path = os.path.join(archive_dir(), MANIFEST_NAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'segments': {}}
+
+
+def _save_manifest(manifest):
+    path = os.path.join(archive_dir(), MANIFEST_NAME)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _encode(row):
+    values = dict(row)
+    if values.get('timestamp') is not None:
+        values['timestamp'] = values['timestamp'].isoformat()
+    return json.dumps(values, ensure_ascii=False)
+
+
+def _decode(line):
+    values = json.loads(line)
+    if values.get('timestamp') is not None:
+        values['timestamp'] = datetime.fromisoformat(values['timestamp'])
+    return values
+
+
+class _Prefix(io.RawIOBase):
+    """파일의 앞 size바이트만 읽는다 (manifest에 기록된 세그먼트 길이까지)"""
+
+    def __init__(self, f, size):
+        self.f = f
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.f.read(min(len(buffer), self.remaining))
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+class _ArchiveLock:
+    """여러 워커/cron이 동시에 보관하지 않도록 파일 잠금"""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, '.lock')
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'w')
+        if fcntl is not None:
+            try:
+                fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.file.close()
+                raise ArchiveBusyError("다른 프로세스가 접속 로그를 보관하거나 다시 집계하는 중입니다")
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+
+def maintenance_lock():
+    """보관과 집계 재생성(log_rollups.rebuild)이 동시에 돌지 않도록 잡는 잠금
+
+    이미 잡혀 있으면 들어갈 때 ArchiveBusyError.
+    """
+    directory = archive_dir()
+    os.makedirs(directory, exist_ok=True)
+    return _ArchiveLock(directory)
+
+
+def _delete_archived(start, end, max_id):
+    """[start, end) 중 id <= max_id(보관 완료)인 원본 행을 배치로 삭제"""
+    deleted = 0
+    while True:
+        ids = select(AccessLog.id).where(
+            AccessLog.timestamp >= start,
+            AccessLog.timestamp < end,
+            AccessLog.id <= max_id
+        ).limit(DELETE_BATCH)
+        with db.engine.begin() as conn:
+            count = conn.execute(AccessLog.__table__.delete().where(AccessLog.id.in_(ids))).rowcount
+        deleted += count
+        if count < DELETE_BATCH:
+            return deleted
+
+
+def _segment_path(key):
+    return os.path.join(archive_dir(), f'access_logs-{key}.jsonl.gz')
+
+
+def _recover(manifest):
+    """세그먼트를 바꾼 뒤 manifest를 저장하기 전에 멈춘 달은 세그먼트를 원래 길이로 되돌린다
+
+    되돌린 행은 원본에 그대로 남아 있으므로(지우기 전이었음) 다시 보관된다.
+    """
+    pending = manifest.get('pending')
+    if not pending:
+        return
+    for key, state in pending.items():
+        segment = _segment_path(key)
+        if os.path.exists(segment) and os.path.getsize(segment) > state['bytes']:
+            if state['bytes']:
+                os.truncate(segment, state['bytes'])
+            else:
+                os.remove(segment)
+            logger.warning(f"접속 로그 보관 {key}: 중단된 세그먼트를 {state['bytes']:,}바이트로 되돌림")
+    manifest['pending'] = {}
+    _save_manifest(manifest)
+
+
+def _archive_month(manifest, month):
+    """한 달치 원본 로그를 세그먼트에 더하고 지운다
+
+    Returns:
+        (새로 보관한 행 수, 원본에서 지운 행 수)
+    """
+    key = month.strftime('%Y-%m')
+    end = _next_month(month)
+    entry = manifest['segments'].get(key)
+    archived_max_id = entry['max_id'] if entry else 0
+
+    # 지난 실행이 세그먼트만 쓰고 멈췄으면 남은 원본부터 지운다
+    deleted = _delete_archived(month, end, archived_max_id) if entry else 0
+
+    segment = _segment_path(key)
+    filename = os.path.basename(segment)
+    part = segment + '.part'
+
+    table = AccessLog.__table__
+    query = select(table).where(
+        AccessLog.timestamp >= month,
+        AccessLog.timestamp < end,
+        AccessLog.id > archived_max_id
+    ).order_by(AccessLog.timestamp.desc(), AccessLog.id.desc())
+
+    rows = 0
+    max_id = archived_max_id
+    first = last = None
+    with db.engine.connect() as conn, gzip.open(part, 'wt', encoding='utf-8') as out:
+        result = conn.execution_options(stream_results=True).execute(query).mappings()
+        while True:
+            batch = result.fetchmany(READ_BATCH)
+            if not batch:
+                break
+            for row in batch:
+                out.write(_encode(row) + '\n')
+                max_id = max(max_id, row['id'])
+                timestamp = row['timestamp']
+                first = timestamp if first is None else min(first, timestamp)
+                last = timestamp if last is None else max(last, timestamp)
+            rows += len(batch)
+
+    if not rows:
+        os.remove(part)
+        return 0, deleted
+
+    # 기존 세그먼트가 있으면 gzip 멤버를 이어 붙인다 (gzip은 여러 멤버를 순서대로 읽음)
+    if entry:
+        merged = segment + '.tmp'
+        with open(merged, 'wb') as out:
+            for path in (segment, part):
+                with open(path, 'rb') as src:
+                    shutil.copyfileobj(src, out)
+        os.remove(part)
+        part = merged
+    with open(part, 'rb') as f:
+        os.fsync(f.fileno())
+    # 여기서부터 manifest 저장까지 멈추면 _recover가 원래 길이로 되돌린다
+    manifest.setdefault('pending', {})[key] = {'bytes': entry['bytes'] if entry else 0}
+    _save_manifest(manifest)
+    os.replace(part, segment)
+
+    if entry:
+        first = min(first, datetime.fromisoformat(entry['first']))
+        last = max(last, datetime.fromisoformat(entry['last']))
+    manifest['segments'][key] = {
+        'file': filename,
+        'rows': (entry['rows'] if entry else 0) + rows,
+        'max_id': max_id,
+        'first': first.isoformat(),
+        'last': last.isoformat(),
+        'bytes': os.path.getsize(segment),
+        'updated': datetime.utcnow().isoformat(timespec='seconds'),
+    }
+    del manifest['pending'][key]
+    _save_manifest(manifest)
+
+    deleted += _delete_archived(month, end, max_id)
+    logger.info(f"접속 로그 보관 {key}: {rows:,}건 보관, {deleted:,}건 삭제")
+    return rows, deleted
+
+
+def archive_old_logs(retention_days=None, now=None):
+    """retention_days보다 오래된 달의 접속 로그를 세그먼트로 옮긴다 (앱 컨텍스트 필요)
+
+    기준일이 속한 달은 통째로 남겨 두므로 달마다 한 번에 보관된다.
+
+    Returns:
+        {'YYYY-MM': (보관한 행 수, 지운 행 수), ...}
+    """
+    retention_days = RETENTION_DAYS if retention_days is None else retention_days
+    now = now or datetime.utcnow()
+    cutoff = _month_start(now - timedelta(days=retention_days))
+
+    results = {}
+    with maintenance_lock():
+        manifest = load_manifest()
+        _recover(manifest)
+        with db.engine.connect() as conn:
+            oldest = conn.execute(
+                select(func.min(AccessLog.timestamp)).where(AccessLog.timestamp < cutoff)
+            ).scalar()
+        month = _month_start(oldest) if oldest else cutoff
+        while month < cutoff:
+            results[month.strftime('%Y-%m')] = _archive_month(manifest, month)
+            month = _next_month(month)
+    return results
+
+
+def read_segment(key):
+    """보관된 한 달치 행(dict)을 세그먼트 순서(최신순)대로"""
+    entry = load_manifest()['segments'][key]
+    with open(os.path.join(archive_dir(), entry['file']), 'rb') as raw:
+        # 보관 도중이면 파일 뒤에 아직 manifest에 없는 행이 붙어 있을 수 있다
+        prefix = io.BufferedReader(_Prefix(raw, entry['bytes']))
+        with gzip.open(prefix, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield _decode(line)
+
+
+def iter_archived(start=None, end=None, fortune_type=None, gender=None):
+    """보관된 로그 중 조건에 맞는 행(dict)을 최신순으로
+
+    Args:
+        start, end: [start, end) timestamp 범위 (None이면 제한 없음)
+        fortune_type, gender: 값이 있으면 같은 행만
+    """
+    for key in sorted(load_manifest()['segments'], reverse=True):
+        month = datetime.strptime(key, '%Y-%m')
+        if (start and _next_month(month) <= start) or (end and month >= end):
+            continue
+        for row in read_segment(key):
+            timestamp = row['timestamp']
+            if start and timestamp < start:
+                continue
+            if end and timestamp >= end:
+                continue
+            if fortune_type and row.get('fortune_type') != fortune_type:
+                continue
+            if gender and row.get('gender') != gender:
+                continue
+            yield row
+
+
+def iter_archived_batches(size=READ_BATCH):
+    """보관된 모든 행을 size개씩 (집계 재생성용)"""
+    batch = []
+    for key in sorted(load_manifest()['segments']):
+        for row in read_segment(key):
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def archived_until():
+    """이 시각 이전은 모두 보관됨 (마지막으로 보관한 달의 다음 달 1일, 없으면 None)"""
+    segments = load_manifest()['segments']
+    if not segments:
+        return None
+    return _next_month(datetime.strptime(max(segments), '%Y-%m'))
+
+
+def stats():
+    """관리자 화면용 보관 현황"""
+    segments = load_manifest()['segments']
+    return {
+        'retention_days': RETENTION_DAYS,
+        'segments': len(segments),
+        'rows': sum(entry['rows'] for entry in segments.values()),
+        'size_mb': round(sum(entry['bytes'] for entry in segments.values()) / (1024 * 1024), 2),
+        'oldest': min(segments) if segments else None,
+        'newest': max(segments) if segments else None,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from app import app
+
+    parser = argparse.ArgumentParser(description='오래된 접속 로그를 월별 세그먼트로 보관')
+    parser.add_argument('--days', type=int, default=None,
+                        help=f'원본 테이블에 남길 기간 (일, 기본 LOG_RETENTION_DAYS={RETENTION_DAYS})')
+    args = parser.parse_args()
+
+    with app.app_context():
+        for month, (archived, deleted) in archive_old_logs(args.days).items():
+            print(f"{month}: {archived:,}건 보관, {deleted:,}건 삭제")
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 접속 로그 내보내기 (엑셀 / CSV)
+
+몇 달치 로그를 ORM 객체로 한 번에 읽고 Workbook을 메모리에 만들면
+행 수에 비례해 메모리를 쓰다 워커가 죽는다. 대신
+- 원본 로그는 서버 측 커서에서 CHUNK_SIZE행씩 읽고
+- 보관된 달은 세그먼트(log_archive)를 한 줄씩 읽어
+- 엑셀은 openpyxl write-only 워크북(행을 파일에 바로 씀)으로,
+  CSV는 바이트 청크(선택적으로 gzip)로 흘려보낸다.
+어느 쪽이든 메모리 사용량은 행 수와 상관없이 일정하다.
+"""
+
+import os
+import csv
+import io
+import zlib
+from datetime import datetime, timedelta
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.utils import get_column_letter
+from sqlalchemy import select
+
+import log_archive
+from models import db, AccessLog
+
+CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+HEADERS = ["번호", "접속시간", "IP주소", "운세종류", "생년월일", "출생시간", "성별", "양/음력"]
+COLUMN_WIDTHS = [8, 20, 15, 15, 15, 15, 10, 12]
+
+# 다운로드 형식: (확장자, MIME)
+FORMATS = {
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('csv', 'text/csv; charset=utf-8'),
+    'csv.gz': ('csv.gz', 'application/gzip'),
+}
+
+
+def parse_log_filters(args):
+    """요청 파라미터 -> 접속 로그 필터 (운세 종류, 성별, [start, end) 기간)
+
+    date_to는 그날 전체를 포함하도록 다음날 0시를 end로 쓴다.
+    """
+    date_from = args.get('date_from')
+    date_to = args.get('date_to')
+    return {
+        'fortune_type': args.get('fortune_type') or None,
+        'gender': args.get('gender') or None,
+        'start': datetime.strptime(date_from, '%Y-%m-%d') if date_from else None,
+        'end': datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1) if date_to else None,
+    }
+
+
+def apply_log_filters(query, filters):
+    """ORM Query나 select()에 parse_log_filters 조건 적용"""
+    if filters['fortune_type']:
+        query = query.filter(AccessLog.fortune_type == filters['fortune_type'])
+    if filters['gender']:
+        query = query.filter(AccessLog.gender == filters['gender'])
+    if filters['start']:
+        query = query.filter(AccessLog.timestamp >= filters['start'])
+    if filters['end']:
+        query = query.filter(AccessLog.timestamp < filters['end'])
+    return query
+
+
+def iter_logs(filters):
+    """조건에 맞는 접속 로그를 최신순으로 (원본 -> 보관된 달), 행은 dict 형태
+
+    앱 컨텍스트 필요. 원본은 연결 하나에서 CHUNK_SIZE행씩 가져온다.
+    """
+    query = apply_log_filters(select(AccessLog.__table__), filters).order_by(
+        AccessLog.timestamp.desc(), AccessLog.id.desc()
+    )
+    with db.engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=CHUNK_SIZE).execute(query).mappings()
+        for chunk in result.partitions(CHUNK_SIZE):
+            yield from chunk
+    yield from log_archive.iter_archived(**filters)
+
+
+def _values(number, row):
+    timestamp = row['timestamp']
+    return [
+        number,
+        timestamp.strftime('%Y-%m-%d %H:%M:%S') if timestamp else '-',
+        row['ip_address'] or '-',
+        row['fortune_type'] or '-',
+        row['birth_date'] or '-',
+        row['birth_time'] or '-',
+        row['gender'] or '-',
+        row['calendar_type'] or '-',
+    ]
+
+
+def write_xlsx(rows, path):
+    """rows를 write-only 워크북으로 path에 저장
+
+    Returns:
+        기록한 행 수
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("접속 로그")
+    for col, width in enumerate(COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    header_fill = PatternFill(start_color="667EEA", end_color="667EEA", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    header = []
+    for title in HEADERS:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header.append(cell)
+    ws.append(header)
+
+    count = 0
+    for count, row in enumerate(rows, 1):
+        ws.append(_values(count, row))
+    wb.save(path)
+    return count
+
+
+def iter_csv(rows, compress=False):
+    """rows를 CSV 바이트 청크로 (엑셀에서 한글이 깨지지 않게 UTF-8 BOM 포함)
+
+    compress=True면 gzip 스트림으로 압축해서 내보낸다.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    buffer.write('\ufeff')
+    writer.writerow(HEADERS)
+    for number, row in enumerate(rows, 1):
+        writer.writerow(_values(number, row))
+        if number % CHUNK_SIZE == 0:
+            chunk = flush()
+            if chunk:
+                yield chunk
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
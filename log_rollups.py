@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 접속 로그 집계 테이블
+
+대시보드/플랫폼 통계가 페이지를 열 때마다 access_logs 전체를 GROUP BY하면
+로그가 수천만 건이 될수록 느려진다. 대신 (시간 또는 날짜, 운세 종류, 성별,
+양/음력)별 건수를 access_log_hourly / access_log_daily에 유지하고 통계는
+여기서 읽는다.
+
+- log_writer가 access_logs를 일괄 INSERT하는 같은 트랜잭션에서 건수를 더한다.
+- rebuild()는 원본 로그와 보관된 세그먼트로 두 테이블을 하루치씩 다시 만든다.
+  하루치를 짧은 트랜잭션 하나로 바꾸므로 그동안에도 로그 기록이 잠금 대기
+  시간(busy_timeout)을 넘기지 않는다.
+- 기존 DB를 업그레이드하면 시작할 때 ensure_built()가 한 워커에서만
+  백그라운드로 한 번 채운다 (상태는 site_settings에 기록).
+- 시간 단위 자르기는 파이썬에서 하므로 SQLite 전용 함수를 쓰지 않는다.
+"""
+
+import time
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+import log_archive
+from models import db, AccessLog, AccessLogHourly, AccessLogDaily, SiteSettings
+
+logger = logging.getLogger(__name__)
+
+# 집계 키 (값이 없으면 ''로 모은다)
+ROLLUP_KEYS = ('fortune_type', 'gender', 'calendar_type')
+
+# 집계 테이블 상태 ('building': 재생성 중이거나 중간에 멈춤, 'done': 완료)
+STATE_SETTING = 'access_log_rollups'
+
+_UPSERT = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def _upsert(conn, model, bucket, counts):
+    """(bucket, 키...)별 건수를 더한다 (없으면 새 행)"""
+    if not counts:
+        return
+    table = model.__table__
+    stmt = _UPSERT[conn.dialect.name](table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[bucket, *ROLLUP_KEYS],
+        set_={'count': table.c.count + stmt.excluded.count}
+    )
+    conn.execute(stmt, [
+        dict(zip((bucket, *ROLLUP_KEYS), key), count=count)
+        for key, count in counts.items()
+    ])
+
+
+def _count(rows):
+    """rows(dict 목록) -> (시간별, 일별) 건수"""
+    hourly = Counter()
+    daily = Counter()
+    for row in rows:
+        timestamp = row.get('timestamp') or datetime.utcnow()
+        key = tuple(row.get(name) or '' for name in ROLLUP_KEYS)
+        hourly[(timestamp.replace(minute=0, second=0, microsecond=0), *key)] += 1
+        daily[(timestamp.date(), *key)] += 1
+    return hourly, daily
+
+
+def record(conn, rows):
+    """access_logs에 넣은 rows(dict 목록)를 집계 테이블에 반영 (log_writer 리스너)"""
+    hourly, daily = _count(rows)
+    _upsert(conn, AccessLogHourly, 'hour', hourly)
+    _upsert(conn, AccessLogDaily, 'day', daily)
+
+
+def _state():
+    setting = SiteSettings.query.filter_by(key=STATE_SETTING).first()
+    return setting.value if setting else None
+
+
+def _set_state(state):
+    setting = SiteSettings.query.filter_by(key=STATE_SETTING).first()
+    if setting is None:
+        db.session.add(SiteSettings(key=STATE_SETTING, value=state, description='접속 로그 집계 테이블 상태'))
+    else:
+        setting.value = state
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # 다른 워커가 먼저 행을 만들었다
+        db.session.rollback()
+        SiteSettings.query.filter_by(key=STATE_SETTING).update({'value': state})
+        db.session.commit()
+
+
+def _archived_hourly():
+    """보관된 세그먼트의 날짜 -> 시간별 건수 (세그먼트는 잠금 안에서 바뀌지 않는다)"""
+    by_day = defaultdict(Counter)
+    for rows in log_archive.iter_archived_batches():
+        for (hour, *key), count in _count(rows)[0].items():
+            by_day[hour.date()][(hour, *key)] += count
+    return by_day
+
+
+def _rebuild_days(archived):
+    """다시 만들 날짜 (원본 로그, 보관된 로그, 기존 집계 중 가장 이른 날부터 늦은 날까지)"""
+    with db.engine.connect() as conn:
+        first, last = conn.execute(
+            select(func.min(AccessLog.timestamp), func.max(AccessLog.timestamp))
+        ).one()
+        first_day, last_day = conn.execute(
+            select(func.min(AccessLogDaily.day), func.max(AccessLogDaily.day))
+        ).one()
+    bounds = [day for day in (first and first.date(), last and last.date(), first_day, last_day) if day]
+    bounds.extend(archived)
+    if not bounds:
+        return
+    day, last = min(bounds), max(bounds)
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def _rebuild_day(day, archived, archived_max_id):
+    """하루치 집계 행을 지우고 원본 + 보관된 로그로 다시 채운다 (트랜잭션 하나)
+
+    원본 중 id <= archived_max_id인 행은 이미 세그먼트에 있으므로 세지 않는다
+    (보관 직후 아직 지우지 못한 행).
+
+    Returns:
+        그날 집계한 건수
+    """
+    start = datetime(day.year, day.month, day.day)
+    end = start + timedelta(days=1)
+    live = select(AccessLog.timestamp, *(getattr(AccessLog, name) for name in ROLLUP_KEYS)).where(
+        AccessLog.timestamp >= start,
+        AccessLog.timestamp < end,
+        AccessLog.id > archived_max_id
+    )
+
+    with db.engine.begin() as conn:
+        # 지우기부터 해서 쓰기 잠금을 먼저 잡으면 읽는 동안 새 로그가 끼어들지 않는다
+        conn.execute(AccessLogHourly.__table__.delete().where(
+            AccessLogHourly.hour >= start, AccessLogHourly.hour < end
+        ))
+        conn.execute(AccessLogDaily.__table__.delete().where(AccessLogDaily.day == day))
+        hourly, daily = _count(conn.execute(live).mappings())
+        for (hour, *key), count in archived.items():
+            hourly[(hour, *key)] += count
+            daily[(day, *key)] += count
+        _upsert(conn, AccessLogHourly, 'hour', hourly)
+        _upsert(conn, AccessLogDaily, 'day', daily)
+    return sum(daily.values())
+
+
+def rebuild():
+    """원본 access_logs와 보관된 세그먼트(log_archive)로 집계 테이블을 다시 만든다
+
+    하루치씩 짧은 트랜잭션으로 바꾸므로 그동안 들어오는 로그도 그날의
+    트랜잭션 전후 어느 한쪽에서 정확히 한 번 더해진다. 보관 작업과 같은
+    잠금을 잡으므로 동시에 돌지 않는다. 앱 컨텍스트 필요.
+
+    Returns:
+        다시 집계한 로그 건수
+
+    Raises:
+        log_archive.ArchiveBusyError: 다른 프로세스가 보관/재생성 중
+    """
+    started = time.monotonic()
+    with log_archive.maintenance_lock():
+        _set_state('building')
+        archived = _archived_hourly()
+        max_ids = {
+            key: entry['max_id'] for key, entry in log_archive.load_manifest()['segments'].items()
+        }
+        total = 0
+        for day in _rebuild_days(archived):
+            total += _rebuild_day(day, archived.get(day, {}), max_ids.get(day.strftime('%Y-%m'), 0))
+            time.sleep(0)  # gevent 워커에서 다른 요청에 차례를 넘긴다
+        _set_state('done')
+
+    logger.info(f"접속 로그 집계 재생성: {total:,}건 ({time.monotonic() - started:.1f}초)")
+    return total
+
+
+def _rebuild_in_background(app):
+    with app.app_context():
+        try:
+            rebuild()
+        except log_archive.ArchiveBusyError:
+            logger.info("다른 프로세스가 접속 로그를 보관하거나 다시 집계하는 중이라 건너뜀")
+        except Exception as e:
+            logger.error(f"접속 로그 집계 재생성 실패: {e}")
+        finally:
+            db.session.remove()
+
+
+def ensure_built(app):
+    """집계 테이블이 아직 채워지지 않았으면 백그라운드 스레드에서 한 번 다시 만든다
+
+    새 DB이거나 예전 버전이 이미 채운 DB는 완료로 기록만 한다. 기존 DB를
+    업그레이드했거나 지난 재생성이 중간에 멈췄으면(상태 'building') 다시 만든다.
+    워커마다 호출되어도 rebuild()의 잠금으로 한 곳에서만 실행된다. 앱 컨텍스트 필요.
+    """
+    state = _state()
+    if state == 'done':
+        return
+    if state is None and (
+        AccessLogDaily.query.first() is not None
+        or (AccessLog.query.first() is None and not log_archive.load_manifest()['segments'])
+    ):
+        _set_state('done')
+        return
+
+    threading.Thread(
+        target=_rebuild_in_background, args=(app,), name='rollup-rebuild', daemon=True
+    ).start()
+
+
+def total_count():
+    """전체 접속 수"""
+    return db.session.query(func.coalesce(func.sum(AccessLogDaily.count), 0)).scalar()
+
+
+def count_between(start, end=None):
+    """[start, end) 접속 수 (시 단위로 정확)"""
+    query = db.session.query(func.coalesce(func.sum(AccessLogHourly.count), 0)).filter(
+        AccessLogHourly.hour >= start
+    )
+    if end is not None:
+        query = query.filter(AccessLogHourly.hour < end)
+    return query.scalar()
+
+
+def counts_by(name, limit=None, skip_blank=False):
+    """키 하나(fortune_type/gender/calendar_type)별 전체 접속 수 [(값, 건수), ...]
+
+    값이 없는 로그는 ''로 나온다. limit이 있으면 건수가 많은 순으로 자른다.
+    """
+    column = getattr(AccessLogDaily, name)
+    total = func.sum(AccessLogDaily.count)
+    query = db.session.query(column, total.label('count')).group_by(column)
+    if skip_blank:
+        query = query.filter(column != '')
+    if limit:
+        query = query.order_by(total.desc()).limit(limit)
+    return query.all()
+
+
+def count_logs(start=None, end=None, fortune_type=None, gender=None):
+    """조건에 맞는 접속 수 (접속 로그 목록의 총 건수)
+
+    start/end는 날짜 단위([start, end), 0시 기준)로 자른다.
+    """
+    query = db.session.query(func.coalesce(func.sum(AccessLogDaily.count), 0))
+    if start is not None:
+        query = query.filter(AccessLogDaily.day >= start.date())
+    if end is not None:
+        query = query.filter(AccessLogDaily.day < end.date())
+    if fortune_type:
+        query = query.filter(AccessLogDaily.fortune_type == fortune_type)
+    if gender:
+        query = query.filter(AccessLogDaily.gender == gender)
+    return query.scalar()
+
+
+def dashboard_counts(today, week_start):
+    """대시보드 카운터와 분포를 access_log_daily 한 번 훑어서 계산
+
+    (운세 종류, 성별)별로 전체/오늘/week_start 이후 건수를 조건부 합계로 구한 뒤
+    파이썬에서 접는다. 그룹 수는 운세 종류 x 성별 정도라 작다.
+
+    Returns:
+        dict(total_access, today_access, week_access,
+             fortune_stats=[(운세 종류, 건수), ...] 상위 10개,
+             gender_stats=[(성별, 건수), ...] 값이 있는 것만)
+    """
+    day = AccessLogDaily.day
+    count = AccessLogDaily.count
+    rows = db.session.query(
+        AccessLogDaily.fortune_type,
+        AccessLogDaily.gender,
+        func.sum(count),
+        func.sum(case((day == today, count), else_=0)),
+        func.sum(case((day >= week_start, count), else_=0)),
+    ).group_by(AccessLogDaily.fortune_type, AccessLogDaily.gender).all()
+
+    totals = Counter()
+    fortunes = Counter()
+    genders = Counter()
+    for fortune_type, gender, total, today_count, week_count in rows:
+        totals['total_access'] += total
+        totals['today_access'] += today_count
+        totals['week_access'] += week_count
+        fortunes[fortune_type] += total
+        if gender:
+            genders[gender] += total
+
+    return {
+        'total_access': totals['total_access'],
+        'today_access': totals['today_access'],
+        'week_access': totals['week_access'],
+        'fortune_stats': fortunes.most_common(10),
+        'gender_stats': sorted(genders.items()),
+    }
+
+
+def daily_counts(since):
+    """since 날짜부터 일별 접속 수 [(날짜, 건수), ...]"""
+    return db.session.query(
+        AccessLogDaily.day,
+        func.sum(AccessLogDaily.count).label('count')
+    ).filter(
+        AccessLogDaily.day >= since
+    ).group_by(AccessLogDaily.day).order_by(AccessLogDaily.day).all()
+
+
+def hourly_counts(start, end):
+    """[start, end) 시간대('00'~'23')별 접속 수 [(시, 건수), ...]"""
+    rows = db.session.query(
+        AccessLogHourly.hour,
+        func.sum(AccessLogHourly.count)
+    ).filter(
+        AccessLogHourly.hour >= start,
+        AccessLogHourly.hour < end
+    ).group_by(AccessLogHourly.hour).all()
+
+    counts = Counter()
+    for hour, count in rows:
+        counts[hour.strftime('%H')] += count
+    return sorted(counts.items())
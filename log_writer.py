@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 접속 로그 / API 사용량 일괄 기록
+
+요청마다 db.session.commit()을 하면 SQLite에서는 요청 하나당 fsync가 붙은
+트랜잭션 하나가 생기고 그동안 워커가 멈춘다. 대신 행을 메모리 큐에 넣고
+백그라운드 스레드가 batch_size행 또는 flush_interval초마다 executemany로
+한 번에 넣는다.
+
+- 큐가 가득 차면 행을 버리고 dropped를 늘리며 경고 로그를 남긴다.
+- 프로세스 종료(atexit, gunicorn worker_exit) 시 남은 행을 모두 기록한다.
+- 스레드는 처음 기록할 때 시작하므로 gunicorn fork 이후 워커마다 따로 뜬다.
+- listen()으로 등록한 콜백은 INSERT와 같은 트랜잭션에서 실행된다 (log_rollups).
+"""
+
+import os
+import atexit
+import queue
+import threading
+import time
+import logging
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# 큐가 넘쳤을 때 경고 로그 간격 (초)
+OVERFLOW_REPORT_INTERVAL = 10
+
+
+class BufferedLogWriter:
+    """유한 큐 + 백그라운드 일괄 INSERT"""
+
+    def __init__(self, max_queue=10000, batch_size=200, flush_interval=0.5):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._app = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._last_overflow_report = 0.0
+        self._listeners = {}
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def init_app(self, app):
+        """앱 등록 (기록 스레드가 app_context 안에서 DB에 쓴다)"""
+        self._app = app
+        atexit.register(self.stop)
+
+    def listen(self, model, callback):
+        """model 행을 기록한 트랜잭션 안에서 callback(conn, rows)를 호출 (집계 테이블 갱신 등)"""
+        self._listeners.setdefault(model.__table__, []).append(callback)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+            self._thread.start()
+
+    def write(self, model, /, **values):
+        """model 테이블에 행 하나를 기록 예약
+
+        같은 model에는 항상 같은 컬럼을 넘긴다 (executemany로 묶기 위해).
+
+        Returns:
+            큐에 들어갔으면 True, 큐가 가득 차 버렸으면 False
+        """
+        if self._app is None:
+            raise RuntimeError("log_writer.init_app(app)을 먼저 호출해야 합니다")
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((model.__table__, values))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            self._report_overflow()
+            return False
+
+    def _report_overflow(self):
+        now = time.monotonic()
+        if now - self._last_overflow_report >= OVERFLOW_REPORT_INTERVAL:
+            self._last_overflow_report = now
+            logger.warning(
+                f"로그 기록 큐가 가득 차 행을 버렸습니다 (누적 {self.dropped}건, 큐 크기 {self.max_queue})"
+            )
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _collect(self):
+        """batch_size행이 모이거나 첫 행 이후 flush_interval초가 지날 때까지 모은다"""
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            timeout = self.flush_interval if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _flush(self, batch):
+        rows_by_table = {}
+        for table, values in batch:
+            rows_by_table.setdefault(table, []).append(values)
+
+        with self._flush_lock, self._app.app_context():
+            for table, rows in rows_by_table.items():
+                try:
+                    with db.engine.begin() as conn:
+                        conn.execute(table.insert(), rows)
+                        for callback in self._listeners.get(table, ()):
+                            callback(conn, rows)
+                    self.written += len(rows)
+                except Exception as e:
+                    self.failed += len(rows)
+                    logger.error(f"{table.name} 일괄 기록 실패 ({len(rows)}건): {e}")
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def stop(self, timeout=10):
+        """남은 행을 모두 기록하고 기록 스레드 종료"""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            thread.join(timeout)
+        # 스레드가 없거나(시작 전, fork 이후) 제시간에 끝나지 않았으면 직접 기록
+        remaining = self._drain()
+        if remaining and self._app is not None:
+            self._flush(remaining)
+        self._thread = None
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'max_queue': self.max_queue,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+
+log_writer = BufferedLogWriter(
+    max_queue=int(os.getenv('LOG_QUEUE_SIZE', 10000)),
+    batch_size=int(os.getenv('LOG_BATCH_SIZE', 200)),
+    flush_interval=int(os.getenv('LOG_FLUSH_MS', 500)) / 1000
+)
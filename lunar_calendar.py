@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 음력/양력 변환 색인
+
+1900~2100년 음력의 모든 날짜를 모듈을 불러올 때 배열 두 개로 펼쳐 두고
+변환할 때는 배열 조회만 한다. 윤달을 지원하며, 음력 자료는 lunardate와
+같은 표를 쓰므로 결과도 lunardate와 같다 (2100년은 한 해를 더했다).
+
+- 음력 -> 양력: 달마다 시작일을 담은 배열 (해당 연도 * 14 + 달 순번)
+- 양력 -> 음력: 날짜마다 (연, 윤달 여부, 월, 일)을 정수 하나로 묶은 배열
+
+벤치마크 (lunardate와 비교):
+    python lunar_calendar.py
+"""
+
+from array import array
+from datetime import date, timedelta
+
+FIRST_YEAR = 1900
+LAST_YEAR = 2100
+
+# 음력 1900년 1월 1일 = 양력 1900년 1월 31일
+_EPOCH = date(1900, 1, 31)
+
+# 연도별 음력 정보 (lunardate와 같은 형식)
+#   비트 16    : 윤달이 큰달(30일)이면 1
+#   비트 15~4  : 1~12월이 큰달이면 1
+#   비트 3~0   : 윤달 (0이면 윤달 없음)
+YEAR_INFOS = [
+    0x04bd8,                                      # 1900
+    0x04ae0, 0x0a570, 0x054d5, 0x0d260, 0x0d950,  # 1905
+    0x16554, 0x056a0, 0x09ad0, 0x055d2, 0x04ae0,  # 1910
+    0x0a5b6, 0x0a4d0, 0x0d250, 0x1d255, 0x0b540,  # 1915
+    0x0d6a0, 0x0ada2, 0x095b0, 0x14977, 0x04970,  # 1920
+    0x0a4b0, 0x0b4b5, 0x06a50, 0x06d40, 0x1ab54,  # 1925
+    0x02b60, 0x09570, 0x052f2, 0x04970, 0x06566,  # 1930
+    0x0d4a0, 0x0ea50, 0x06e95, 0x05ad0, 0x02b60,  # 1935
+    0x186e3, 0x092e0, 0x1c8d7, 0x0c950, 0x0d4a0,  # 1940
+    0x1d8a6, 0x0b550, 0x056a0, 0x1a5b4, 0x025d0,  # 1945
+    0x092d0, 0x0d2b2, 0x0a950, 0x0b557, 0x06ca0,  # 1950
+    0x0b550, 0x15355, 0x04da0, 0x0a5d0, 0x14573,  # 1955
+    0x052b0, 0x0a9a8, 0x0e950, 0x06aa0, 0x0aea6,  # 1960
+    0x0ab50, 0x04b60, 0x0aae4, 0x0a570, 0x05260,  # 1965
+    0x0f263, 0x0d950, 0x05b57, 0x056a0, 0x096d0,  # 1970
+    0x04dd5, 0x04ad0, 0x0a4d0, 0x0d4d4, 0x0d250,  # 1975
+    0x0d558, 0x0b540, 0x0b5a0, 0x195a6, 0x095b0,  # 1980
+    0x049b0, 0x0a974, 0x0a4b0, 0x0b27a, 0x06a50,  # 1985
+    0x06d40, 0x0af46, 0x0ab60, 0x09570, 0x04af5,  # 1990
+    0x04970, 0x064b0, 0x074a3, 0x0ea50, 0x06b58,  # 1995
+    0x05ac0, 0x0ab60, 0x096d5, 0x092e0, 0x0c960,  # 2000
+    0x0d954, 0x0d4a0, 0x0da50, 0x07552, 0x056a0,  # 2005
+    0x0abb7, 0x025d0, 0x092d0, 0x0cab5, 0x0a950,  # 2010
+    0x0b4a0, 0x0baa4, 0x0ad50, 0x055d9, 0x04ba0,  # 2015
+    0x0a5b0, 0x15176, 0x052b0, 0x0a930, 0x07954,  # 2020
+    0x06aa0, 0x0ad50, 0x05b52, 0x04b60, 0x0a6e6,  # 2025
+    0x0a4e0, 0x0d260, 0x0ea65, 0x0d530, 0x05aa0,  # 2030
+    0x076a3, 0x096d0, 0x04afb, 0x04ad0, 0x0a4d0,  # 2035
+    0x1d0b6, 0x0d250, 0x0d520, 0x0dd45, 0x0b5a0,  # 2040
+    0x056d0, 0x055b2, 0x049b0, 0x0a577, 0x0a4b0,  # 2045
+    0x0aa50, 0x1b255, 0x06d20, 0x0ada0, 0x14b63,  # 2050
+    0x09370, 0x049f8, 0x04970, 0x064b0, 0x168a6,  # 2055
+    0x0ea50, 0x06aa0, 0x1a6c4, 0x0aae0, 0x092e0,  # 2060
+    0x0d2e3, 0x0c960, 0x0d557, 0x0d4a0, 0x0da50,  # 2065
+    0x05d55, 0x056a0, 0x0a6d0, 0x055d4, 0x052d0,  # 2070
+    0x0a9b8, 0x0a950, 0x0b4a0, 0x0b6a6, 0x0ad50,  # 2075
+    0x055a0, 0x0aba4, 0x0a5b0, 0x052b0, 0x0b273,  # 2080
+    0x06930, 0x07337, 0x06aa0, 0x0ad50, 0x14b55,  # 2085
+    0x04b60, 0x0a570, 0x054e4, 0x0d160, 0x0e968,  # 2090
+    0x0d520, 0x0daa0, 0x16aa6, 0x056d0, 0x04ae0,  # 2095
+    0x0a9d4, 0x0a2d0, 0x0d150, 0x0f252, 0x0d520,  # 2100
+]
+
+_SLOTS = 14  # 연도마다 달 시작일 13개(윤달 포함) + 다음 해 시작일
+
+
+def _month_lengths(info):
+    """한 해의 (월, 윤달 여부, 일수) 목록"""
+    leap = info & 0xf
+    months = []
+    for month in range(1, 13):
+        months.append((month, False, 30 if info & (0x10000 >> month) else 29))
+        if month == leap:
+            months.append((month, True, 30 if info & 0x10000 else 29))
+    return months
+
+
+def _build_index():
+    month_starts = array('l', [-1]) * (len(YEAR_INFOS) * _SLOTS)
+    leap_months = array('b', (info & 0xf for info in YEAR_INFOS))
+    by_day = array('l')  # (연 << 10) | (윤달 << 9) | (월 << 5) | 일
+
+    offset = 0
+    for index, info in enumerate(YEAR_INFOS):
+        year = FIRST_YEAR + index
+        base = index * _SLOTS
+        for slot, (month, is_leap, days) in enumerate(_month_lengths(info)):
+            month_starts[base + slot] = offset
+            packed = (year << 10) | (int(is_leap) << 9) | (month << 5)
+            by_day.extend(range(packed + 1, packed + days + 1))
+            offset += days
+        month_starts[base + _SLOTS - 1] = offset
+    return month_starts, leap_months, by_day
+
+
+_MONTH_STARTS, _LEAP_MONTHS, _LUNAR_BY_DAY = _build_index()
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+LAST_SOLAR_DATE = _EPOCH + timedelta(days=len(_LUNAR_BY_DAY) - 1)
+
+
+def leap_month(year):
+    """그 해의 윤달 (없으면 None)"""
+    if not FIRST_YEAR <= year <= LAST_YEAR:
+        raise ValueError(f"음력 {FIRST_YEAR}~{LAST_YEAR}년만 지원합니다")
+    return _LEAP_MONTHS[year - FIRST_YEAR] or None
+
+
+def _day_offset(year, month, day, is_leap_month=False):
+    """음력 날짜의 기준일(1900-01-31)로부터 일수"""
+    if not FIRST_YEAR <= year <= LAST_YEAR:
+        raise ValueError(f"음력 {FIRST_YEAR}~{LAST_YEAR}년만 지원합니다")
+    if not 1 <= month <= 12:
+        raise ValueError(f"잘못된 음력 월: {month}")
+    leap = _LEAP_MONTHS[year - FIRST_YEAR]
+    if is_leap_month and leap != month:
+        raise ValueError(f"음력 {year}년에는 윤{month}월이 없습니다")
+    # 윤달 뒤의 달(윤달 자신 포함)은 순번이 하나씩 밀린다
+    slot = month - 1 + (1 if leap and (month > leap or is_leap_month) else 0)
+    base = (year - FIRST_YEAR) * _SLOTS + slot
+    start = _MONTH_STARTS[base]
+    end = _MONTH_STARTS[base + 1]
+    if end < 0:
+        end = _MONTH_STARTS[base - slot + _SLOTS - 1]
+    if not 1 <= day <= end - start:
+        raise ValueError(f"음력 {year}년 {month}월에는 {day}일이 없습니다")
+    return start + day - 1
+
+
+def lunar_to_solar(year, month, day, is_leap_month=False):
+    """음력 -> 양력 date
+
+    Raises:
+        ValueError: 지원 범위를 벗어나거나 없는 날짜인 경우
+    """
+    return date.fromordinal(_EPOCH_ORDINAL + _day_offset(year, month, day, is_leap_month))
+
+
+def solar_to_lunar(solar_date):
+    """양력 date -> (음력 연, 월, 일, 윤달 여부)
+
+    Raises:
+        ValueError: 지원 범위를 벗어난 경우
+    """
+    offset = solar_date.toordinal() - _EPOCH_ORDINAL
+    if not 0 <= offset < len(_LUNAR_BY_DAY):
+        raise ValueError(f"양력 {_EPOCH} ~ {LAST_SOLAR_DATE} 사이만 지원합니다")
+    packed = _LUNAR_BY_DAY[offset]
+    return packed >> 10, (packed >> 5) & 0xf, packed & 0x1f, bool(packed & 0x200)
+
+
+def parse_date(date_str):
+    """'YYYY-MM-DD' -> (연, 월, 일)"""
+    parts = date_str.split('-')
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"잘못된 날짜 형식: {date_str}")
+    return int(parts[0]), int(parts[1]), int(parts[2])
+
+
+def bulk_lunar_to_solar(lunar_dates):
+    """여러 음력 날짜를 한 번에 양력으로 (배치/통계용)
+
+    Args:
+        lunar_dates: (연, 월, 일) 또는 (연, 월, 일, 윤달 여부) 튜플 목록
+
+    Returns:
+        같은 순서의 양력 date 목록 (변환할 수 없는 날짜는 None)
+    """
+    results = []
+    append = results.append
+    for lunar in lunar_dates:
+        try:
+            append(date.fromordinal(_EPOCH_ORDINAL + _day_offset(*lunar)))
+        except (ValueError, TypeError):
+            append(None)
+    return results
+
+
+def bulk_solar_to_lunar(solar_dates):
+    """여러 양력 date를 한 번에 음력 (연, 월, 일, 윤달 여부)로 (범위 밖은 None)"""
+    results = []
+    append = results.append
+    size = len(_LUNAR_BY_DAY)
+    for solar_date in solar_dates:
+        offset = solar_date.toordinal() - _EPOCH_ORDINAL
+        if 0 <= offset < size:
+            packed = _LUNAR_BY_DAY[offset]
+            append((packed >> 10, (packed >> 5) & 0xf, packed & 0x1f, bool(packed & 0x200)))
+        else:
+            append(None)
+    return results
+
+
+def _benchmark(count=100000):
+    import random
+    import timeit
+    import warnings
+
+    # lunardate 0.3의 toSolarDate/fromSolarDate 사용 중단 경고 숨김 (0.2와 호환)
+    warnings.simplefilter('ignore', DeprecationWarning)
+
+    rng = random.Random(42)
+    solar_dates = [
+        date.fromordinal(rng.randint(_EPOCH_ORDINAL, _EPOCH_ORDINAL + 72000))
+        for _ in range(count)
+    ]
+    lunar_dates = bulk_solar_to_lunar(solar_dates)
+
+    def report(name, seconds):
+        print(f"{name:<32} {seconds * 1e6 / count:8.3f} µs/건  ({count}건 {seconds:.3f}초)")
+
+    report("lunar_to_solar", timeit.timeit(
+        lambda: [lunar_to_solar(*lunar) for lunar in lunar_dates], number=1))
+    report("bulk_lunar_to_solar", timeit.timeit(lambda: bulk_lunar_to_solar(lunar_dates), number=1))
+    report("solar_to_lunar", timeit.timeit(
+        lambda: [solar_to_lunar(d) for d in solar_dates], number=1))
+    report("bulk_solar_to_lunar", timeit.timeit(lambda: bulk_solar_to_lunar(solar_dates), number=1))
+
+    try:
+        from lunardate import LunarDate
+    except ImportError:
+        print("lunardate가 설치되어 있지 않아 비교를 생략합니다")
+        return
+
+    report("lunardate toSolarDate", timeit.timeit(
+        lambda: [LunarDate(*lunar).toSolarDate() for lunar in lunar_dates], number=1))
+    report("lunardate fromSolarDate", timeit.timeit(
+        lambda: [LunarDate.fromSolarDate(d.year, d.month, d.day) for d in solar_dates], number=1))
+
+    mismatches = sum(
+        1 for d, lunar in zip(solar_dates, lunar_dates)
+        if d.year < 2100 and LunarDate(*lunar).toSolarDate() != d
+    )
+    print(f"lunardate와 결과가 다른 날짜: {mismatches}건")
+
+
+if __name__ == '__main__':
+    _benchmark()
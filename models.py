@@ -4,6 +4,7 @@
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
@@ -44,14 +45,65 @@ class AccessLog(db.Model):
     birth_time = db.Column(db.String(20))
     gender = db.Column(db.String(10))
     calendar_type = db.Column(db.String(10))  # solar/lunar
+    is_leap_month = db.Column(db.Boolean, default=False)  # 음력 윤달
     fortune_type = db.Column(db.String(50))  # 운세 종류
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     location = db.Column(db.String(100))  # 접속 위치 (선택)
     
+    # 관리자 화면의 필터 조합용: 기간 조회/최신순 정렬, 운세/성별 + 기간
+    __table_args__ = (
+        db.Index('ix_access_logs_timestamp', 'timestamp'),
+        db.Index('ix_access_logs_fortune_type_timestamp', 'fortune_type', 'timestamp'),
+        db.Index('ix_access_logs_gender_timestamp', 'gender', 'timestamp'),
+    )
+    
     def __repr__(self):
         return f'<AccessLog {self.ip_address} - {self.fortune_type}>'
 
 
+class AccessLogHourly(db.Model):
+    """접속 로그 시간별 집계 (log_rollups가 로그 기록과 함께 갱신)
+
+    fortune_type/gender/calendar_type이 없는 로그는 ''로 모은다.
+    """
+    __tablename__ = 'access_log_hourly'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)  # 시 단위로 자른 timestamp
+    fortune_type = db.Column(db.String(50), nullable=False, default='')
+    gender = db.Column(db.String(10), nullable=False, default='')
+    calendar_type = db.Column(db.String(10), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('hour', 'fortune_type', 'gender', 'calendar_type',
+                            name='uq_access_log_hourly_key'),
+    )
+    
+    def __repr__(self):
+        return f'<AccessLogHourly {self.hour} {self.fortune_type} {self.count}>'
+
+
+class AccessLogDaily(db.Model):
+    """접속 로그 일별 집계"""
+    __tablename__ = 'access_log_daily'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    fortune_type = db.Column(db.String(50), nullable=False, default='')
+    gender = db.Column(db.String(10), nullable=False, default='')
+    calendar_type = db.Column(db.String(10), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('day', 'fortune_type', 'gender', 'calendar_type',
+                            name='uq_access_log_daily_key'),
+    )
+    
+    def __repr__(self):
+        return f'<AccessLogDaily {self.day} {self.fortune_type} {self.count}>'
+
+
 class SiteSettings(db.Model):
     """사이트 설정"""
     __tablename__ = 'site_settings'
@@ -79,6 +131,11 @@ class FortuneCategory(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     sort_order = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # LLM 호출 설정 (비어 있으면 prompt_registry 기본값 사용)
+    prompt_template = db.Column(db.Text)
+    max_tokens = db.Column(db.Integer)
+    model_name = db.Column(db.String(50))
+    timeout = db.Column(db.Float)  # 초 단위
     
     def __repr__(self):
         return f'<FortuneCategory {self.name}>'
@@ -109,10 +166,80 @@ class APIUsage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     category = db.Column(db.String(50))
     tokens_used = db.Column(db.Integer, default=0)
+    prompt_tokens = db.Column(db.Integer, default=0)
+    completion_tokens = db.Column(db.Integer, default=0)
+    model = db.Column(db.String(50))
+    cache_hit = db.Column(db.Boolean, default=False)  # 캐시/동일 요청 공유로 OpenAI 호출 없이 응답
     estimated_cost = db.Column(db.Float, default=0.0)
-    response_time = db.Column(db.Float)  # 초 단위
+    response_time = db.Column(db.Float)  # 초 단위 (캐시 미스는 OpenAI 호출 소요 시간)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_api_usage_timestamp', 'timestamp'),
+    )
+    
     def __repr__(self):
         return f'<APIUsage {self.category} - {self.tokens_used} tokens>'
 
+
+class ExportJob(db.Model):
+    """접속 로그 내보내기 작업 (export_jobs가 백그라운드에서 파일을 만든다)"""
+    __tablename__ = 'export_jobs'
+    
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    requested_by = db.Column(db.String(80))
+    export_format = db.Column(db.String(10), nullable=False)  # xlsx/csv/csv.gz
+    filters = db.Column(db.Text)  # 요청 파라미터 JSON
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued/running/cancelling/done/failed/cancelled/expired
+    owner = db.Column(db.String(100))  # 실행하는 프로세스 (호스트:pid)
+    rows_written = db.Column(db.Integer, default=0)
+    total_rows = db.Column(db.Integer)  # 집계 테이블 기준 예상 건수
+    filename = db.Column(db.String(255))  # 다운로드 파일명
+    file_path = db.Column(db.String(500))
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # 진행 상황 갱신 시각
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<ExportJob {self.id} {self.status}>'
+
+
+# 기존 데이터베이스에 추가해야 할 컬럼 (db.create_all은 기존 테이블을 변경하지 않음)
+SCHEMA_UPGRADES = {
+    'access_logs': [
+        ('is_leap_month', 'BOOLEAN DEFAULT 0'),
+    ],
+    'fortune_categories': [
+        ('prompt_template', 'TEXT'),
+        ('max_tokens', 'INTEGER'),
+        ('model_name', 'VARCHAR(50)'),
+        ('timeout', 'FLOAT'),
+    ],
+    'api_usage': [
+        ('prompt_tokens', 'INTEGER DEFAULT 0'),
+        ('completion_tokens', 'INTEGER DEFAULT 0'),
+        ('model', 'VARCHAR(50)'),
+        ('cache_hit', 'BOOLEAN DEFAULT 0'),
+    ],
+}
+
+
+# 기존 데이터베이스에 만들어야 할 인덱스가 있는 테이블 (인덱스 정의는 각 모델의 __table_args__)
+INDEXED_TABLES = ['access_logs', 'api_usage']
+
+
+def upgrade_schema():
+    """누락된 컬럼을 ALTER TABLE로, 누락된 인덱스를 CREATE INDEX로 추가 (앱 컨텍스트 필요)"""
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table, columns in SCHEMA_UPGRADES.items():
+            existing = {col['name'] for col in inspector.get_columns(table)}
+            for name, col_type in columns:
+                if name not in existing:
+                    conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {col_type}'))
+        for table in INDEXED_TABLES:
+            for index in db.metadata.tables[table].indexes:
+                index.create(conn, checkfirst=True)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 인기 사주 운세 사전 생성 배치
+
+접속 로그에서 요청이 많은 (사주팔자, 성별, 운세 종류) 조합을 찾아
+피크 시간 전에 오늘/내일의 운세를 미리 생성해 결과 캐시에 넣어둔다.
+이후 같은 사주의 요청은 OpenAI 호출 없이 캐시에서 바로 응답된다.
+
+사용법:
+    python pregenerate.py --top 200 --days 14 --workers 4
+
+OPENAI_BASE_URL 환경변수를 지정하면 OpenAI 호환 로컬 서버를 대상으로 실행할 수 있다
+(tests/test_pregenerate.py 참고).
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from app import app, build_saju_request, generate_fortune, person_profile
+from fortune_cache import fortune_cache, saju_flight
+from models import db, AccessLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATEGORIES = ['오늘의 운세', '내일의 운세']
+
+
+def find_hot_cohorts(categories, days=14, top=200):
+    """최근 days일 동안 가장 많이 요청된 (사주팔자, 성별, 운세 종류) 조합 (앱 컨텍스트 필요)
+
+    캐시 키는 입력 문자열이 아니라 사주팔자 서명(person_profile)으로 만들어지므로
+    양력/음력(윤달 포함) 입력이나 출생시간 표기가 달라도 같은 사주면 한 조합으로 센다.
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    columns = (
+        AccessLog.birth_date,
+        AccessLog.birth_time,
+        AccessLog.gender,
+        AccessLog.calendar_type,
+        AccessLog.is_leap_month,
+        AccessLog.fortune_type,
+    )
+    rows = db.session.query(*columns, func.count(AccessLog.id).label('count')).filter(
+        AccessLog.timestamp >= since,
+        AccessLog.birth_date.isnot(None),
+        AccessLog.fortune_type.in_(categories)
+    ).group_by(*columns).all()
+
+    cohorts = {}
+    for row in rows:
+        cohort = {
+            'birthDate': row.birth_date,
+            'birthTime': row.birth_time or '모름',
+            'gender': row.gender or '',
+            'calendarType': row.calendar_type or 'solar',
+            'isLeapMonth': bool(row.is_leap_month),
+            'category': row.fortune_type,
+        }
+        try:
+            _, _, key_parts = person_profile(cohort)
+        except (ValueError, TypeError) as e:
+            logger.debug(f"사전 생성 제외 (날짜 오류): {row.birth_date} - {e}")
+            continue
+        key = (row.fortune_type, key_parts)
+        if key in cohorts:
+            cohorts[key]['count'] += row.count
+        else:
+            cohorts[key] = dict(cohort, count=row.count)
+
+    return sorted(cohorts.values(), key=lambda cohort: cohort['count'], reverse=True)[:top]
+
+
+def pregenerate_one(cohort):
+    """조합 하나의 운세를 생성 (이미 캐시되어 있으면 건너뜀)
+
+    Returns:
+        'cached', 'generated', 'failed' 중 하나
+    """
+    with app.app_context():
+        try:
+            saju_request = build_saju_request(cohort)
+            if fortune_cache.get(saju_request['cache_key']) is not None:
+                return 'cached'
+            saju_flight.do(saju_request['cache_key'], lambda: generate_fortune(saju_request))
+            return 'generated'
+        except Exception as e:
+            logger.warning(f"사전 생성 실패: {cohort['category']} {cohort['birthDate']} - {e}")
+            return 'failed'
+
+
+def run(categories=None, days=14, top=200, workers=4):
+    """인기 조합을 찾아 최대 workers개씩 병렬로 사전 생성, 결과 건수 반환"""
+    categories = categories or DEFAULT_CATEGORIES
+    with app.app_context():
+        cohorts = find_hot_cohorts(categories, days=days, top=top)
+    logger.info(f"사전 생성 대상: {len(cohorts)}건 (최근 {days}일, 상위 {top}개)")
+
+    summary = {'cached': 0, 'generated': 0, 'failed': 0}
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(pregenerate_one, cohort) for cohort in cohorts]
+        for future in as_completed(futures):
+            summary[future.result()] += 1
+
+    logger.info(
+        f"사전 생성 완료: 생성 {summary['generated']}건, 기존 캐시 {summary['cached']}건, "
+        f"실패 {summary['failed']}건 ({time.time() - started:.1f}초)"
+    )
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='인기 사주 운세 사전 생성')
+    parser.add_argument('--top', type=int, default=200, help='생성할 인기 조합 수')
+    parser.add_argument('--days', type=int, default=14, help='접속 로그 조회 기간 (일)')
+    parser.add_argument('--workers', type=int, default=4, help='동시 OpenAI 호출 수')
+    parser.add_argument('--category', action='append', dest='categories',
+                        help='대상 운세 종류 (여러 번 지정 가능, 기본: 오늘/내일의 운세)')
+    args = parser.parse_args()
+
+    run(categories=args.categories, days=args.days, top=args.top, workers=args.workers)
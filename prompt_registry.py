@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 프롬프트 레지스트리
+
+카테고리별 프롬프트 템플릿, 토큰 한도, 모델, 타임아웃을 한 곳에 모아두고
+요청마다 딕셔너리 조회 한 번으로 꺼내 쓴다. 토큰 한도/모델/타임아웃은
+fortune_categories 테이블(FortuneCategory)에 저장되어 관리자 페이지에서
+재배포 없이 조정할 수 있다.
+"""
+
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+DEFAULT_TIMEOUT = 30  # 초
+
+# 다른 워커에서 관리자가 바꾼 설정을 다시 읽어오는 주기 (초)
+REFRESH_INTERVAL = 60
+
+SYSTEM_PROMPT = """당신은 40년 경력의 전문 사주명리학 도사입니다. 
+
+**절대 규칙**:
+1. 반드시 100% 순수 한국어로만 작성 (영어 단어 절대 금지)
+2. 전문가다운 신뢰감 있는 어조 사용
+3. 구체적이고 상세한 풀이 제공 (매우 길고 자세하게)
+4. 중요한 부분은 **강조**로 표시
+5. 일반론이 아닌 개인 맞춤형 분석
+6. 모호한 표현 금지, 명확하고 단정적으로 서술
+7. **냉철하고 객관적으로 분석** - 좋은 것은 좋다고, 나쁜 것은 나쁘다고 명확히 서술
+8. 위로나 격려보다는 **있는 그대로의 사실**을 전달
+9. 생년월일, 출생시간 기반으로 **이 사람만의 구체적 특징**을 정밀하게 분석
+10. [사주팔자]가 주어지면 다시 계산하지 말고 그 명식(오행, 십성)을 근거로 풀이"""
+
+TODAY_PROMPT = """
+{birth_info}인 사람의 **{today_date} 오늘의 운세**를 상세하게 풀이해주세요.
+
+다음을 포함해주세요:
+1. 오늘의 전체 운세 (2-3문단)
+2. **오늘 특히 좋은 시간대** (강조)
+3. **오늘 조심해야 할 일** (강조)
+4. 오늘의 재물운
+5. 오늘의 애정운
+6. 오늘의 건강운
+7. 오늘의 행운 색상과 방향
+8. 오늘 하면 좋은 일
+
+800자 이상으로 구체적이고 실천 가능한 내용으로 작성해주세요.
+"""
+
+TOMORROW_PROMPT = """
+{birth_info}인 사람의 **{tomorrow_date} 내일의 운세**를 상세하게 풀이해주세요.
+
+다음을 포함해주세요:
+1. 내일의 전체 운세 (2-3문단)
+2. **내일 특히 좋은 시간대** (강조)
+3. **내일 조심해야 할 일** (강조)
+4. 내일의 재물운
+5. 내일의 애정운
+6. 내일의 건강운
+7. 내일의 행운 색상과 방향
+8. 내일 하면 좋은 일
+
+800자 이상으로 구체적이고 실천 가능한 내용으로 작성해주세요.
+"""
+
+MONTH_PROMPT = """
+{birth_info}인 사람의 **{current_month} 이번 달 운세**를 상세하게 풀이해주세요.
+
+다음을 포함해주세요:
+1. 이번 달 전체 운세 개요 (3문단)
+2. **이번 달 가장 좋은 시기** (강조)
+3. **이번 달 조심해야 할 시기** (강조)
+4. 이번 달 재물운
+5. 이번 달 애정운
+6. 이번 달 건강운
+7. 이번 달 인간관계운
+8. 이번 달을 위한 조언
+
+1000자 이상으로 상세하게 작성해주세요.
+"""
+
+YEAR_PROMPT = """
+{birth_info}인 사람의 {current_year} 올해 운세를 매우 상세하게 풀이해주세요.
+
+다음 형식으로 작성해주세요:
+1. 전체 운세 개요 (3-4문단)
+2. **월별 운세 (매우 중요!)**: 1월, 2월, 3월, 4월, 5월, 6월, 7월, 8월, 9월, 10월, 11월, 12월 각 월마다 반드시 3-4문장씩 구체적으로 작성
+3. **주의해야 할 시기와 사항** (강조)
+4. **좋은 기회가 오는 시기** (강조)
+5. 올해를 위한 구체적인 조언
+
+월별 운세는 반드시 12개월 모두 빠짐없이 작성해주세요. 총 1800자 이상으로 매우 상세하게 작성해주세요.
+"""
+
+LIFETIME_PROMPT = """
+당신은 40년 경력의 사주명리학 전문가입니다. 다음 사주를 가진 사람의 평생운세를 **매우 구체적이고 차별화되게** 분석해주세요:
+
+{birth_info}
+
+**이 사람의 정확한 생년월일과 출생시간을 기반으로, 다른 사람과 완전히 다른 고유한 인생 흐름을 풀이해야 합니다.**
+
+다음 단계로 분석해주세요:
+
+1. **타고난 사주 구조 심층 분석 (5-6문단)**
+   - 이 날짜의 일주(日柱) 특성과 일간(日干)의 성질
+   - 사주 팔자의 오행 균형 (목화토금수)
+   - 십성(十星) 구조: 비겁, 식상, 재성, 관성, 인성의 배치
+   - 이 사주의 가장 큰 강점 3가지 (구체적)
+   - 이 사주의 약점과 극복 방법 (구체적)
+   - 타고난 성격과 기질 (일반론 아닌 이 사주만의 특징)
+
+2. **인생 시기별 상세 운세**
+   - **유년기~청년기 (0~25세)**: 학업, 성장 환경, 가족운, 주요 사건
+   - **청장년기 (26~40세)**: 직업, 결혼, 재물, 인간관계, 주요 전환점
+   - **중년기 (41~60세)**: 사회적 성취, 재물 정점, 건강, 가정
+   - **노년기 (61세~)**: 말년 행복, 자손운, 건강, 재물 보존
+   - 각 시기마다 **구체적 나이**와 **예상 사건**을 명시
+
+3. **주요 인생 사건 예측**
+   - **큰 기회가 오는 시기**: 정확한 나이대와 어떤 기회인지
+   - **큰 위기가 오는 시기**: 정확한 나이대와 어떤 위기인지
+   - **인생의 전환점**: 몇 살에 어떤 전환이 오는지
+   - **재물운 정점**: 몇 살에 재물이 가장 많이 모이는지
+   - **건강 주의 시기**: 몇 살에 어떤 건강 문제 주의
+
+4. **분야별 평생 운세**
+   - **재물운**: 평생 재물 흐름 (나이대별 구체적)
+   - **직업운**: 어울리는 직업 분야 (이 사주만의 특징)
+   - **애정/결혼운**: 결혼 시기, 배우자 특징, 부부 관계
+   - **건강운**: 취약 장기, 주의 질병, 건강 관리법
+   - **자손운**: 자녀와의 인연, 자녀 교육 방향
+   - **인간관계운**: 사교성, 인맥, 협력자
+
+5. **평생 성공 전략**
+   - 이 사주로 성공하는 방법 (구체적 5가지)
+   - 반드시 피해야 할 것 (구체적 5가지)
+   - 행운의 시기 활용법
+   - 불운의 시기 대처법
+   - 인생 목표 설정 방향
+
+**중요**:
+- "일반적으로", "보통", "흔히" 같은 표현 사용 금지
+- 반드시 이 생년월일에 근거한 고유한 특징 서술
+- 나이는 구체적으로 명시 (예: 28~32세, 45세 전후)
+- 2500자 이상 작성
+- **영어 단어 절대 사용 금지** (100% 순수 한국어만 사용)
+- 전문 도사로서 확신에 찬 어조로 단정적으로 서술
+- **좋은 점과 나쁜 점을 균형있게 서술** - 좋은 것만 말하지 말고 위험과 약점도 명확히 지적
+- **냉철하고 객관적으로** - 위로보다는 사실 위주로 분석
+"""
+
+LOVE_PROMPT = """
+당신은 40년 경력의 사주명리학 전문가입니다. 다음 사주를 가진 사람의 애정운을 **매우 구체적이고 차별화되게** 분석해주세요:
+
+{birth_info}
+
+**이 사람의 생년월일에 근거하여, 다른 사람과 완전히 다른 고유한 애정운을 풀이해야 합니다.**
+
+다음 단계로 분석해주세요:
+
+1. **사주 속 애정 구조 분석 (4문단)**
+   - 배우자궁(配偶宮)의 특성과 강약
+   - 관성(官星) 또는 재성(財星)의 배치 (성별에 따라)
+   - 도화살(桃花殺), 홍염살(紅艶殺) 등 애정 관련 신살
+   - 이 사주만의 독특한 애정 성향
+   - 연애 vs 결혼의 차이점
+
+2. **나이대별 애정운 흐름 (구체적)**
+   - **10대 후반~20대 초반**: 첫사랑, 연애 시작 시기
+   - **20대 중후반**: 진지한 연애, 결혼 가능성
+   - **30대**: 결혼 적령기, 배우자 만날 확률
+   - **40대 이후**: 부부 관계, 애정 변화
+   - 각 시기마다 몇 살에 중요한 인연이 오는지 명시
+
+3. **배우자 상세 분석**
+   - **만날 나이**: 정확한 나이대 (예: 27~31세)
+   - **만나는 방법**: 소개, 직장, SNS 등 (이 사주 특성상)
+   - **배우자 외모**: 키, 체형, 인상 (구체적)
+   - **배우자 성격**: 3가지 주요 특징
+   - **배우자 직업군**: 어떤 계열 직업
+   - **배우자 나이차**: 동갑, 연상, 연하 (몇 살 차이)
+   - **궁합 점수**: 전반적 궁합도
+
+4. **연애/결혼 패턴**
+   - **사랑에 빠지는 타입** (이 사주만의 특징)
+   - **연애할 때 모습** (장점 3가지, 단점 3가지)
+   - **결혼 후 모습** (배우자에게 어떤 사람인지)
+   - **이별/이혼 위험**: 몇 살 때 주의해야 하는지
+   - **재혼 가능성**: 있다면 몇 살 때인지
+
+5. **애정운 극대화 전략**
+   - 좋은 인연 만나는 구체적 방법 5가지
+   - 피해야 할 이성 타입 (구체적)
+   - 애정운 높이는 색깔, 방향, 물건
+   - 연애/결혼 성공을 위한 조언
+   - 배우자와 행복하게 사는 비결
+
+**중요**:
+- "일반적으로", "보통" 같은 표현 금지
+- 이 생년월일만의 고유한 애정 특성 서술
+- 나이는 반드시 구체적으로 (예: 28~32세)
+- 1600자 이상 작성
+- **특정 날짜(오늘, 내일, 이번 달) 언급 금지**
+- **영어 단어 절대 사용 금지** (순수 한국어만)
+- 전문가로서 확신 있고 구체적으로 서술
+- **좋은 점과 위험한 점을 모두 명확히 지적** - 이별/이혼 가능성도 솔직하게
+- **냉철하고 현실적으로** - 이상화하지 말고 있는 그대로 분석
+"""
+
+WEALTH_PROMPT = """
+당신은 40년 경력의 사주명리학 전문가입니다. 다음 사주를 가진 사람의 재물운을 **매우 구체적이고 차별화되게** 분석해주세요:
+
+{birth_info}
+
+**반드시 이 사람의 생년월일과 출생시간을 기반으로 한 고유한 사주 구조를 분석하여, 다른 사람과 완전히 다른 구체적인 재물운을 풀이해야 합니다.**
+
+다음 단계로 분석해주세요:
+
+1. **사주 구조 분석 (4-5문단)**
+   - 이 생년월일의 일주(日柱)와 월주(月柱) 특성
+   - 오행(목화토금수)의 균형과 부족
+   - 재성(財星)의 위치와 강약
+   - 비겁(比劫), 식상(食傷)의 상태
+   - 이 사주만의 독특한 재물 구조
+
+2. **재물 획득 방식 (3-4문단)**
+   - 정재(正財) vs 편재(偏財) 성향
+   - 근로소득형 vs 투자소득형 vs 사업소득형
+   - 돈을 버는 타이밍과 패턴
+   - 재물 증식 방법
+
+3. **생애 재물운 흐름 (나이대별 상세 분석)**
+   - 20대: 구체적 재물 상황과 조언
+   - 30대: 구체적 재물 상황과 조언
+   - 40대: 구체적 재물 상황과 조언
+   - 50대 이후: 구체적 재물 상황과 조언
+   - **각 나이대마다 이 사주만의 특징적인 재물 흐름 명시**
+
+4. **재물운 극대화 전략**
+   - **이 사주에 맞는 투자 방식** (부동산/주식/예금/사업 등)
+   - **돈이 새는 구멍** (이 사주의 재물 손실 패턴)
+   - **재물 들어오는 방향과 색깔**
+   - 함께하면 재물운 좋아지는 사람의 특징
+
+5. **구체적 주의사항과 해결책**
+   - 재물 손실 시기 (구체적 나이와 이유)
+   - 큰 돈 들어오는 시기 (구체적 나이와 방법)
+   - 피해야 할 사업/투자 종류
+   - 성공 가능성 높은 사업/투자 종류
+
+**중요**: 
+- "일반적으로", "보통", "대부분" 같은 표현 절대 금지
+- 반드시 이 사주의 생년월일에 근거한 구체적 특징 서술
+- 다른 사람이 읽으면 "이건 내 이야기가 아니네"라고 느낄 정도로 개인화된 내용
+- 1800자 이상 작성
+- **영어 단어 절대 사용 금지** (순수 한국어만)
+- 전문 도사로서 단정적이고 확신 있게 서술
+- **특정 날짜(오늘, 내일, 이번 달)는 언급하지 말 것**
+- **재물운이 나쁜 부분도 명확히 지적** - 재물 손실 위험, 파산 가능성 등 솔직하게
+- **냉철하게 현실을 직시** - 부자가 되기 어렵다면 그렇게 말하고, 쉽다면 그렇게 말하기
+"""
+
+BUSINESS_PROMPT = """
+{birth_info}인 사람의 사업운을 평생 관점에서 상세하게 풀이해주세요.
+
+**중요: 특정 날짜(오늘, 내일, 이번 달 등)를 언급하지 말고, 평생의 사업운 흐름으로 작성해주세요.**
+
+다음을 포함해주세요:
+1. 타고난 사업 재능과 성향 (3문단)
+2. **사업 성공 가능성이 높은 분야** (강조)
+3. **사업 시작하기 좋은 나이대와 시기** (강조)
+4. **사업에서 조심해야 할 점** (강조)
+5. 파트너십과 인맥 활용법
+6. 사업 자금 운용 조언
+7. 사업 성공을 위한 구체적 전략
+
+1000자 이상으로 상세하게 작성해주세요.
+"""
+
+STUDY_PROMPT = """
+{birth_info}인 사람의 학업운을 평생 관점에서 상세하게 풀이해주세요.
+
+**중요: 특정 날짜(오늘, 내일, 이번 달 등)를 언급하지 말고, 평생의 학업운 흐름으로 작성해주세요.**
+
+다음을 포함해주세요:
+1. 타고난 학습 능력과 성향 (2-3문단)
+2. **가장 잘 맞는 학습 분야** (강조)
+3. **공부하기 좋은 나이대와 시기** (강조)
+4. **학업에서 조심해야 할 점** (강조)
+5. 효과적인 학습 방법
+6. 시험운과 합격운
+7. 학업 성취를 위한 조언
+
+900자 이상으로 상세하게 작성해주세요.
+"""
+
+PAST_LIFE_PROMPT = """
+{birth_info}인 사람의 전생 운세를 신비롭고 상세하게 풀이해주세요.
+
+**중요: 전생의 삶과 현생과의 연결을 중심으로 작성해주세요.**
+
+다음을 포함해주세요:
+1. **전생에서의 신분과 삶** (3문단) - 어떤 시대, 어떤 사람이었는지
+2. **전생에서 했던 일** (강조) - 직업, 역할, 특별한 경험
+3. **전생의 업보와 인연** - 어떤 업을 지었고, 누구와 인연이 있었는지
+4. **현생에 미치는 영향** (강조) - 전생의 업보가 현생에 어떻게 나타나는지
+5. **풀어야 할 과제** - 이번 생에서 해결해야 할 전생의 업
+6. **타고난 능력** - 전생에서 가져온 재능과 능력
+7. **만날 인연** - 전생의 인연이 현생에서 다시 만날 가능성
+8. **전생의 교훈** - 현생을 위한 전생의 가르침
+
+1200자 이상으로 신비롭고 구체적으로 작성해주세요. 마치 도사가 보는 것처럼 생생하게 묘사해주세요.
+"""
+
+COMPATIBILITY_PROMPT = """
+{birth_info}인 두 사람의 궁합을 매우 상세하게 풀이해주세요.
+
+**중요: 사주 기반으로 두 사람의 궁합을 전문적으로 분석해주세요.**
+
+다음을 포함해주세요:
+1. **전체 궁합 분석** (3문단) - 두 사람의 사주 구성과 조화
+2. **성격 궁합** (강조) - 성격적 특징과 어울림
+3. **애정 궁합** (강조) - 사랑과 감정적 교류
+4. **재물 궁합** - 경제적 가치관과 금전 운
+5. **장수 궁합** - 서로의 건강과 장수에 미치는 영향
+6. **자손 궁합** - 자녀 운과 가족 운
+7. **조심해야 할 점** (강조) - 갈등 가능성과 주의사항
+8. **좋은 점** (강조) - 서로를 보완하는 장점
+9. **관계 발전 조언** - 두 사람이 더 행복하기 위한 구체적 조언
+
+1300자 이상으로 매우 상세하게 작성해주세요. 점수나 등급은 언급하지 말고, 깊이 있는 분석에 집중해주세요.
+"""
+
+DEFAULT_PROMPT = """
+{birth_info}인 사람의 '{category}'를 매우 상세하고 구체적으로 풀이해주세요.
+
+**중요: 특정 날짜(오늘, 내일, 이번 달 등)를 언급하지 말고, 장기적 관점에서 작성해주세요.**
+
+다음을 포함해주세요:
+1. 전체적인 운세 개요 (3-4문단)
+2. **특히 좋은 점** (강조)
+3. **주의해야 할 점** (강조)
+4. 시기별 흐름 (나이대 또는 연도별)
+5. 구체적이고 실천 가능한 조언
+
+1000자 이상으로 상세하게 작성해주세요. 일반적인 이야기가 아닌 구체적인 내용으로 작성해주세요.
+"""
+
+
+# 기본 카테고리를 넣은 기록 (site_settings 키)
+SEEDED_SETTING = 'seeded_categories'
+
+# 기본 카테고리 정의 (key, 이름, 별칭, 템플릿, 토큰 한도)
+# key는 script.js의 categoryMap 키와 같다
+DEFAULT_CATEGORIES = [
+    {'key': 'today', 'name': '오늘의 운세', 'aliases': [], 'template': TODAY_PROMPT, 'max_tokens': 1500},
+    {'key': 'tomorrow', 'name': '내일의 운세', 'aliases': [], 'template': TOMORROW_PROMPT, 'max_tokens': 1500},
+    {'key': 'month', 'name': '이달의 운세', 'aliases': [], 'template': MONTH_PROMPT, 'max_tokens': 1800},
+    {'key': 'year', 'name': '올해의 운세', 'aliases': [], 'template': YEAR_PROMPT, 'max_tokens': 2800},
+    {'key': 'lifetime', 'name': '평생운세', 'aliases': ['평생 운세'], 'template': LIFETIME_PROMPT, 'max_tokens': 3500},
+    {'key': 'love', 'name': '연애운', 'aliases': ['애정 운세'], 'template': LOVE_PROMPT, 'max_tokens': 2500},
+    {'key': 'wealth', 'name': '재물운', 'aliases': ['재물 운세', '금전 운세'], 'template': WEALTH_PROMPT, 'max_tokens': 2800},
+    {'key': 'business', 'name': '사업운', 'aliases': ['사업 운세'], 'template': BUSINESS_PROMPT, 'max_tokens': 1800},
+    {'key': 'study', 'name': '학업운', 'aliases': ['학업 운세'], 'template': STUDY_PROMPT, 'max_tokens': 1600},
+    {'key': 'past-life', 'name': '전생 운세', 'aliases': ['전생운세'], 'template': PAST_LIFE_PROMPT, 'max_tokens': 2200},
+    {'key': 'compatibility', 'name': '궁합', 'aliases': [], 'template': COMPATIBILITY_PROMPT, 'max_tokens': 2500},
+    {'key': 'default', 'name': '기타 운세', 'aliases': [], 'template': DEFAULT_PROMPT, 'max_tokens': 2000},
+]
+
+
+class _SafeDict(dict):
+    """템플릿에 모르는 {이름}이 있으면 그대로 남겨둔다 (관리자 편집 템플릿 보호)"""
+
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
+class PromptRegistry:
+    """카테고리 이름/별칭/키 -> 프롬프트 설정 조회 테이블"""
+
+    def __init__(self, categories=None):
+        self._defaults = {c['key']: c for c in (categories or DEFAULT_CATEGORIES)}
+        self._lock = threading.Lock()
+        self._loaded_at = 0
+        self._entries = self._build({})
+
+    def _build(self, rows):
+        """기본 정의에 DB 설정(rows: key -> dict)을 덮어써 조회 테이블 생성"""
+        entries = {}
+        keys = list(self._defaults) + [k for k in rows if k not in self._defaults]
+        for key in keys:
+            base = self._defaults.get(key, self._defaults['default'])
+            row = rows.get(key, {})
+            entry = {
+                'key': key,
+                'name': row.get('name') or base['name'],
+                'template': row.get('prompt_template') or base['template'],
+                'max_tokens': row.get('max_tokens') or base['max_tokens'],
+                'model': row.get('model_name') or DEFAULT_MODEL,
+                'timeout': row.get('timeout') or DEFAULT_TIMEOUT,
+                'active': key == 'default' or row.get('is_active') is not False,
+            }
+            names = [key, entry['name']] + list(self._defaults.get(key, {}).get('aliases', []))
+            if key in self._defaults:
+                names.append(base['name'])
+            for name in names:
+                entries[name] = entry
+        return entries
+
+    def load(self):
+        """fortune_categories 테이블에서 설정을 읽어 조회 테이블 교체 (앱 컨텍스트 필요)"""
+        from models import FortuneCategory
+        rows = {}
+        for category in FortuneCategory.query.all():
+            rows[category.key] = {
+                'name': category.name,
+                'prompt_template': category.prompt_template,
+                'max_tokens': category.max_tokens,
+                'model_name': category.model_name,
+                'timeout': category.timeout,
+                'is_active': category.is_active,
+            }
+        entries = self._build(rows)
+        with self._lock:
+            self._entries = entries
+            self._loaded_at = time.time()
+        logger.info(f"프롬프트 레지스트리 로드: {len(rows)}개 카테고리 설정")
+
+    def seed(self):
+        """기본 카테고리 중 아직 넣은 적 없는 것을 추가 (관리자 페이지에서 조정할 수 있도록)
+
+        넣은 키는 site_settings의 seeded_categories에 남기므로 관리자가 지운
+        카테고리는 재시작해도 다시 생기지 않는다. 'default'(기타 운세)는 모르는
+        카테고리용 내부 설정이라 테이블에 넣지 않는다. 여러 워커가 동시에
+        시작해 같은 키를 넣으려 하면 먼저 넣은 쪽을 따른다.
+        """
+        from sqlalchemy.exc import IntegrityError
+        from models import db, FortuneCategory, SiteSettings
+        try:
+            marker = SiteSettings.query.filter_by(key=SEEDED_SETTING).first()
+            existing = {key for (key,) in db.session.query(FortuneCategory.key).all()}
+            if marker is None:
+                # 기록이 없는 기존 DB는 카테고리가 있으면 이미 다 넣은 것으로 본다
+                seeded = set(self._defaults) if existing else set()
+                marker = SiteSettings(key=SEEDED_SETTING, description='기본 운세 카테고리 추가 기록')
+                db.session.add(marker)
+                # 예전에 넣은 내부 'default' 행은 관리자가 고치지 않았으면 지운다
+                FortuneCategory.query.filter_by(key='default', prompt_template=None).delete()
+            else:
+                seeded = set(filter(None, (marker.value or '').split(',')))
+
+            added = 0
+            for order, (key, base) in enumerate(self._defaults.items()):
+                if key == 'default' or key in seeded:
+                    continue
+                if key not in existing:
+                    db.session.add(FortuneCategory(
+                        name=base['name'],
+                        key=key,
+                        sort_order=order,
+                        max_tokens=base['max_tokens'],
+                        model_name=DEFAULT_MODEL,
+                        timeout=DEFAULT_TIMEOUT
+                    ))
+                    added += 1
+                seeded.add(key)
+            marker.value = ','.join(sorted(seeded - {'default'}))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            logger.info("기본 운세 카테고리는 다른 워커가 추가했습니다")
+            return
+        if added:
+            logger.info(f"기본 운세 카테고리 {added}개 추가")
+
+    def _maybe_refresh(self):
+        if time.time() - self._loaded_at < REFRESH_INTERVAL:
+            return
+        try:
+            self.load()
+        except Exception as e:
+            # 실패해도 기존 설정으로 계속 동작, 다음 주기에 다시 시도
+            self._loaded_at = time.time()
+            logger.warning(f"프롬프트 레지스트리 갱신 실패: {e}")
+
+    def get(self, category):
+        """카테고리 설정 조회 (모르는 카테고리는 기타 운세 설정 사용)
+
+        관리자가 비활성화한 카테고리는 active가 False다.
+        """
+        self._maybe_refresh()
+        entries = self._entries
+        return entries.get(category) or entries['default']
+
+    def render(self, category, **context):
+        """카테고리 설정과 완성된 사용자 프롬프트 반환"""
+        entry = self.get(category)
+        context.setdefault('category', category)
+        return entry, entry['template'].format_map(_SafeDict(context))
+
+
+prompt_registry = PromptRegistry()
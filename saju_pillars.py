@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 사주팔자 계산
+
+양력 생년월일과 출생 시진으로 년주/월주/일주/시주, 오행 분포, 십성 구조를
+계산한다. 1900~2100년의 절기(월의 경계가 되는 12절) 시각을 모듈을 불러올 때
+한 번 계산해 날짜별 배열에 담아두므로, 한 사람의 사주는 배열 조회 몇 번으로
+끝난다.
+
+- 년주는 입춘, 월주는 12절(입춘, 경칩, 청명 ... 소한)을 경계로 바뀐다.
+- 절기 시각은 태양 시황경(Meeus 저정밀 공식, 오차 약 15분)으로 구하고
+  한국 표준시(UTC+9)로 나타낸다. 출생시간이 시진 단위(2시간)이므로 충분하다.
+- 절기가 든 날에 태어났으면 시진의 가운데 시각(모르면 정오)으로 앞뒤를 정한다.
+- 자시(23:00~01:00)는 입력한 날짜의 자시로 본다 (날짜를 넘기지 않음).
+
+여러 사람을 한 번에 계산하는 pillars_batch는 같은 배열을 NumPy로 조회한다.
+
+벤치마크 (한 명씩 계산과 비교):
+    python saju_pillars.py
+"""
+
+import math
+from array import array
+from datetime import date, datetime
+
+import numpy as np
+
+STEMS = '갑을병정무기경신임계'
+STEMS_HANJA = '甲乙丙丁戊己庚辛壬癸'
+BRANCHES = '자축인묘진사오미신유술해'
+BRANCHES_HANJA = '子丑寅卯辰巳午未申酉戌亥'
+ELEMENTS = '목화토금수'
+
+# 60갑자 (0 = 갑자)
+GANJI = [STEMS[i % 10] + BRANCHES[i % 12] for i in range(60)]
+GANJI_HANJA = [STEMS_HANJA[i % 10] + BRANCHES_HANJA[i % 12] for i in range(60)]
+# (천간, 지지) -> 60갑자 번호 (음양이 맞지 않는 조합은 -1)
+GANJI_INDEX = [[-1] * 12 for _ in range(10)]
+for _i in range(60):
+    GANJI_INDEX[_i % 10][_i % 12] = _i
+
+# 천간/지지의 오행 (목0 화1 토2 금3 수4)
+STEM_ELEMENT = [0, 0, 1, 1, 2, 2, 3, 3, 4, 4]
+BRANCH_ELEMENT = [4, 2, 0, 0, 2, 1, 1, 2, 3, 3, 2, 4]
+# 지지의 본기(정기) 천간: 십성 계산용
+BRANCH_MAIN_STEM = [9, 5, 0, 1, 4, 2, 3, 5, 6, 7, 4, 8]
+
+TEN_GOD_NAMES = ['비견', '겁재', '식신', '상관', '편재', '정재', '편관', '정관', '편인', '정인']
+
+
+def _ten_god(day_stem, other_stem):
+    """일간 기준 다른 천간의 십성 번호"""
+    # 0: 같은 오행, 1: 내가 생함, 2: 내가 극함, 3: 나를 극함, 4: 나를 생함
+    relation = (STEM_ELEMENT[other_stem] - STEM_ELEMENT[day_stem]) % 5
+    return relation * 2 + (0 if day_stem % 2 == other_stem % 2 else 1)
+
+
+# 일간 x 천간 십성 표
+TEN_GODS = [[_ten_god(d, s) for s in range(10)] for d in range(10)]
+
+# 시진 이름 -> 지지 번호
+HOUR_BRANCH_NAMES = {BRANCHES[i] + '시': i for i in range(12)}
+
+FIRST_YEAR = 1900
+LAST_YEAR = 2100
+_BASE_ORDINAL = date(FIRST_YEAR, 1, 1).toordinal()
+_DAYS = date(LAST_YEAR, 12, 31).toordinal() - _BASE_ORDINAL + 1
+
+# 1900-01-01은 갑술일(10)
+_BASE_DAY_GANJI = 10
+# 1900년 입춘부터 시작하는 달(무인월, 14)과 그 해(경자년, 36)
+_BASE_MONTH_GANJI = 14
+_BASE_YEAR_GANJI = 36
+
+_KST_OFFSET = 9 / 24
+_JD_ORDINAL_OFFSET = 1721424.5  # 율리우스일 - date.toordinal() (자정 기준)
+
+
+def _sun_longitude(jd):
+    """태양 시황경 (도, Meeus 25장 저정밀 공식)"""
+    t = (jd - 2451545.0) / 36525
+    l0 = 280.46646 + 36000.76983 * t + 0.0003032 * t * t
+    m = math.radians(357.52911 + 35999.05029 * t - 0.0001537 * t * t)
+    c = ((1.914602 - 0.004817 * t - 0.000014 * t * t) * math.sin(m)
+         + (0.019993 - 0.000101 * t) * math.sin(2 * m)
+         + 0.000289 * math.sin(3 * m))
+    omega = math.radians(125.04 - 1934.136 * t)
+    return (l0 + c - 0.00569 - 0.00478 * math.sin(omega)) % 360
+
+
+def _solar_term_jd(target, guess):
+    """태양 황경이 target도가 되는 율리우스일 (guess 근처에서 뉴턴법)"""
+    jd = guess
+    for _ in range(8):
+        diff = (target - _sun_longitude(jd) + 180) % 360 - 180
+        jd += diff * 365.2422 / 360
+        if abs(diff) < 1e-6:
+            break
+    return jd
+
+
+def _build_tables():
+    """날짜별 (그날 0시의 월 번호, 그날 절기가 드는 분) 배열
+
+    월 번호는 1900년 입춘을 0으로 하여 절기가 지날 때마다 1씩 늘어난다.
+    """
+    month_at_midnight = array('h', [0]) * _DAYS
+    term_minute = array('h', [-1]) * _DAYS
+
+    # 1900년 입춘(약 2월 4일) 앞뒤로 1899년 대설부터 2101년 입춘까지
+    first_jd = _BASE_ORDINAL + 34 + _JD_ORDINAL_OFFSET
+    terms = []
+    for number in range(-2, (LAST_YEAR - FIRST_YEAR + 1) * 12 + 1):
+        target = (315 + 30 * number) % 360
+        jd = _solar_term_jd(target, first_jd + number * 365.2422 / 12) + _KST_OFFSET
+        local_ordinal = math.floor(jd - _JD_ORDINAL_OFFSET)
+        minute = int((jd - _JD_ORDINAL_OFFSET - local_ordinal) * 1440)
+        terms.append((number, local_ordinal - _BASE_ORDINAL, minute))
+
+    current = -3
+    term_iter = iter(terms)
+    next_term = next(term_iter)
+    for offset in range(_DAYS):
+        while next_term is not None and next_term[1] < offset:
+            current = next_term[0]
+            next_term = next(term_iter, None)
+        month_at_midnight[offset] = current
+        if next_term is not None and next_term[1] == offset:
+            term_minute[offset] = next_term[2]
+    return month_at_midnight, term_minute
+
+
+_MONTH_AT_MIDNIGHT, _TERM_MINUTE = _build_tables()
+
+# pillars_batch용 (같은 메모리를 NumPy 배열로 본다)
+_MONTH_TABLE = np.frombuffer(_MONTH_AT_MIDNIGHT, dtype=np.int16)
+_TERM_TABLE = np.frombuffer(_TERM_MINUTE, dtype=np.int16)
+_GANJI_TABLE = np.array(GANJI_INDEX, dtype=np.int8)
+_BASE_DATE = np.datetime64(date(FIRST_YEAR, 1, 1), 'D')
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value).strip(), '%Y-%m-%d').date()
+
+
+def hour_branch(birth_time):
+    """출생시간 ('자시'... 또는 'HH:MM') -> 지지 번호 (모르면 None)"""
+    if not birth_time:
+        return None
+    birth_time = str(birth_time).strip()
+    branch = HOUR_BRANCH_NAMES.get(birth_time[:2])
+    if branch is not None:
+        return branch
+    try:
+        hour = int(birth_time.split(':')[0])
+    except ValueError:
+        return None
+    return ((hour + 1) // 2) % 12
+
+
+def hour_name(birth_time):
+    """출생시간을 시진 이름으로 ('오시', 모르면 '모름')"""
+    branch = hour_branch(birth_time)
+    return '모름' if branch is None else BRANCHES[branch] + '시'
+
+
+def _minute_of_day(birth_time, branch):
+    if branch is None:
+        return 12 * 60
+    try:
+        hour, minute = str(birth_time).strip().split(':')[:2]
+        return int(hour) * 60 + int(minute)
+    except ValueError:
+        # 시진의 가운데 시각 (자시는 0시)
+        return branch * 120
+
+
+def _pillar_indices(ordinal, birth_time):
+    """(년주, 월주, 일주, 시주) 60갑자 번호, 시주는 모르면 -1"""
+    offset = ordinal - _BASE_ORDINAL
+    if not 0 <= offset < _DAYS:
+        raise ValueError(f"{FIRST_YEAR}~{LAST_YEAR}년 사이의 날짜만 계산할 수 있습니다")
+
+    branch = hour_branch(birth_time)
+    month_number = _MONTH_AT_MIDNIGHT[offset]
+    term = _TERM_MINUTE[offset]
+    if term >= 0 and _minute_of_day(birth_time, branch) >= term:
+        month_number += 1
+
+    year = (_BASE_YEAR_GANJI + month_number // 12) % 60
+    month = (_BASE_MONTH_GANJI + month_number) % 60
+    day = (_BASE_DAY_GANJI + offset) % 60
+    if branch is None:
+        hour = -1
+    else:
+        hour = GANJI_INDEX[(day % 10 % 5 * 2 + branch) % 10][branch]
+    return year, month, day, hour
+
+
+def four_pillars(birth_date, birth_time=None):
+    """사주팔자 계산
+
+    Args:
+        birth_date: 양력 생년월일 ('YYYY-MM-DD' 또는 date)
+        birth_time: 시진 이름('자시' 등), 'HH:MM', 또는 None/'모름'
+
+    Returns:
+        pillars(년/월/일/시주 한글), hanja, day_master, elements(오행 개수),
+        ten_gods(자리별 십성)를 담은 dict. 시간을 모르면 시주는 None.
+
+    Raises:
+        ValueError: 날짜 형식이 잘못되었거나 지원 범위를 벗어난 경우
+    """
+    indices = _pillar_indices(_to_date(birth_date).toordinal(), birth_time)
+    return describe(indices)
+
+
+def describe(indices):
+    """(년, 월, 일, 시) 60갑자 번호를 사주 정보 dict로"""
+    names = ('year', 'month', 'day', 'hour')
+    known = [(name, idx) for name, idx in zip(names, indices) if idx >= 0]
+    day_stem = indices[2] % 10
+
+    elements = dict.fromkeys(ELEMENTS, 0)
+    ten_gods = {}
+    for name, idx in known:
+        stem, branch = idx % 10, idx % 12
+        elements[ELEMENTS[STEM_ELEMENT[stem]]] += 1
+        elements[ELEMENTS[BRANCH_ELEMENT[branch]]] += 1
+        if name != 'day':
+            ten_gods[f'{name}_stem'] = TEN_GOD_NAMES[TEN_GODS[day_stem][stem]]
+        ten_gods[f'{name}_branch'] = TEN_GOD_NAMES[TEN_GODS[day_stem][BRANCH_MAIN_STEM[branch]]]
+
+    return {
+        'pillars': {name: (GANJI[idx] if idx >= 0 else None) for name, idx in zip(names, indices)},
+        'hanja': {name: (GANJI_HANJA[idx] if idx >= 0 else None) for name, idx in zip(names, indices)},
+        'day_master': STEMS[day_stem] + ELEMENTS[STEM_ELEMENT[day_stem]],
+        'elements': elements,
+        'ten_gods': ten_gods,
+    }
+
+
+def compact(saju):
+    """프롬프트에 넣을 한 줄 요약
+
+    예: 갑진(甲辰)년 병인(丙寅)월 ... / 일간 무토 / 오행 목2 화1 토3 금2 수0 / 십성 년간 편관 ...
+    """
+    labels = {'year': '년', 'month': '월', 'day': '일', 'hour': '시'}
+    pillars = ' '.join(
+        f"{ganji}({saju['hanja'][name]}){labels[name]}"
+        for name, ganji in saju['pillars'].items() if ganji
+    )
+    elements = ' '.join(f'{name}{count}' for name, count in saju['elements'].items())
+    gods = ' '.join(
+        f"{labels[key.split('_')[0]]}{'간' if key.endswith('stem') else '지'} {god}"
+        for key, god in saju['ten_gods'].items()
+    )
+    return f"{pillars} / 일간 {saju['day_master']} / 오행 {elements} / 십성 {gods}"
+
+
+def signature(saju):
+    """같은 사주팔자면 같은 문자열 (예: '경오-신사-경진-임오', 시주를 모르면 '경오-신사-경진-?')"""
+    return '-'.join(ganji or '?' for ganji in saju['pillars'].values())
+
+
+def _batch_offsets(birth_dates):
+    """생년월일 목록 -> 1900-01-01부터의 일수 배열 (계산할 수 없는 날짜는 -1)"""
+    try:
+        days = np.asarray(birth_dates, dtype='datetime64[D]')
+    except (ValueError, TypeError):
+        # 'YYYY-MM-DD'가 아닌 표기가 섞여 있으면 한 건씩 읽는다
+        days = np.empty(len(birth_dates), dtype='datetime64[D]')
+        for i, birth_date in enumerate(birth_dates):
+            try:
+                days[i] = _to_date(birth_date)
+            except (ValueError, TypeError):
+                days[i] = np.datetime64('NaT')
+    offsets = (days - _BASE_DATE).astype(np.int64)
+    offsets[np.isnat(days) | (offsets < 0) | (offsets >= _DAYS)] = -1
+    return offsets
+
+
+def _batch_hours(birth_times, size):
+    """출생시간 목록 -> (지지 번호 배열(모르면 -1), 하루 중 분 배열)
+
+    출생시간은 종류가 적으므로 서로 다른 값만 한 번씩 해석한다.
+    """
+    if birth_times is None:
+        return np.full(size, -1, dtype=np.int64), np.full(size, 12 * 60, dtype=np.int64)
+    codes = {}
+    branches, minutes = [], []
+    for birth_time in dict.fromkeys(birth_times):
+        branch = hour_branch(birth_time)
+        codes[birth_time] = len(branches)
+        branches.append(-1 if branch is None else branch)
+        minutes.append(_minute_of_day(birth_time, branch))
+    inverse = np.fromiter((codes[birth_time] for birth_time in birth_times), dtype=np.int64, count=size)
+    return np.array(branches, dtype=np.int64)[inverse], np.array(minutes, dtype=np.int64)[inverse]
+
+
+def pillars_batch(birth_dates, birth_times=None):
+    """여러 사람의 사주를 한 번에 계산 (배치/통계용)
+
+    _pillar_indices와 같은 계산을 배열 단위로 한다 (절기 배열 조회 + 60갑자 나머지 연산).
+
+    Args:
+        birth_dates: 양력 생년월일 목록
+        birth_times: 같은 길이의 출생시간 목록 (None이면 모두 모름)
+
+    Returns:
+        'year', 'month', 'day', 'hour' 키에 60갑자 번호 배열(np.int8)을 담은 dict.
+        계산할 수 없는 날짜와 모르는 시주는 -1.
+    """
+    offsets = _batch_offsets(birth_dates)
+    branch, minute = _batch_hours(birth_times, len(offsets))
+    valid = offsets >= 0
+    safe = np.where(valid, offsets, 0)
+
+    term = _TERM_TABLE[safe]
+    month_number = _MONTH_TABLE[safe].astype(np.int64) + ((term >= 0) & (minute >= term))
+
+    year = (_BASE_YEAR_GANJI + month_number // 12) % 60
+    month = (_BASE_MONTH_GANJI + month_number) % 60
+    day = (_BASE_DAY_GANJI + safe) % 60
+    known = branch >= 0
+    hour_stem = (day % 10 % 5 * 2 + branch) % 10
+    hour = np.where(known, _GANJI_TABLE[hour_stem, np.where(known, branch, 0)], -1)
+
+    columns = {}
+    for name, values in (('year', year), ('month', month), ('day', day), ('hour', hour)):
+        columns[name] = np.where(valid, values, -1).astype(np.int8)
+    return columns
+
+
+def _benchmark(count=100000):
+    import random
+    import timeit
+
+    rng = random.Random(42)
+    first = date(FIRST_YEAR, 1, 1).toordinal()
+    birth_dates = [
+        date.fromordinal(rng.randint(first, first + _DAYS - 1)).isoformat() for _ in range(count)
+    ]
+    birth_times = [
+        rng.choice([None, '모름', '자시', '오시', f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}'])
+        for _ in range(count)
+    ]
+
+    def one_by_one():
+        return [
+            _pillar_indices(_to_date(birth_date).toordinal(), birth_time)
+            for birth_date, birth_time in zip(birth_dates, birth_times)
+        ]
+
+    def report(name, seconds):
+        print(f"{name:<24} {seconds * 1e6 / count:8.3f} µs/건  ({count}건 {seconds:.3f}초)")
+
+    expected = one_by_one()
+    columns = pillars_batch(birth_dates, birth_times)
+    batch = list(zip(*(columns[name].tolist() for name in ('year', 'month', 'day', 'hour'))))
+    print(f"결과가 다른 건: {sum(1 for a, b in zip(expected, batch) if a != b)}건")
+
+    report("_pillar_indices (반복)", min(timeit.repeat(one_by_one, number=1, repeat=3)))
+    report("pillars_batch", min(timeit.repeat(
+        lambda: pillars_batch(birth_dates, birth_times), number=1, repeat=3)))
+
+
+if __name__ == '__main__':
+    _benchmark()
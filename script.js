@@ -843,6 +843,9 @@ async function generateFortune(category, birthYear, birthHour, zodiac, gender, u
     return selectedFortune;
 }
 
+// 서버가 알려준 대기 시간이 이보다 길면 재시도하지 않고 안내만 표시
+const MAX_BUSY_WAIT_SECONDS = 30;
+
 // Flask API에서 운세 가져오기 - 개선된 버전
 async function fetchFortuneFromAPI(category, userData) {
     // 궁합일 경우 user1, user2가 있는지 확인
@@ -882,19 +885,28 @@ async function fetchFortuneFromAPI(category, userData) {
 
     // AbortController로 타임아웃 구현
     const controller = new AbortController();
-    const timeoutId = setTimeout(() => {
+    let timeoutId = setTimeout(() => {
         controller.abort();
     }, timeoutMs);
+    // 스트리밍 중에는 조각이 도착할 때마다 다시 잰다 (응답이 멈춘 시간만 제한)
+    const resetTimeout = () => {
+        clearTimeout(timeoutId);
+        timeoutId = setTimeout(() => {
+            controller.abort();
+        }, timeoutMs);
+    };
 
     // API URL 설정 (상대경로 사용)
     const apiUrl = '/api/saju';
+    const streamUrl = '/api/saju/stream';
+
+    // 궁합일 경우와 일반 운세일 경우 요청 데이터 구조가 다름 (재시도에도 사용)
+    let requestBody;
 
     try {
         showAPILoadingMessage(koreanCategory);
         console.log(`🔍 API 연결 시도: ${apiUrl} (타임아웃: ${timeoutMs}ms)`);
         
-        // 궁합일 경우와 일반 운세일 경우 요청 데이터 구조가 다름
-        let requestBody;
         if (isCompatibility) {
             requestBody = {
                 user1: userData.user1,
@@ -908,19 +920,39 @@ async function fetchFortuneFromAPI(category, userData) {
                 birthTime: userData.birthTime || '모름',
                 gender: userData.gender || '',
                 calendarType: userData.calendarType || 'solar',
+                isLeapMonth: !!userData.isLeapMonth,
                 category: koreanCategory
             };
         }
         
-        let response = await fetch(apiUrl, {
+        let response = await fetch(streamUrl, {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
             },
             body: JSON.stringify(requestBody),
             signal: controller.signal
         });
 
+        const contentType = response.headers.get('Content-Type') || '';
+        if (response.ok && response.body && contentType.includes('text/event-stream')) {
+            // 스트리밍 응답: 도착하는 대로 화면에 표시
+            const streamedText = await readFortuneStream(response, renderStreamingFortune, resetTimeout);
+            clearTimeout(timeoutId);
+
+            if (!streamedText) {
+                throw new Error('운세 데이터가 응답에 포함되지 않았습니다.');
+            }
+
+            console.log(`✅ API 스트리밍 완료: ${streamUrl} (${Math.round(performance.now() - startTime)}ms)`);
+            hideAPILoadingMessage();
+            showToast('🔮 운세의 결과가 나왔습니다!');
+            return {
+                content: streamedText
+            };
+        }
+
         // 타임아웃 클리어
         clearTimeout(timeoutId);
 
@@ -1046,6 +1078,10 @@ async function fetchFortuneFromAPI(category, userData) {
                 
                 console.log('✅ 최종 처리된 운세:', result);
                 return result;
+        } else if (response.status === 503) {
+            // 서버 혼잡: retry_after초 후 다시 시도하라는 응답
+            const busyData = await response.json().catch(() => ({}));
+            throw createBusyError(busyData.error, busyData.retry_after || response.headers.get('Retry-After'));
         } else {
             throw new Error(`HTTP ${response.status}: ${response.statusText}`);
         }
@@ -1054,36 +1090,39 @@ async function fetchFortuneFromAPI(category, userData) {
         // 타임아웃 정리 (에러 발생 시)
         clearTimeout(timeoutId);
         
-        console.warn(`⚠️ API 호출 실패, 재시도 중: ${error.message}`);
-        
-        // 1회 재시도
+        // 서버가 혼잡하다고 알려준 경우에만 안내된 시간만큼 기다린 뒤 1회 재시도
         try {
-            console.log('🔄 API 재시도 중...');
+            if (!error.busy || error.retryAfter > MAX_BUSY_WAIT_SECONDS) {
+                throw error;
+            }
+
+            console.warn(`⏳ 서버 혼잡, ${error.retryAfter}초 후 재시도: ${error.message}`);
+            showToast(`⏳ 요청이 많아 ${error.retryAfter}초 후 다시 시도합니다...`);
+            await new Promise(resolve => setTimeout(resolve, error.retryAfter * 1000));
+
             const retryResponse = await fetch(apiUrl, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
                 },
-                body: JSON.stringify({
-                    birthDate: userData.birthDate,
-                    birthTime: userData.birthTime || '모름',
-                    gender: userData.gender || '',
-                    calendarType: userData.calendarType || 'solar',
-                    category: koreanCategory
-                })
+                body: JSON.stringify(requestBody)
             });
             
-            const retryData = await retryResponse.json().catch(() => ({ status: "error", message: "파싱 오류" }));
+            const retryData = await retryResponse.json().catch(() => ({ success: false, error: "파싱 오류" }));
             
-            if (retryResponse.ok && retryData.status === "ok") {
+            if (retryResponse.ok && retryData.success && retryData.result) {
                 console.log('✅ 재시도 성공!');
-                return retryData;
+                hideAPILoadingMessage();
+                showToast('🔮 운세의 결과가 나왔습니다!');
+                return {
+                    content: retryData.result
+                };
             } else {
-                throw new Error(retryData.message || "재시도도 실패했습니다.");
+                throw new Error(retryData.error || "재시도도 실패했습니다.");
             }
             
         } catch (retryError) {
-            console.error(`❌ 재시도도 실패: ${retryError.message}`);
+            console.error(`❌ API 호출 실패: ${retryError.message}`);
             
             // 로딩 오버레이 제거
             hideAPILoadingMessage();
@@ -1097,6 +1136,8 @@ async function fetchFortuneFromAPI(category, userData) {
             
             if (error.name === 'AbortError') {
                 errorType = 'timeout';
+            } else if (error.busy) {
+                errorType = 'busy';
             } else if (error.message.includes('HTTP')) {
                 errorType = 'http_error';
                 const statusMatch = error.message.match(/HTTP (\d+)/);
@@ -1125,6 +1166,87 @@ async function fetchFortuneFromAPI(category, userData) {
     }
 }
 
+// 서버 혼잡 오류 (retryAfter초 후 재시도 가능)
+function createBusyError(message, retryAfter) {
+    const error = new Error(message || '요청이 많아 잠시 후 다시 시도해주세요');
+    error.busy = true;
+    error.retryAfter = parseInt(retryAfter, 10) || 5;
+    return error;
+}
+
+// SSE 스트림을 읽으며 텍스트 조각이 올 때마다 onDelta(누적 텍스트) 호출
+// onChunk는 네트워크에서 데이터가 도착할 때마다 호출 (유휴 타임아웃 연장용)
+async function readFortuneStream(response, onDelta, onChunk) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder('utf-8');
+    let buffer = '';
+    let fullText = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        if (onChunk) onChunk();
+        buffer += decoder.decode(value, { stream: true });
+
+        // 이벤트는 빈 줄("\n\n")로 구분됨
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            const dataText = rawEvent
+                .split('\n')
+                .filter(line => line.startsWith('data:'))
+                .map(line => line.slice(5).trim())
+                .join('');
+            if (!dataText) continue;
+
+            const payload = JSON.parse(dataText);
+            if (payload.busy) {
+                throw createBusyError(payload.error, payload.retry_after);
+            }
+            if (payload.error) {
+                throw new Error(payload.error);
+            }
+            if (payload.delta) {
+                fullText += payload.delta;
+                onDelta(fullText);
+            }
+            if (payload.done) {
+                return fullText;
+            }
+        }
+    }
+
+    return fullText;
+}
+
+// 🔮 스트리밍 중인 운세 텍스트를 결과 화면에 바로 표시
+function renderStreamingFortune(text) {
+    const dosaLoader = document.querySelector('.dosa-loading-container');
+    if (dosaLoader) {
+        dosaLoader.remove();
+        hideAPILoadingMessage();
+    }
+
+    const fortuneText = document.getElementById('fortune-text');
+    if (!fortuneText) return;
+
+    const escaped = text
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;');
+    const formatted = escaped
+        .replace(/\*\*(.*?)\*\*/g, '<strong class="highlight">$1</strong>')
+        .replace(/\n/g, '<br>');
+
+    fortuneText.innerHTML = `
+        <div class="fortune-section main-fortune">
+            <p style="line-height: 2;">${formatted}</p>
+        </div>
+    `;
+}
+
 // 🔮 신비로운 도사 테마 로딩 UI 표시
 function showAPILoadingMessage(category) {
     // 로딩 오버레이 표시
@@ -2109,13 +2231,14 @@ function formatBirthInfo(user) {
 }
 
 // 궁합 입력 폼 처리
-function handleCompatibilityFormSubmit(e) {
+async function handleCompatibilityFormSubmit(e) {
     e.preventDefault();
     
     const partnerBirthDate = document.getElementById('partner-birth-date').value;
     const partnerBirthTime = document.getElementById('partner-birth-time').value;
     const partnerGender = document.getElementById('partner-gender').value;
     const partnerCalendarType = document.querySelector('input[name="partner-calendar-type"]:checked').value;
+    const partnerLeapMonth = partnerCalendarType === 'lunar' && document.getElementById('partner-leap-month').checked;
 
     if (!partnerBirthDate || !partnerBirthTime) {
         alert('상대방의 생년월일과 출생시간을 모두 선택해주세요.');
@@ -2127,9 +2250,14 @@ function handleCompatibilityFormSubmit(e) {
         birthDate: partnerBirthDate,  // 원본 날짜 (음력이면 음력 그대로)
         birthTime: (partnerBirthTime === 'unknown' || partnerBirthTime === '') ? '모름' : partnerBirthTime,
         gender: partnerGender,
-        calendarType: partnerCalendarType  // 'solar' 또는 'lunar'
+        calendarType: partnerCalendarType,  // 'solar' 또는 'lunar'
+        isLeapMonth: partnerLeapMonth
     };
 
+    if (!await checkLunarDate(currentPartner)) {
+        return;
+    }
+
     // 궁합 결과 표시
     setTimeout(async () => {
         try {
@@ -2405,85 +2533,41 @@ function showToast(message) {
     }, duration);
 }
 
-// 음력 → 양력 변환 함수 (한국 전통 달력 기준)
-function convertLunarToSolar(lunarDateStr) {
-    const lunarDate = new Date(lunarDateStr);
-    const year = lunarDate.getFullYear();
-    const month = lunarDate.getMonth() + 1;
-    const day = lunarDate.getDate();
-    
-    // 음력-양력 변환 시뮬레이션 로직
-    // 실제 환경에서는 정확한 천문학적 계산 라이브러리 사용 필요
-    
-    // 기본적인 변환 규칙 (근사치):
-    // 음력은 대략 양력보다 19-50일 정도 늦음 (연도와 월에 따라 다름)
-    
-    let solarYear = year;
-    let solarMonth = month;
-    let solarDay = day;
-    
-    // 월별 보정값 (대략적인 음력-양력 차이)
-    const monthCorrection = {
-        1: 30,  // 1월은 약 30일 늦음
-        2: 28,  // 2월은 약 28일 늦음
-        3: 30,  // 3월은 약 30일 늦음
-        4: 29,  // 4월은 약 29일 늦음
-        5: 30,  // 5월은 약 30일 늦음
-        6: 29,  // 6월은 약 29일 늦음
-        7: 30,  // 7월은 약 30일 늦음
-        8: 29,  // 8월은 약 29일 늦음
-        9: 30,  // 9월은 약 30일 늦음
-        10: 29, // 10월은 약 29일 늦음
-        11: 30, // 11월은 약 30일 늦음
-        12: 29  // 12월은 약 29일 늦음
-    };
-    
-    // 보정값 적용
-    const correction = monthCorrection[month] || 30;
-    solarDay += correction;
-    
-    // 월 경계 처리
-    const daysInMonth = new Date(solarYear, solarMonth, 0).getDate();
-    if (solarDay > daysInMonth) {
-        solarDay -= daysInMonth;
-        solarMonth++;
-        
-        // 연도 경계 처리
-        if (solarMonth > 12) {
-            solarMonth = 1;
-            solarYear++;
-        }
+// 음력/양력 변환 (서버의 1900~2100년 변환 색인 사용)
+// 폼 하나당 요청 한 번으로 여러 날짜를 변환하고, 결과는 브라우저 캐시에 남는다
+const calendarConvertUrl = '/api/calendar/convert';
+
+async function convertCalendarDates(users) {
+    const dates = users.map(user => {
+        const type = user.calendarType === 'lunar' ? (user.isLeapMonth ? 'leap' : 'lunar') : 'solar';
+        return `${type}:${user.birthDate}`;
+    });
+    const response = await fetch(`${calendarConvertUrl}?dates=${encodeURIComponent(dates.join(','))}`);
+    if (!response.ok) {
+        throw new Error(`날짜 변환 실패: HTTP ${response.status}`);
     }
-    
-    // 결과 날짜 생성
-    const solarDateResult = new Date(solarYear, solarMonth - 1, solarDay);
-    return solarDateResult.toISOString().split('T')[0]; // YYYY-MM-DD 형식으로 반환
+    const data = await response.json();
+    return data.results;
 }
 
-// 정확한 음력-양력 변환을 위한 참조 데이터 (일부 연도)
-// 실제 구현에서는 더 완전한 데이터베이스나 라이브러리 사용 권장
-const lunarSolarReference = {
-    2024: {
-        "01-01": "02-10", // 2024년 음력 1월 1일 = 양력 2월 10일 (설날)
-        "01-15": "02-24", // 음력 1월 15일 = 양력 2월 24일 (정월대보름)
-        "08-15": "09-17", // 음력 8월 15일 = 양력 9월 17일 (추석)
-    },
-    2023: {
-        "01-01": "01-22", // 2023년 음력 1월 1일 = 양력 1월 22일
-        "08-15": "09-29", // 음력 8월 15일 = 양력 9월 29일
+// 음력 생일이면 그런 날짜가 있는지 확인하고 변환된 양력 날짜를 알려준다 (없는 날짜면 false)
+// 확인만 한다: 운세 요청에는 음력 날짜를 그대로 보내고 변환은 서버가 다시 한다
+async function checkLunarDate(user) {
+    if (user.calendarType !== 'lunar') {
+        return true;
     }
-};
-
-// 더 정확한 변환이 필요한 경우 사용할 수 있는 참조 함수
-function getAccurateConversion(year, month, day) {
-    const yearData = lunarSolarReference[year];
-    if (yearData) {
-        const key = `${month.toString().padStart(2, '0')}-${day.toString().padStart(2, '0')}`;
-        if (yearData[key]) {
-            return `${year}-${yearData[key]}`;
+    try {
+        const [result] = await convertCalendarDates([user]);
+        if (result.error) {
+            alert(`음력 날짜를 확인해주세요: ${result.error}`);
+            return false;
         }
+        showToast(`음력 ${user.isLeapMonth ? '(윤달) ' : ''}${user.birthDate} → 양력 ${result.solar}로 변환되었습니다`);
+    } catch (error) {
+        // 변환 API를 쓸 수 없어도 운세 요청 시 서버에서 다시 변환한다
+        console.warn('음력 변환 확인 실패:', error);
     }
-    return null; // 참조 데이터에 없는 경우
+    return true;
 }
 
 // 키보드 이벤트 (ESC로 모달 닫기)
@@ -2847,7 +2931,7 @@ function showPage(pageName) {
 }
 
 // 생년월일 입력 폼 처리
-function handleBirthFormSubmit(e) {
+async function handleBirthFormSubmit(e) {
     e.preventDefault();
     
     const formData = new FormData(e.target);
@@ -2855,6 +2939,7 @@ function handleBirthFormSubmit(e) {
     const birthTime = formData.get('birth-time') || document.getElementById('birth-time').value;
     const gender = document.getElementById('gender').value;
     const calendarType = document.querySelector('input[name="calendar-type"]:checked').value;
+    const isLeapMonth = calendarType === 'lunar' && document.getElementById('leap-month').checked;
 
     if (!birthDate || !birthTime) {
         alert('생년월일과 출생시간을 모두 선택해주세요.');
@@ -2867,9 +2952,14 @@ function handleBirthFormSubmit(e) {
         birthTime: (birthTime === 'unknown' || birthTime === '') ? '모름' : birthTime,
         gender,
         calendarType,  // 'solar' 또는 'lunar'
+        isLeapMonth,
         timestamp: new Date().toISOString()
     };
 
+    if (!await checkLunarDate(currentUser)) {
+        return;
+    }
+
     // 디버깅용 로그
     console.log('💾 생년월일 입력 저장:', {
         birthDate,
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 정적 파일 (index.html, styles.css, script.js)
+
+요청마다 디스크에서 파일을 읽고 no-store로 보내면 방문할 때마다 약 150KB를
+다시 받는다. 대신 시작할 때 파일을 메모리에 올려
+- 내용 해시를 붙인 주소(/assets/styles.<해시>.css)로 1년 immutable 캐시
+- 미리 압축한 gzip/brotli 중 Accept-Encoding에 맞는 것을 보내고
+- ETag로 조건부 요청(If-None-Match)에 304로 답한다.
+index.html은 해시가 붙은 주소를 가리키도록 고쳐서 보내고, 배포하면 바로
+바뀌어야 하므로 매번 재검증(no-cache)하게 한다.
+
+brotli 패키지가 없으면 gzip만 쓴다.
+"""
+
+import os
+import re
+import gzip
+import hashlib
+import logging
+
+from flask import Response, abort, current_app, request
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.html'
+
+# 해시 주소로 내보낼 파일 -> Content-Type
+ASSET_FILES = {
+    'styles.css': 'text/css; charset=utf-8',
+    'script.js': 'application/javascript; charset=utf-8',
+}
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+# 선호 순서 (앞쪽이 더 작다)
+ENCODINGS = ('br', 'gzip')
+
+_ETAG_SUFFIX = {'identity': '', 'gzip': '-gz', 'br': '-br'}
+
+
+def _compress(data):
+    """인코딩 -> 본문 (원본보다 작을 때만 압축본을 둔다)"""
+    variants = {'identity': data}
+    compressed = {'gzip': gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(data, quality=11)
+    for encoding, body in compressed.items():
+        if len(body) < len(data):
+            variants[encoding] = body
+    return variants
+
+
+class Asset:
+    """메모리에 올린 파일 하나 (인코딩별 본문과 ETag)"""
+
+    def __init__(self, name, data, content_type, mtime=None):
+        self.name = name
+        self.content_type = content_type
+        self.mtime = mtime
+        self.digest = hashlib.sha256(data).hexdigest()[:12]
+        stem, ext = os.path.splitext(name)
+        self.hashed_name = f'{stem}.{self.digest}{ext}'
+        self.variants = _compress(data)
+
+    def choose_encoding(self):
+        """Accept-Encoding에 맞는 인코딩 (없으면 identity)"""
+        for encoding in ENCODINGS:
+            if encoding in self.variants and request.accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def response(self, cache_control):
+        encoding = self.choose_encoding()
+        response = Response(self.variants[encoding], content_type=self.content_type)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(self.digest + _ETAG_SUFFIX[encoding])
+        response.headers['Cache-Control'] = cache_control
+        return response.make_conditional(request)
+
+
+class StaticAssets:
+    """시작할 때 파일을 읽어 해시/압축해 두고 요청에 답한다"""
+
+    def __init__(self):
+        self.root = None
+        self.assets = {}  # 원래 이름 -> Asset
+        self.index = None
+
+    def init_app(self, app):
+        self.root = app.root_path
+        self.load()
+
+    def _read(self, name):
+        path = os.path.join(self.root, name)
+        with open(path, 'rb') as f:
+            return f.read(), os.path.getmtime(path)
+
+    def load(self):
+        """파일을 다시 읽어 해시/압축 (없는 파일은 건너뛰고 404)"""
+        assets = {}
+        for name, content_type in ASSET_FILES.items():
+            try:
+                data, mtime = self._read(name)
+            except FileNotFoundError:
+                logger.warning(f"정적 파일 없음: {name}")
+                continue
+            assets[name] = Asset(name, data, content_type, mtime)
+
+        index = None
+        try:
+            data, mtime = self._read(INDEX_FILE)
+            index = Asset(INDEX_FILE, self.rewrite(data.decode('utf-8'), assets).encode('utf-8'),
+                          'text/html; charset=utf-8', mtime)
+        except FileNotFoundError:
+            logger.warning(f"정적 파일 없음: {INDEX_FILE}")
+
+        self.assets = assets
+        self.index = index
+        logger.info("정적 파일 로드: " + ", ".join(
+            f"{a.hashed_name} ({len(a.variants['identity']):,}B, {'/'.join(sorted(a.variants))})"
+            for a in assets.values()
+        ))
+
+    @staticmethod
+    def rewrite(html, assets):
+        """index.html의 styles.css / script.js 참조를 해시 주소로"""
+        def replace(match):
+            asset = assets.get(match.group(2))
+            if asset is None:
+                return match.group(0)
+            return f'{match.group(1)}="/assets/{asset.hashed_name}"'
+        return re.sub(r'\b(href|src)="(?:\./|/)?([\w.-]+)"', replace, html)
+
+    def _reload_if_changed(self):
+        # 개발 서버(debug)에서는 파일을 고치면 다시 읽는다
+        for name in (INDEX_FILE, *ASSET_FILES):
+            asset = self.index if name == INDEX_FILE else self.assets.get(name)
+            path = os.path.join(self.root, name)
+            mtime = os.path.getmtime(path) if os.path.exists(path) else None
+            if mtime != (asset.mtime if asset else None):
+                self.load()
+                return
+
+    def index_response(self):
+        """index.html (해시 주소로 고친 것, 매번 재검증)"""
+        if current_app.debug:
+            self._reload_if_changed()
+        if self.index is None:
+            return f"{INDEX_FILE} 파일을 찾을 수 없습니다", 404
+        return self.index.response(REVALIDATE_CACHE)
+
+    def asset_response(self, name):
+        """원래 이름(/styles.css)으로 온 요청 (예전 index.html 등), 매번 재검증"""
+        if current_app.debug:
+            self._reload_if_changed()
+        asset = self.assets.get(name)
+        if asset is None:
+            return f"{name} 파일을 찾을 수 없습니다", 404
+        return asset.response(REVALIDATE_CACHE)
+
+    def hashed_response(self, hashed_name):
+        """/assets/<이름.해시.확장자> (내용이 바뀌면 주소가 바뀌므로 immutable)"""
+        if current_app.debug:
+            self._reload_if_changed()
+        for asset in self.assets.values():
+            if asset.hashed_name == hashed_name:
+                return asset.response(IMMUTABLE_CACHE)
+        # 이전 배포의 해시는 내용이 다르므로 현재 파일로 대신 답하지 않는다
+        abort(404)
+
+
+static_assets = StaticAssets()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+도사운세 관리자 통계 캐시
+
+관리자 여러 명이 대시보드를 띄워 두면 새로고침할 때마다 같은 통계 쿼리가
+반복된다. 계산한 통계를 프로세스 안에 ADMIN_STATS_TTL초 동안 두고 함께 쓴다.
+만료된 순간 여러 요청이 몰려도 계산은 SingleFlight로 한 번만 한다.
+"""
+
+import os
+import time
+import threading
+import logging
+
+from fortune_cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class StatsCache:
+    """키별 계산 결과를 ttl초 동안 보관"""
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # 키 -> (만료 시각(monotonic), 값)
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, loader):
+        """캐시된 값, 없거나 만료됐으면 loader()로 계산해 저장"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value, _ = self._flight.do(key, lambda: self._load(key, loader))
+        return value
+
+    def _load(self, key, loader):
+        value = loader()
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, key=None):
+        """키 하나(없으면 전체)를 지워 다음 요청에서 다시 계산"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+stats_cache = StatsCache(ttl=float(os.getenv('ADMIN_STATS_TTL', 5)))
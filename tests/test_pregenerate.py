@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+pregenerate.run() 통합 테스트
+
+OpenAI 호환 스텁 서버를 로컬에 띄우고 OPENAI_BASE_URL로 가리킨 뒤,
+접속 로그에 넣어 둔 인기 조합이 사주팔자 기준으로 묶여 결과 캐시에 기록되는지 확인한다.
+
+실행:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+CATEGORY = '오늘의 운세'
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """POST /v1/chat/completions 에 고정된 운세로 답한다"""
+
+    requests = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.lock:
+            self.requests.append((self.path, body))
+            number = len(self.requests)
+        payload = json.dumps({
+            'id': f'chatcmpl-stub-{number}',
+            'object': 'chat.completion',
+            'created': 0,
+            'model': body.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': f'스텁 운세 {number}'},
+                'finish_reason': 'stop',
+            }],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15},
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PregenerateRunTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubOpenAIHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+        cls.workdir = tempfile.mkdtemp(prefix='pregenerate-test-')
+        cls.cache_db = os.path.join(cls.workdir, 'fortune_cache.db')
+        # app을 import하기 전에 설정해야 클라이언트와 캐시가 이 값을 쓴다
+        os.environ.update({
+            'OPENAI_API_KEY': 'sk-test',
+            'OPENAI_BASE_URL': f'http://127.0.0.1:{cls.server.server_port}/v1',
+            'DATABASE_URL': 'sqlite:///' + os.path.join(cls.workdir, 'app.db'),
+            'FORTUNE_CACHE_DB': cls.cache_db,
+            'LOG_ARCHIVE_DIR': os.path.join(cls.workdir, 'archive'),
+            'TEMPLATE_CACHE_DIR': os.path.join(cls.workdir, 'jinja_cache'),
+            'EXPORT_DIR': os.path.join(cls.workdir, 'exports'),
+        })
+
+        import app as app_module
+        import pregenerate
+        from models import db, AccessLog
+        cls.pregenerate = pregenerate
+        cls.app = app_module.app
+        cls.build_saju_request = staticmethod(app_module.build_saju_request)
+
+        def log(count, **person):
+            for _ in range(count):
+                db.session.add(AccessLog(
+                    timestamp=datetime.utcnow(), ip_address='127.0.0.1', fortune_type=CATEGORY, **person
+                ))
+
+        with cls.app.app_context():
+            # 같은 사주 (출생시간 표기만 다름) -> 한 조합으로 5건
+            log(3, birth_date='1990-05-15', birth_time='12:00', gender='male', calendar_type='solar')
+            log(2, birth_date='1990-05-15', birth_time='12:40', gender='male', calendar_type='solar')
+            # 음력 2023-02-10 윤달과 평달은 양력 날짜가 달라 다른 조합
+            log(2, birth_date='2023-02-10', birth_time='모름', gender='female',
+                calendar_type='lunar', is_leap_month=True)
+            log(1, birth_date='2023-02-10', birth_time='모름', gender='female',
+                calendar_type='lunar', is_leap_month=False)
+            db.session.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def setUp(self):
+        StubOpenAIHandler.requests.clear()
+
+    def _cached_keys(self):
+        with sqlite3.connect(self.cache_db) as conn:
+            return {key for key, in conn.execute('SELECT cache_key FROM fortune_results')}
+
+    def test_cohorts_grouped_by_pillar_signature(self):
+        with self.app.app_context():
+            cohorts = self.pregenerate.find_hot_cohorts([CATEGORY], days=1, top=10)
+
+        self.assertEqual([cohort['count'] for cohort in cohorts], [5, 2, 1])
+        self.assertEqual(cohorts[0]['birthDate'], '1990-05-15')
+        self.assertTrue(cohorts[1]['isLeapMonth'])
+        self.assertFalse(cohorts[2]['isLeapMonth'])
+
+        with self.app.app_context():
+            leap, plain = (self.build_saju_request(cohort) for cohort in cohorts[1:])
+        self.assertIn('2023-03-31', leap['user_prompt'])
+        self.assertIn('2023-03-01', plain['user_prompt'])
+
+    def test_run_writes_cache_rows(self):
+        summary = self.pregenerate.run(categories=[CATEGORY], days=1, top=10, workers=2)
+
+        self.assertEqual(summary, {'cached': 0, 'generated': 3, 'failed': 0})
+        self.assertEqual(len(StubOpenAIHandler.requests), 3)
+        self.assertTrue(all(path == '/v1/chat/completions' for path, _ in StubOpenAIHandler.requests))
+
+        with self.app.app_context():
+            cohorts = self.pregenerate.find_hot_cohorts([CATEGORY], days=1, top=10)
+            expected = {self.build_saju_request(cohort)['cache_key'] for cohort in cohorts}
+        self.assertTrue(expected <= self._cached_keys())
+
+        # 다시 돌리면 모두 캐시에서 건너뛴다
+        summary = self.pregenerate.run(categories=[CATEGORY], days=1, top=10, workers=2)
+        self.assertEqual(summary, {'cached': 3, 'generated': 0, 'failed': 0})
+        self.assertEqual(len(StubOpenAIHandler.requests), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()